@@ -58,6 +58,9 @@ config = {
         'loglevel': logging.getLevelName(
             log_config['handlers']['console']['level']).lower(),
         'workers': None,  # if None, the value will be cpu_count * 2 + 1
+        # processes validating the batches, per worker, if None the value
+        # will be max(1, cpu_count // workers)
+        'batch_processes': None,
     },
     'wsserver': {
         'scheme': 'ws',
@@ -42,6 +42,22 @@ class LocalMongoDBConnection(Connection):
         self.keyfile = keyfile or bigchaindb.config['database'].get('keyfile', None)
         self.keyfile_passphrase = keyfile_passphrase or bigchaindb.config['database'].get('keyfile_passphrase', None)
         self.crlfile = crlfile or bigchaindb.config['database'].get('crlfile', None)
+        self._supports_transactions = None
+
+    @property
+    def supports_transactions(self):
+        """bool: whether the deployment supports multi-document
+        transactions: a replica set of MongoDB 4.0 or later, or a sharded
+        cluster of MongoDB 4.2 or later.
+        """
+        if self._supports_transactions is None:
+            info = self.conn.admin.command('ismaster')
+            version = tuple(self.conn.server_info()['versionArray'][:2])
+            self._supports_transactions = (
+                'logicalSessionTimeoutMinutes' in info and
+                ('setName' in info and version >= (4, 0) or
+                 info.get('msg') == 'isdbgrid' and version >= (4, 2)))
+        return self._supports_transactions
 
     @property
     def db(self):
@@ -58,11 +74,21 @@ class LocalMongoDBConnection(Connection):
         """
         return self.query()[self.dbname][name]
 
-    def run(self, query):
+    def run(self, query, *, retry=True):
+        """Run a query.
+
+        Args:
+            query: the query, as composed with :meth:`collection`.
+            retry (bool): run the query again if the connection was lost.
+                The queries of a multi-document transaction must not be
+                retried.
+        """
         try:
             try:
                 return query.run(self.conn)
             except pymongo.errors.AutoReconnect as exc:
+                if not retry:
+                    raise
                 logger.warning('Lost connection to the database, '
                                'retrying query.')
                 return query.run(self.conn)
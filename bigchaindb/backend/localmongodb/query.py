@@ -4,28 +4,178 @@
 
 """Query implementation for MongoDB"""
 
-from pymongo import DESCENDING
+import logging
+from time import perf_counter
+
+from pymongo import (ASCENDING, DESCENDING, DeleteMany, DeleteOne, InsertOne,
+                     UpdateMany, UpdateOne)
+from pymongo.errors import ConfigurationError
 
 from bigchaindb import backend
-from bigchaindb.backend.exceptions import DuplicateKeyError
+from bigchaindb.backend.exceptions import DuplicateKeyError, OperationError
 from bigchaindb.backend.utils import module_dispatch_registrar
 from bigchaindb.backend.localmongodb.connection import LocalMongoDBConnection
 from bigchaindb.common.transaction import Transaction
+from bigchaindb.utils import condition_details_owners
 
+logger = logging.getLogger(__name__)
 register_query = module_dispatch_registrar(backend.query)
 
 
+# number of transactions read at once when rebuilding `owner_outputs`
+OWNER_OUTPUTS_CHUNK_SIZE = 1000
+
+# fields of the documents of the `transactions` collection that are not
+# part of the transactions: the height of the block they were committed in
+# orders them (along with `_id` within a block)
+HIDDEN_FIELDS = {'_id': False, 'height': False}
+
+# number of blocks whose transactions get their height at once when
+# completing the `transactions` collection
+HEIGHTS_CHUNK_SIZE = 100
+
+# error code of MongoDB for an operation the deployment does not support,
+# e.g. a transaction on a standalone server
+ILLEGAL_OPERATION = 20
+
+
+def _spent_links(tx):
+    return [(input_['fulfills']['transaction_id'],
+             input_['fulfills']['output_index'])
+            for input_ in tx['inputs'] if input_.get('fulfills')]
+
+
+def _owner_output_writes(transactions):
+    """Requests maintaining the ``owner_outputs`` collection: a document
+    per output and owner, with the transaction spending the output if
+    any. The owners of an output are the public keys of its condition,
+    as :func:`~bigchaindb.utils.condition_details_has_owner` finds them,
+    not its ``public_keys``.
+
+    The outputs spent within the given transactions are stored as spent,
+    the ones stored before are updated.
+    """
+    created = {}
+    spent = {}
+    for tx in transactions:
+        for link in _spent_links(tx):
+            if link in created:
+                for owner_output in created[link]:
+                    owner_output.update(spent=True, spent_by=tx['id'])
+            else:
+                spent[link] = tx['id']
+
+        asset_id = tx.get('asset', {}).get('id', tx['id'])
+        for index, output in enumerate(tx['outputs']):
+            created[(tx['id'], index)] = [
+                {'public_key': public_key,
+                 'transaction_id': tx['id'],
+                 'output_index': index,
+                 'amount': int(output['amount']),
+                 'asset_id': asset_id,
+                 'spent': False,
+                 'spent_by': None}
+                for public_key in sorted(condition_details_owners(
+                    output['condition']['details']))]
+
+    # an output may be stored again, e.g. when a block is replayed
+    requests = [UpdateOne({'transaction_id': owner_output['transaction_id'],
+                           'output_index': owner_output['output_index'],
+                           'public_key': owner_output['public_key']},
+                          {'$setOnInsert': owner_output}, upsert=True)
+                for owner_outputs in created.values()
+                for owner_output in owner_outputs]
+    requests.extend(UpdateMany({'transaction_id': txid, 'output_index': index},
+                               {'$set': {'spent': True, 'spent_by': spent_by}})
+                    for (txid, index), spent_by in spent.items())
+    return requests
+
+
 @register_query(LocalMongoDBConnection)
 def store_transactions(conn, signed_transactions):
-    return conn.run(conn.collection('transactions')
-                    .insert_many(signed_transactions))
+    result = conn.run(conn.collection('transactions')
+                      .insert_many(signed_transactions))
+    _store_owner_outputs(conn, signed_transactions)
+    return result
+
+
+@register_query(LocalMongoDBConnection)
+def get_owner_outputs(conn, public_key, spent=None):
+    query = {'public_key': public_key}
+    if spent is not None:
+        query['spent'] = spent
+    # answered from the `owner` index alone
+    return conn.run(
+        conn.collection('owner_outputs')
+        .find(query, projection={'_id': False, 'transaction_id': True,
+                                 'output_index': True}))
+
+
+@register_query(LocalMongoDBConnection)
+def rebuild_owner_outputs(conn):
+    if get_rebuild(conn, 'owner_outputs'):
+        return 0
+
+    # start over from an interrupted rebuild
+    conn.run(conn.collection('owner_outputs').delete_many({}))
+    # the transactions are read in the order they were committed, so that
+    # the outputs they spend are stored before
+    cursor = conn.run(
+        conn.collection('transactions')
+        .find({}, projection={'_id': False, 'id': True, 'asset.id': True,
+                              'outputs.amount': True,
+                              'outputs.condition.details': True,
+                              'inputs.fulfills': True})
+        .sort([('height', ASCENDING), ('_id', ASCENDING)]))
+    count = 0
+    chunk = []
+    for tx in cursor:
+        chunk.append(tx)
+        if len(chunk) == OWNER_OUTPUTS_CHUNK_SIZE:
+            _store_owner_outputs(conn, chunk)
+            count += len(chunk)
+            chunk = []
+    _store_owner_outputs(conn, chunk)
+    store_rebuild(conn, 'owner_outputs')
+    return count + len(chunk)
+
+
+@register_query(LocalMongoDBConnection)
+def rebuild_transaction_heights(conn):
+    if get_rebuild(conn, 'transactions.height'):
+        return 0
+
+    cursor = conn.run(
+        conn.collection('blocks')
+        .find({'transactions.0': {'$exists': True}},
+              projection={'_id': False, 'height': True, 'transactions': True}))
+    count = 0
+    requests = []
+    for block in cursor:
+        requests.append(UpdateMany({'id': {'$in': block['transactions']},
+                                    'height': {'$exists': False}},
+                                   {'$set': {'height': block['height']}}))
+        if len(requests) == HEIGHTS_CHUNK_SIZE:
+            conn.run(conn.collection('transactions').bulk_write(requests))
+            count += len(requests)
+            requests = []
+    if requests:
+        conn.run(conn.collection('transactions').bulk_write(requests))
+    store_rebuild(conn, 'transactions.height')
+    return count + len(requests)
+
+
+def _store_owner_outputs(conn, transactions):
+    requests = _owner_output_writes(transactions)
+    if requests:
+        conn.run(conn.collection('owner_outputs').bulk_write(requests))
 
 
 @register_query(LocalMongoDBConnection)
 def get_transaction(conn, transaction_id):
     return conn.run(
         conn.collection('transactions')
-        .find_one({'id': transaction_id}, {'_id': 0}))
+        .find_one({'id': transaction_id}, HIDDEN_FIELDS))
 
 
 @register_query(LocalMongoDBConnection)
@@ -34,11 +184,53 @@ def get_transactions(conn, transaction_ids):
         return conn.run(
             conn.collection('transactions')
             .find({'id': {'$in': transaction_ids}},
-                  projection={'_id': False}))
+                  projection=HIDDEN_FIELDS))
     except IndexError:
         pass
 
 
+def _full_transactions_pipeline(match, *stages):
+    return [
+        {'$match': match},
+        *stages,
+        {'$lookup': {'from': 'assets', 'localField': 'id',
+                     'foreignField': 'id', 'as': '_assets'}},
+        {'$lookup': {'from': 'metadata', 'localField': 'id',
+                     'foreignField': 'id', 'as': '_metadata'}},
+        {'$project': dict(HIDDEN_FIELDS, **{'_assets._id': False,
+                                            '_assets.id': False,
+                                            '_metadata._id': False})},
+    ]
+
+
+def _reassemble_transaction(transaction):
+    assets = transaction.pop('_assets')
+    metadata = transaction.pop('_metadata')
+    if assets:
+        transaction['asset'] = assets[0]
+    if 'metadata' not in transaction:
+        transaction['metadata'] = metadata[0].get('metadata') if metadata else None
+    return transaction
+
+
+@register_query(LocalMongoDBConnection)
+def get_full_transaction(conn, transaction_id):
+    cursor = conn.run(
+        conn.collection('transactions')
+        .aggregate(_full_transactions_pipeline({'id': transaction_id})))
+    for transaction in cursor:
+        return _reassemble_transaction(transaction)
+
+
+@register_query(LocalMongoDBConnection)
+def get_full_transactions(conn, transaction_ids):
+    cursor = conn.run(
+        conn.collection('transactions')
+        .aggregate(_full_transactions_pipeline(
+            {'id': {'$in': list(transaction_ids)}})))
+    return (_reassemble_transaction(transaction) for transaction in cursor)
+
+
 @register_query(LocalMongoDBConnection)
 def store_metadatas(conn, metadata):
     return conn.run(
@@ -98,7 +290,7 @@ def get_spent(conn, transaction_id, output):
 
     return conn.run(
         conn.collection('transactions')
-            .find(query, {'_id': 0}))
+            .find(query, HIDDEN_FIELDS))
 
 
 @register_query(LocalMongoDBConnection)
@@ -119,8 +311,72 @@ def store_block(conn, block):
         pass
 
 
+def _block_writes(block, transactions, assets, metadata,
+                  unspent_outputs, spent_outputs):
+    writes = [
+        ('metadata', [InsertOne(m) for m in metadata]),
+        ('assets', [InsertOne(asset) for asset in assets]),
+        # the transactions of a block are ordered by `_id`, which the
+        # client assigns in order
+        ('transactions', [InsertOne(dict(tx, height=block['height']))
+                          for tx in transactions]),
+        ('owner_outputs', _owner_output_writes(transactions)),
+        ('utxos',
+         [DeleteOne({'transaction_id': utxo['transaction_id'],
+                     'output_index': utxo['output_index']})
+          for utxo in spent_outputs] +
+         [InsertOne(utxo) for utxo in unspent_outputs]),
+        # NOTE: storing the block must be the last write, see BEP#8. As
+        # with `store_block`, a block already stored at this height is kept.
+        ('blocks', [UpdateOne({'height': block['height']},
+                              {'$setOnInsert': block}, upsert=True)]),
+    ]
+    return [(name, requests) for name, requests in writes if requests]
+
+
+def _run_block_writes(conn, writes, session=None):
+    timings = {}
+    for name, requests in writes:
+        start = perf_counter()
+        # the writes of a transaction cannot be retried on their own, the
+        # whole transaction is aborted instead
+        conn.run(conn.collection(name)
+                 .bulk_write(requests, ordered=False, session=session),
+                 retry=session is None)
+        timings[name] = perf_counter() - start
+    return timings
+
+
+def _transactions_unsupported(exc):
+    if isinstance(exc, OperationError):
+        exc = exc.__cause__
+    return (isinstance(exc, ConfigurationError) or
+            getattr(exc, 'code', None) == ILLEGAL_OPERATION)
+
+
 @register_query(LocalMongoDBConnection)
-def get_txids_filtered(conn, asset_id, operation=None):
+def commit_block(conn, block, *, transactions=(), assets=(), metadata=(),
+                 unspent_outputs=(), spent_outputs=(), session=False):
+    writes = _block_writes(block, transactions, assets, metadata,
+                           unspent_outputs, spent_outputs)
+
+    if session and conn.supports_transactions:
+        try:
+            with conn.conn.start_session() as mongo_session:
+                with mongo_session.start_transaction():
+                    return _run_block_writes(conn, writes, mongo_session)
+        except (ConfigurationError, OperationError) as exc:
+            if not _transactions_unsupported(exc):
+                raise
+            # the deployment does not support multi-document transactions
+            # after all, the transaction was aborted and nothing written
+            logger.warning('Cannot commit the block in a transaction: %s', exc)
+            conn._supports_transactions = False
+
+    return _run_block_writes(conn, writes)
+
+
+def _asset_history_match(asset_id, operation=None):
     match_create = {
         'operation': 'CREATE',
         'id': asset_id
@@ -131,14 +387,17 @@ def get_txids_filtered(conn, asset_id, operation=None):
     }
 
     if operation == Transaction.CREATE:
-        match = match_create
+        return match_create
     elif operation == Transaction.TRANSFER:
-        match = match_transfer
+        return match_transfer
     else:
-        match = {'$or': [match_create, match_transfer]}
+        return {'$or': [match_create, match_transfer]}
+
 
+@register_query(LocalMongoDBConnection)
+def get_txids_filtered(conn, asset_id, operation=None):
     pipeline = [
-        {'$match': match}
+        {'$match': _asset_history_match(asset_id, operation)}
     ]
     cursor = conn.run(
         conn.collection('transactions')
@@ -146,6 +405,34 @@ def get_txids_filtered(conn, asset_id, operation=None):
     return (elem['id'] for elem in cursor)
 
 
+@register_query(LocalMongoDBConnection)
+def get_full_transactions_filtered(conn, asset_id, operation=None, after=None,
+                                   limit=None):
+    match = _asset_history_match(asset_id, operation)
+    if after is not None:
+        last = conn.run(
+            conn.collection('transactions')
+            .find_one({'id': after}, projection={'_id': True, 'height': True}))
+        if last is None:
+            return iter(())
+        # the transactions without a height (not stored with their block)
+        # come first
+        height = last.get('height')
+        match = {'$and': [match, {'$or': [
+            {'height': {'$ne': None} if height is None else {'$gt': height}},
+            {'height': height, '_id': {'$gt': last['_id']}},
+        ]}]}
+
+    # the commit order
+    stages = [{'$sort': {'height': ASCENDING, '_id': ASCENDING}}]
+    if limit:
+        stages.append({'$limit': limit})
+    cursor = conn.run(
+        conn.collection('transactions')
+        .aggregate(_full_transactions_pipeline(match, *stages)))
+    return (_reassemble_transaction(transaction) for transaction in cursor)
+
+
 @register_query(LocalMongoDBConnection)
 def text_search(conn, search, *, language='english', case_sensitive=False,
                 diacritic_sensitive=False, text_score=False, limit=0, table='assets'):
@@ -171,16 +458,6 @@ def _remove_text_score(asset):
     return asset
 
 
-@register_query(LocalMongoDBConnection)
-def get_owned_ids(conn, owner):
-    cursor = conn.run(
-        conn.collection('transactions').aggregate([
-            {'$match': {'outputs.public_keys': owner}},
-            {'$project': {'_id': False}}
-        ]))
-    return cursor
-
-
 @register_query(LocalMongoDBConnection)
 def get_spending_transactions(conn, inputs):
     transaction_ids = [i['transaction_id'] for i in inputs]
@@ -194,7 +471,7 @@ def get_spending_transactions(conn, inputs):
                ]}}}
 
     cursor = conn.run(
-        conn.collection('transactions').find(query, {'_id': False}))
+        conn.collection('transactions').find(query, HIDDEN_FIELDS))
     return cursor
 
 
@@ -216,6 +493,17 @@ def get_block_with_transaction(conn, txid):
 
 @register_query(LocalMongoDBConnection)
 def delete_transactions(conn, txn_ids):
+    transactions = conn.run(
+        conn.collection('transactions')
+        .find({'id': {'$in': txn_ids}},
+              projection={'_id': False, 'id': True, 'inputs.fulfills': True}))
+    requests = [UpdateMany({'transaction_id': txid, 'output_index': index,
+                            'spent_by': {'$in': txn_ids}},
+                           {'$set': {'spent': False, 'spent_by': None}})
+                for tx in transactions for txid, index in _spent_links(tx)]
+    requests.append(DeleteMany({'transaction_id': {'$in': txn_ids}}))
+    conn.run(conn.collection('owner_outputs').bulk_write(requests))
+
     conn.run(conn.collection('assets').delete_many({'id': {'$in': txn_ids}}))
     conn.run(conn.collection('metadata').delete_many({'id': {'$in': txn_ids}}))
     conn.run(conn.collection('transactions').delete_many({'id': {'$in': txn_ids}}))
@@ -251,6 +539,31 @@ def delete_unspent_outputs(conn, *unspent_outputs):
         )
 
 
+@register_query(LocalMongoDBConnection)
+def get_utxo_transactions(conn):
+    return conn.run(
+        conn.collection('transactions')
+        .find({}, projection={'_id': False, 'id': True, 'asset.id': True,
+                              'outputs.amount': True,
+                              'outputs.condition.uri': True,
+                              'inputs.fulfills': True}))
+
+
+@register_query(LocalMongoDBConnection)
+def get_rebuild(conn, collection):
+    return conn.run(
+        conn.collection('rebuilds')
+        .find_one({'collection': collection}, projection={'_id': False}))
+
+
+@register_query(LocalMongoDBConnection)
+def store_rebuild(conn, collection):
+    return conn.run(
+        conn.collection('rebuilds')
+        .replace_one({'collection': collection}, {'collection': collection},
+                     upsert=True))
+
+
 @register_query(LocalMongoDBConnection)
 def get_unspent_outputs(conn, *, query=None):
     if query is None:
@@ -354,7 +667,7 @@ def get_asset_tokens_for_public_key(conn, asset_id, public_key):
     cursor = conn.run(
         conn.collection('transactions').aggregate([
             {'$match': query},
-            {'$project': {'_id': False}}
+            {'$project': HIDDEN_FIELDS}
         ]))
     return cursor
 
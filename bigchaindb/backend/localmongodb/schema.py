@@ -22,6 +22,8 @@ INDEXES = {
     'transactions': [
         ('id', dict(unique=True, name='transaction_id')),
         ('asset.id', dict(name='asset_id')),
+        ([('asset.id', ASCENDING), ('height', ASCENDING), ('_id', ASCENDING)],
+         dict(name='asset_id_height')),
         ('outputs.public_keys', dict(name='outputs')),
         ([('inputs.fulfills.transaction_id', ASCENDING),
           ('inputs.fulfills.output_index', ASCENDING)], dict(name='inputs')),
@@ -41,6 +43,13 @@ INDEXES = {
         ([('transaction_id', ASCENDING),
           ('output_index', ASCENDING)], dict(name='utxo', unique=True)),
     ],
+    'owner_outputs': [
+        ([('public_key', ASCENDING), ('spent', ASCENDING),
+          ('transaction_id', ASCENDING), ('output_index', ASCENDING)],
+         dict(name='owner')),
+        ([('transaction_id', ASCENDING), ('output_index', ASCENDING),
+          ('public_key', ASCENDING)], dict(name='output', unique=True)),
+    ],
     'pre_commit': [
         ('height', dict(name='height', unique=True)),
     ],
@@ -55,6 +64,9 @@ INDEXES = {
         ('height', dict(name='height', unique=True)),
         ('chain_id', dict(name='chain_id', unique=True)),
     ],
+    'rebuilds': [
+        ('collection', dict(name='collection', unique=True)),
+    ],
 }
 
 
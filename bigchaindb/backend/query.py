@@ -53,7 +53,8 @@ def store_metadatas(connection, metadata):
 
 @singledispatch
 def store_transactions(connection, signed_transactions):
-    """Store the list of transactions."""
+    """Store the list of transactions, along with their outputs in the
+    ``owner_outputs`` collection."""
 
     raise NotImplementedError
 
@@ -72,6 +73,36 @@ def get_transaction(connection, transaction_id):
     raise NotImplementedError
 
 
+@singledispatch
+def get_full_transaction(connection, transaction_id):
+    """Get a transaction along with its asset and metadata, in a single
+    query.
+
+    Args:
+        transaction_id (str): the id of the transaction.
+
+    Returns:
+        The reassembled transaction dict, or ``None`` if not found.
+    """
+
+    raise NotImplementedError
+
+
+@singledispatch
+def get_full_transactions(connection, transaction_ids):
+    """Get transactions along with their assets and metadata, in a single
+    query.
+
+    Args:
+        transaction_ids (list): list of transaction ids.
+
+    Returns:
+        An iterator of reassembled transaction dicts.
+    """
+
+    raise NotImplementedError
+
+
 @singledispatch
 def get_transactions(connection, transaction_ids):
     """Get transactions from the transactions table.
@@ -120,29 +151,55 @@ def get_spent(connection, transaction_id, condition_id):
 
 
 @singledispatch
-def get_spending_transactions(connection, inputs):
-    """Return transactions which spend given inputs
+def get_owner_outputs(connection, public_key, spent=None):
+    """Retrieve the outputs of a public key from the ``owner_outputs``
+    collection.
 
     Args:
-        inputs (list): list of {txid, output}
+        public_key (str): base58 encoded public key.
+        spent (bool): If ``True`` return only the spent outputs, if
+            ``False`` only the unspent ones, all of them by default.
 
     Returns:
-        Iterator of (block_ids, transaction) for transactions that
-        spend given inputs.
+        Iterator of ``{'transaction_id': ..., 'output_index': ...}``.
+    """
+    raise NotImplementedError
+
+
+@singledispatch
+def rebuild_owner_outputs(connection):
+    """Fill the ``owner_outputs`` collection from the stored transactions
+    if it was never rebuilt, e.g. when the node was running a version that
+    did not maintain it. This is only done once.
+
+    Returns:
+        int: the number of transactions read.
     """
     raise NotImplementedError
 
 
 @singledispatch
-def get_owned_ids(connection, owner):
-    """Retrieve a list of `txids` that can we used has inputs.
+def rebuild_transaction_heights(connection):
+    """Store the height of their block on the committed transactions that
+    do not have it, e.g. when the node was running a version that did not
+    store it. This is only done once.
+
+    Returns:
+        int: the number of blocks read.
+    """
+    raise NotImplementedError
+
+
+@singledispatch
+def get_spending_transactions(connection, inputs):
+    """Return transactions which spend given inputs
 
     Args:
-        owner (str): base58 encoded public key.
+        inputs (list): list of {txid, output}
 
     Returns:
-        Iterator of (block_id, transaction) for transactions
-        that list given owner in conditions.
+        Iterator of (block_ids, transaction) for transactions that
+        spend given inputs.
     """
     raise NotImplementedError
 
@@ -213,6 +270,27 @@ def get_txids_filtered(connection, asset_id, operation=None):
     raise NotImplementedError
 
 
+@singledispatch
+def get_full_transactions_filtered(connection, asset_id, operation=None,
+                                   after=None, limit=None):
+    """Return the transactions of an asset, in the order they were
+    committed (by block height, then in the order of their block), with
+    their asset and metadata.
+
+    Args:
+        asset_id (str): ID of transaction that defined the asset
+        operation (str) (optional): Operation to filter on
+        after (str) (optional): ID of the transaction to start after
+        limit (int) (optional): Maximum number of transactions to return
+
+    Returns:
+        An iterator of the transactions, read from the database as it is
+        consumed. It is empty if ``after`` is not a transaction.
+    """
+
+    raise NotImplementedError
+
+
 @singledispatch
 def text_search(conn, search, *, language='english', case_sensitive=False,
                 diacritic_sensitive=False, text_score=False, limit=0, table=None):
@@ -267,6 +345,32 @@ def store_block(conn, block):
     raise NotImplementedError
 
 
+@singledispatch
+def commit_block(connection, block, *, transactions=(), assets=(), metadata=(),
+                 unspent_outputs=(), spent_outputs=(), session=False):
+    """Write a committed block along with everything it changes, using as
+    few round trips as possible. The transactions are stored with the
+    height of the block. The ``owner_outputs`` collection is updated from
+    the transactions. The block itself is written last.
+
+    Args:
+        block (dict): block with current height and block hash.
+        transactions (list): the transactions of the block, without their
+            assets and metadata.
+        assets (list): the assets of the ``CREATE`` transactions.
+        metadata (list): the metadata of the transactions.
+        unspent_outputs (list): the utxos to add to the UTXO set.
+        spent_outputs (list): the utxos to remove from the UTXO set.
+        session (bool): if ``True``, try to do all the writes in a single
+            multi-document transaction (only supported by replica sets).
+
+    Returns:
+        dict: the time spent writing to each collection, in seconds.
+    """
+
+    raise NotImplementedError
+
+
 @singledispatch
 def store_unspent_outputs(connection, unspent_outputs):
     """Store unspent outputs in ``utxo_set`` table."""
@@ -283,7 +387,8 @@ def delete_unspent_outputs(connection, unspent_outputs):
 
 @singledispatch
 def delete_transactions(conn, txn_ids):
-    """Delete transactions from database
+    """Delete transactions from database, along with their outputs, and
+    mark the outputs they spent as unspent again.
 
     Args:
         txn_ids (list): list of transaction ids
@@ -295,6 +400,50 @@ def delete_transactions(conn, txn_ids):
     raise NotImplementedError
 
 
+@singledispatch
+def get_utxo_transactions(connection):
+    """Retrieve the fields of every stored transaction that are needed to
+    rebuild the UTXO set: the id, the asset id, the outputs and the links
+    of the inputs.
+
+    Returns:
+        An iterator of partial transaction dicts.
+    """
+
+    raise NotImplementedError
+
+
+@singledispatch
+def get_rebuild(connection, collection):
+    """Tell whether a collection derived from the ``transactions`` one
+    was rebuilt from it, or a field added to the stored transactions was
+    filled.
+
+    Args:
+        collection (str): the name of the collection, or the path of the
+            field (e.g. ``transactions.height``).
+
+    Returns:
+        The record stored by :func:`store_rebuild`, if any.
+    """
+
+    raise NotImplementedError
+
+
+@singledispatch
+def store_rebuild(connection, collection):
+    """Record that a collection derived from the ``transactions`` one was
+    rebuilt from it, or that a field added to the stored transactions was
+    filled.
+
+    Args:
+        collection (str): the name of the collection, or the path of the
+            field (e.g. ``transactions.height``).
+    """
+
+    raise NotImplementedError
+
+
 @singledispatch
 def get_unspent_outputs(connection, *, query=None):
     """Retrieves unspent outputs.
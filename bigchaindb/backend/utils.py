@@ -2,6 +2,8 @@
 # SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
 # Code is Apache-2.0 and docs are CC-BY-4.0
 
+from bigchaindb.metrics import timed
+
 
 class ModuleDispatchRegistrationError(Exception):
     """Raised when there is a problem registering dispatched functions for a
@@ -10,12 +12,17 @@ class ModuleDispatchRegistrationError(Exception):
 
 
 def module_dispatch_registrar(module):
+    # the implementations are timed in the metrics registry, e.g. the
+    # `bigchaindb.backend.query` ones as `backend.query.<function name>`
+    prefix = module.__name__.split('.', 1)[-1]
+
     def dispatch_wrapper(obj_type):
         def wrapper(func):
             func_name = func.__name__
             try:
                 dispatch_registrar = getattr(module, func_name)
-                return dispatch_registrar.register(obj_type)(func)
+                return dispatch_registrar.register(obj_type)(
+                    timed('{}.{}'.format(prefix, func_name))(func))
             except AttributeError as ex:
                 raise ModuleDispatchRegistrationError(
                     ('`{module}` does not contain a single-dispatchable '
@@ -242,6 +242,8 @@ def _run_init():
     bdb = bigchaindb.BigchainDB()
 
     schema.init_database(connection=bdb.connection)
+    bdb.rebuild_transaction_heights()
+    bdb.rebuild_owner_outputs()
 
 
 @configure_bigchaindb
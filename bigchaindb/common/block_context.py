@@ -0,0 +1,63 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+from collections import defaultdict
+
+
+class BlockContext:
+    """The transactions accepted so far in the block being processed.
+
+    The transactions are indexed by id and by the outputs they spend, so
+    that the checks against the other transactions of the block (parents
+    not committed yet, double spends, duplicates) are constant time.
+
+    A :class:`BlockContext` is iterable and can be used where a list of
+    transactions was used before.
+
+    Args:
+        transactions (iterable): transactions to add to the context.
+    """
+
+    def __init__(self, transactions=()):
+        self.transactions = []
+        self._transactions_by_id = {}
+        self._spenders = defaultdict(list)
+        for transaction in transactions:
+            self.add(transaction)
+
+    @classmethod
+    def wrap(cls, transactions):
+        """Return ``transactions`` as a :class:`BlockContext`, building one
+        if needed (e.g. for a plain list of transactions).
+        """
+        if isinstance(transactions, cls):
+            return transactions
+        return cls(transactions)
+
+    def add(self, transaction):
+        """Add an accepted transaction to the context."""
+        self.transactions.append(transaction)
+        self._transactions_by_id[transaction.id] = transaction
+        for input_ in transaction.inputs:
+            if input_.fulfills:
+                self._spenders[(input_.fulfills.txid,
+                                input_.fulfills.output)].append(transaction)
+
+    def get_transaction(self, txid):
+        """Return the transaction of the context with id ``txid``, or
+        ``None``.
+        """
+        return self._transactions_by_id.get(txid)
+
+    def get_spent(self, txid, output):
+        """Return the list of transactions of the context spending the
+        given output.
+        """
+        return self._spenders.get((txid, output), [])
+
+    def __iter__(self):
+        return iter(self.transactions)
+
+    def __len__(self):
+        return len(self.transactions)
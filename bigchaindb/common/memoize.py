@@ -1,58 +1,225 @@
-import functools
-import codecs
-from functools import lru_cache
-
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
 
-class HDict(dict):
-    def __hash__(self):
-        return hash(codecs.decode(self['id'], 'hex'))
+"""Memoization of the (de)serialization of the transactions.
 
+The results are kept in :class:`MemoCache` instances, LRU caches bounded
+by the estimated size of their values in bytes, when it is known without
+serializing them, and by their number of entries, so that the memory used
+by a long running process does not depend on the size of the transactions
+it sees. Every cache counts its hits, misses and evictions (see
+:func:`cache_stats`), and can be emptied with :func:`clear_caches`, or
+rid of a single transaction with :func:`invalidate`.
+"""
 
-@lru_cache(maxsize=16384)
-def from_dict(func, *args, **kwargs):
-    return func(*args, **kwargs)
+import functools
+import weakref
+from collections import OrderedDict, namedtuple
+from hashlib import blake2b
+
+
+# maximum size (in bytes) of the values of the caches
+FROM_DICT_MAX_BYTES = 2 ** 26
+TO_DICT_MAX_BYTES = 2 ** 26
+# maximum number of entries of the caches, the bound of the entries whose
+# size is not known
+FROM_DICT_MAX_ENTRIES = 16384
+TO_DICT_MAX_ENTRIES = 16384
+# ratio between the memory used by a deserialized transaction (dict or
+# object) and the length of its JSON serialization, about 3.6 as measured
+# with ``tracemalloc`` for a ``CREATE`` transaction with a small asset
+OBJECT_OVERHEAD = 4
+
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses', 'evictions',
+                                     'currsize', 'currbytes', 'maxbytes',
+                                     'maxsize'))
+
+# every cache created, by name
+caches = {}
+
+
+class MemoCache:
+    """LRU cache bounded by the estimated size of its values and by its
+    number of entries.
+
+    Args:
+        name (str): name of the cache, as reported by :func:`cache_stats`.
+        max_bytes (int): maximum size of the values, the least recently
+            used ones are evicted first.
+        max_entries (int): maximum number of entries, if any.
+    """
+
+    def __init__(self, name, max_bytes, max_entries=None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        # keys of the entries, by tag (e.g. the id of their transaction)
+        self._tags = {}
+        caches[name] = self
+
+    def get(self, key, default=None, check=None):
+        """Return the value of ``key``, or ``default`` if there is none or
+        if ``check(value)`` is false.
+        """
+        try:
+            value, _, _ = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        if check is not None and not check(value):
+            self._discard(key)
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value, size=0, tag=None):
+        """Store a value of (about) ``size`` bytes, evicting the least
+        recently used entries if needed.
+
+        Values larger than the cache itself are not stored. A ``size`` of
+        zero (unknown) only counts against ``max_entries``. The entry can
+        be removed with :meth:`invalidate` if a ``tag`` is given.
+        """
+        if size > self.max_bytes:
+            return
+        self._discard(key)
+        self._entries[key] = (value, size, tag)
+        self.bytes += size
+        if tag is not None:
+            self._tags.setdefault(tag, set()).add(key)
+        while (self.bytes > self.max_bytes or
+               self.max_entries is not None and
+               len(self._entries) > self.max_entries):
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, tag):
+        """Remove the entries stored with ``tag``."""
+        for key in list(self._tags.get(tag, ())):
+            self._discard(key)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        _, size, tag = entry
+        self.bytes -= size
+        if tag is not None:
+            keys = self._tags[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.evictions,
+                         len(self._entries), self.bytes, self.max_bytes,
+                         self.max_entries)
+
+    def cache_clear(self):
+        """Remove all the entries and reset the counters."""
+        self._entries.clear()
+        self._tags.clear()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def cache_stats():
+    """Return the counters of every cache, by name."""
+    return {name: cache.cache_info()._asdict() for name, cache in caches.items()}
+
+
+def clear_caches():
+    """Empty every cache."""
+    for cache in caches.values():
+        cache.cache_clear()
+
+
+def invalidate(txid):
+    """Remove the entries of the transaction ``txid`` from every cache,
+    e.g. when it is rolled back.
+    """
+    for cache in caches.values():
+        cache.invalidate(txid)
+
+
+from_dict = MemoCache('from_dict', FROM_DICT_MAX_BYTES, FROM_DICT_MAX_ENTRIES)
+to_dict = MemoCache('to_dict', TO_DICT_MAX_BYTES, TO_DICT_MAX_ENTRIES)
 
 
 def memoize_from_dict(func):
+    """Memoize a ``from_dict(cls, tx_dict, ..., raw=None)`` class method.
+
+    The entries are keyed by the id of the transaction along with a digest
+    of ``raw``, the JSON document the dict has been decoded from, and sized
+    by its length. The calls without ``raw`` are not memoized: the id alone
+    is not enough, as it is only checked against the body of the
+    transaction if the schema is validated, and a forged transaction
+    claiming the id of another one must not be given the object built from
+    the genuine one, while digesting the dict would cost as much as
+    building the transaction.
+    """
 
     @functools.wraps(func)
     def memoized_func(*args, **kwargs):
-
-        if args[1].get('id', None):
-            args = list(args)
-            args[1] = HDict(args[1])
-            new_args = tuple(args)
-            return from_dict(func, *new_args, **kwargs)
-        else:
+        tx = args[1]
+        raw = kwargs.get('raw')
+        if not raw or not isinstance(tx, dict) or not tx.get('id'):
             return func(*args, **kwargs)
 
-    return memoized_func
-
-
-class ToDictWrapper():
-    def __init__(self, tx):
-        self.tx = tx
+        key = (func, args[0], tx['id'], blake2b(raw, digest_size=16).digest(),
+               args[2:], tuple(sorted(item for item in kwargs.items()
+                                      if item[0] != 'raw')))
+        transaction = from_dict.get(key)
+        if transaction is not None:
+            return transaction
 
-    def __eq__(self, other):
-        return self.tx.id == other.tx.id
+        transaction = func(*args, **kwargs)
+        from_dict.put(key, transaction, len(raw) * OBJECT_OVERHEAD,
+                      tag=tx['id'])
+        return transaction
 
-    def __hash__(self):
-        return hash(self.tx.id)
-
-
-@lru_cache(maxsize=16384)
-def to_dict(func, tx_wrapped):
-    return func(tx_wrapped.tx)
+    return memoized_func
 
 
 def memoize_to_dict(func):
+    """Memoize a ``to_dict(self)`` method of a transaction.
+
+    The entries are keyed by the id of the transaction and the identity
+    of the object, which is only referenced weakly: the dict of a
+    transaction is only reused for the very same object, and the cache
+    does not keep the transactions alive. They are sized by the canonical
+    serialization of the transaction if it has already been computed (e.g.
+    to sign or to validate it), and only bounded by their number otherwise.
+    """
 
     @functools.wraps(func)
     def memoized_func(*args, **kwargs):
-
-        if args[0].id:
-            return to_dict(func, ToDictWrapper(args[0]))
-        else:
+        tx = args[0]
+        if not tx.id:
             return func(*args, **kwargs)
 
+        key = (func, tx.id, id(tx))
+        entry = to_dict.get(key, check=lambda entry: entry[1]() is tx)
+        if entry is not None:
+            return entry[0]
+
+        tx_dict = func(*args, **kwargs)
+        serializations = getattr(tx, '_serializations', None)
+        size = len(serializations[1]) * OBJECT_OVERHEAD if serializations else 0
+        to_dict.put(key, (tx_dict, weakref.ref(tx)), size, tag=tx.id)
+        return tx_dict
+
     return memoized_func
@@ -43,8 +43,79 @@ _, TX_SCHEMA_CHAIN_MIGRATION_ELECTION = _load_schema('transaction_chain_migratio
 _, TX_SCHEMA_VOTE = _load_schema('transaction_vote_' + TX_SCHEMA_VERSION)
 
 
-def _validate_schema(schema, body):
-    """Validate data against a schema"""
+def _prefix_definitions(node, prefix):
+    """Return a copy of a schema node with the names of the definitions it
+    refers to prefixed with ``prefix``.
+    """
+    if isinstance(node, list):
+        return [_prefix_definitions(item, prefix) for item in node]
+    if not isinstance(node, dict):
+        return node
+    copy = {}
+    for key, value in node.items():
+        if key == '$ref' and value.startswith('#/definitions/'):
+            value = '#/definitions/' + prefix + value[len('#/definitions/'):]
+        elif key == 'definitions':
+            value = {prefix + name: _prefix_definitions(definition, prefix)
+                     for name, definition in value.items()}
+        else:
+            value = _prefix_definitions(value, prefix)
+        copy[key] = value
+    return copy
+
+
+def _merge_schemas(*schemas):
+    """Merge schemas into a single one, that a document must satisfy all
+    of. The definitions of every schema are prefixed with its index so
+    that they do not clash.
+    """
+    merged = {'$schema': 'http://json-schema.org/draft-04/schema#',
+              'allOf': [],
+              'definitions': {}}
+    for index, schema in enumerate(schemas):
+        schema = _prefix_definitions(schema, 's{}_'.format(index))
+        schema.pop('$schema', None)
+        merged['definitions'].update(schema.pop('definitions', {}))
+        merged['allOf'].append(schema)
+    return merged
+
+
+_combined_schemas = {}
+
+
+def combine_schemas(*schemas):
+    """Combine schemas (as loaded by ``_load_schema``) into one that
+    validates a document against all of them in a single pass.
+
+    The combined schemas are built once and reused.
+
+    Returns:
+        tuple: the schemas and the validator of the merged schema, to be
+        passed to :func:`_validate_schema`.
+    """
+    key = tuple(id(schema) for schema in schemas)
+    if key not in _combined_schemas:
+        merged = _merge_schemas(*[schema[0] for schema in schemas])
+        _combined_schemas[key] = (tuple(schema[0] for schema in schemas),
+                                  rapidjson.Validator(rapidjson.dumps(merged)))
+    return _combined_schemas[key]
+
+
+TX_SCHEMA_COMMON_CREATE = combine_schemas(TX_SCHEMA_COMMON, TX_SCHEMA_CREATE)
+TX_SCHEMA_COMMON_TRANSFER = combine_schemas(TX_SCHEMA_COMMON, TX_SCHEMA_TRANSFER)
+
+
+def _validate_schema(schema, body, raw=None):
+    """Validate data against a schema, or against the schemas combined
+    with :func:`combine_schemas`.
+
+    Args:
+        schema (tuple): the schema(s) and the fast validator.
+        body (dict): the data to validate.
+        raw (bytes): the JSON document ``body`` has been decoded from, if
+            any. It is validated as it is instead of serializing ``body``
+            again.
+    """
 
     # Note
     #
@@ -58,24 +129,28 @@ def _validate_schema(schema, body):
     # a helpful error message.
 
     try:
-        schema[1](rapidjson.dumps(body))
+        schema[1](rapidjson.dumps(body) if raw is None else raw)
     except ValueError as exc:
+        slow_schemas = schema[0] if isinstance(schema[0], tuple) else (schema[0],)
         try:
-            jsonschema.validate(body, schema[0])
+            for slow_schema in slow_schemas:
+                jsonschema.validate(body, slow_schema)
         except jsonschema.ValidationError as exc2:
             raise SchemaValidationError(str(exc2)) from exc2
         logger.warning('code problem: jsonschema did not raise an exception, wheras rapidjson raised %s', exc)
         raise SchemaValidationError(str(exc)) from exc
 
 
-def validate_transaction_schema(tx):
+def validate_transaction_schema(tx, raw=None):
     """Validate a transaction dict.
 
     TX_SCHEMA_COMMON contains properties that are common to all types of
     transaction. TX_SCHEMA_[TRANSFER|CREATE] add additional constraints on top.
+    Both are checked at once, against the raw JSON document ``raw`` if
+    given (see :func:`_validate_schema`).
     """
-    _validate_schema(TX_SCHEMA_COMMON, tx)
-    if tx['operation'] == 'TRANSFER':
-        _validate_schema(TX_SCHEMA_TRANSFER, tx)
+    operation = tx.get('operation') if isinstance(tx, dict) else None
+    if operation == 'TRANSFER':
+        _validate_schema(TX_SCHEMA_COMMON_TRANSFER, tx, raw)
     else:
-        _validate_schema(TX_SCHEMA_CREATE, tx)
+        _validate_schema(TX_SCHEMA_COMMON_CREATE, tx, raw)
@@ -0,0 +1,167 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Verification of the Ed25519 signatures of the fulfillments.
+
+The signatures of the transactions of a block are collected as
+``(public key, message, signature)`` triples, including the ones nested
+in threshold fulfillments, and verified on a pool of processes by
+:func:`verify_transactions` (see
+:class:`~bigchaindb.parallel_validation.SignatureVerifier`).
+
+The verdict of every signature verified in a process is kept in a
+bounded store that :func:`validate_fulfillment` consults before
+verifying a signature, so that the signatures of a transaction are
+verified once even if the transaction is validated several times.
+"""
+
+from cryptoconditions import Ed25519Sha256, ThresholdSha256
+from cryptoconditions.exceptions import ValidationError
+from nacl.exceptions import BadSignatureError
+from nacl.signing import VerifyKey
+
+from bigchaindb.common.memoize import MemoCache
+
+
+# maximum size (in bytes) of the verdicts kept in memory
+VERDICTS_MAX_BYTES = 2 ** 25
+# memory used by a verdict: its entry, the key tuple and its bytestrings
+VERDICT_SIZE = 384
+
+# verdict of every signature verified, by (public key, message, signature)
+verdicts = MemoCache('signature_verdicts', VERDICTS_MAX_BYTES)
+
+
+def verify_signature(public_key, message, signature):
+    """Return the verdict of a signature, verifying it if it has not been
+    verified yet.
+    """
+    key = (public_key, message, signature)
+    verdict = verdicts.get(key)
+    if verdict is None:
+        try:
+            VerifyKey(public_key).verify(message, signature=signature)
+            verdict = True
+        except BadSignatureError:
+            verdict = False
+        verdicts.put(key, verdict, VERDICT_SIZE)
+    return verdict
+
+
+def validate_fulfillment(fulfillment, message):
+    """Validate a fulfillment against a message, as
+    ``fulfillment.validate(message=message)`` does, using the verdicts of
+    the signatures verified already.
+
+    Raises:
+        :exc:`~cryptoconditions.exceptions.ValidationError`: If a threshold
+            fulfillment does not have the right number of subfulfillments.
+    """
+    if isinstance(fulfillment, Ed25519Sha256):
+        if fulfillment.signature is None:
+            return False
+        return verify_signature(fulfillment.public_key, message,
+                                fulfillment.signature)
+    if isinstance(fulfillment, ThresholdSha256):
+        fulfillments = [subcondition['body']
+                        for subcondition in fulfillment.subconditions
+                        if subcondition['type'] == 'fulfillment']
+        if len(fulfillments) < fulfillment.threshold:
+            raise ValidationError('Threshold not met')
+        if len(fulfillments) > fulfillment.threshold:
+            raise ValidationError('Fulfillment is not minimal')
+        return all(validate_fulfillment(subfulfillment, message)
+                   for subfulfillment in fulfillments)
+    return fulfillment.validate(message=message)
+
+
+def ed25519_signatures(fulfillment, message):
+    """Return the ``(public_key, message, signature)`` triples of the
+    Ed25519 fulfillments of a fulfillment, including the ones nested in
+    threshold fulfillments.
+
+    The structure of the fulfillment is checked as
+    :func:`validate_fulfillment` does, and the fulfillments of other types
+    are validated right away.
+
+    Raises:
+        :exc:`~cryptoconditions.exceptions.ValidationError`: If the
+            fulfillment is invalid regardless of its signatures.
+    """
+    if isinstance(fulfillment, Ed25519Sha256):
+        if fulfillment.signature is None:
+            raise ValidationError('Fulfillment is not signed')
+        return [(fulfillment.public_key, message, fulfillment.signature)]
+    if isinstance(fulfillment, ThresholdSha256):
+        fulfillments = [subcondition['body']
+                        for subcondition in fulfillment.subconditions
+                        if subcondition['type'] == 'fulfillment']
+        if len(fulfillments) < fulfillment.threshold:
+            raise ValidationError('Threshold not met')
+        if len(fulfillments) > fulfillment.threshold:
+            raise ValidationError('Fulfillment is not minimal')
+        return [triple
+                for subfulfillment in fulfillments
+                for triple in ed25519_signatures(subfulfillment, message)]
+    if not fulfillment.validate(message=message):
+        raise ValidationError('Fulfillment is invalid')
+    return []
+
+
+def transaction_signatures(tx):
+    """Return the ``(public_key, message, signature)`` triples of the
+    inputs of a transaction (dict), with the messages they sign as
+    :meth:`~bigchaindb.common.transaction.Transaction.inputs_valid`
+    derives them.
+
+    Raises:
+        :exc:`~cryptoconditions.exceptions.ValidationError`: If a
+            fulfillment is invalid regardless of its signatures.
+    """
+    from bigchaindb.common.transaction import Input, Transaction
+
+    _, serialized = Transaction._canonical_serializations(tx)
+    triples = []
+    for input_ in tx['inputs']:
+        input_ = Input.from_dict(input_)
+        message = Transaction._input_message(serialized, input_.fulfills)
+        triples.extend(ed25519_signatures(input_.fulfillment, message))
+    return triples
+
+
+def verify_signatures(triples):
+    """Verify ``(public_key, message, signature)`` triples.
+
+    Returns:
+        bool: whether all the signatures are valid.
+    """
+    for public_key, message, signature in triples:
+        try:
+            VerifyKey(public_key).verify(message, signature=signature)
+        except (BadSignatureError, ValueError, TypeError):
+            return False
+    return True
+
+
+def verify_transactions(transactions):
+    """Verify the signatures of transactions (dicts), e.g. a chunk of a
+    block, in a process of a pool.
+
+    Args:
+        transactions (list): ``(index, transaction)`` pairs.
+
+    Returns:
+        list: the indexes of the transactions whose signatures are
+        invalid, or that cannot be verified at all.
+    """
+    invalid = []
+    for index, tx in transactions:
+        try:
+            valid = verify_signatures(transaction_signatures(tx))
+        except Exception:
+            # malformed transactions are rejected by the validation as well
+            valid = False
+        if not valid:
+            invalid.append(index)
+    return invalid
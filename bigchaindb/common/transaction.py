@@ -8,12 +8,14 @@ payloads.
 Attributes:
     UnspentOutput (namedtuple): Object holding the information
         representing an unspent output.
+    BULK_CHUNKSIZE (int): Number of transactions sent at once to a process
+        of the pool of :func:`prepare_transactions`.
 
 """
+import multiprocessing as mp
 from collections import namedtuple
 from copy import deepcopy
-from functools import reduce, lru_cache
-import rapidjson
+from functools import reduce
 
 import base58
 from cryptoconditions import Fulfillment, ThresholdSha256, Ed25519Sha256
@@ -21,7 +23,9 @@ from cryptoconditions.exceptions import (
     ParsingError, ASN1DecodeError, ASN1EncodeError, UnsupportedTypeError)
 from sha3 import sha3_256
 
+from bigchaindb.common.block_context import BlockContext
 from bigchaindb.common.crypto import PrivateKey, hash_data
+from bigchaindb.common.signatures import validate_fulfillment
 from bigchaindb.common.exceptions import (KeypairMismatchException,
                                           InputDoesNotExist, DoubleSpend,
                                           InvalidHash, InvalidSignature,
@@ -31,6 +35,8 @@ from bigchaindb.common.utils import serialize
 from .memoize import memoize_from_dict, memoize_to_dict
 
 
+BULK_CHUNKSIZE = 64
+
 UnspentOutput = namedtuple(
     'UnspentOutput', (
         # TODO 'utxo_hash': sha3_256(f'{txid}{output_index}'.encode())
@@ -44,6 +50,15 @@ UnspentOutput = namedtuple(
 )
 
 
+def _sign_ed25519(fulfillment, message, private_key):
+    """Sign an Ed25519 fulfillment as ``fulfillment.sign`` does, but with a
+    :class:`~bigchaindb.common.crypto.PrivateKey` rather than the raw key,
+    so that the signing key is not derived again for every signature.
+    """
+    fulfillment.public_key = private_key.verify_key.encode()
+    fulfillment.signature = private_key.sign(message, encoding='bytes')
+
+
 class Input(object):
     """A Input is used to spend assets locked by an Output.
 
@@ -59,6 +74,10 @@ class Input(object):
                 Transaction.
     """
 
+    # a block creates many of them, they are kept small
+    __slots__ = ('_fulfillment', '_fulfillment_uri', 'fulfills',
+                 'owners_before')
+
     def __init__(self, fulfillment, owners_before, fulfills=None):
         """Create an instance of an :class:`~.Input`.
 
@@ -80,6 +99,17 @@ class Input(object):
         self.fulfills = fulfills
         self.owners_before = owners_before
 
+    @property
+    def fulfillment(self):
+        return self._fulfillment
+
+    @fulfillment.setter
+    def fulfillment(self, fulfillment):
+        self._fulfillment = fulfillment
+        # the URI the fulfillment has been parsed from, if any, so that it
+        # is neither serialized nor parsed again (see `from_dict`)
+        self._fulfillment_uri = None
+
     def __eq__(self, other):
         # TODO: If `other !== Fulfillment` return `False`
         return self.to_dict() == other.to_dict()
@@ -99,10 +129,12 @@ class Input(object):
             Returns:
                 dict: The Input as an alternative serialization format.
         """
-        try:
-            fulfillment = self.fulfillment.serialize_uri()
-        except (TypeError, AttributeError, ASN1EncodeError, ASN1DecodeError):
-            fulfillment = _fulfillment_to_details(self.fulfillment)
+        fulfillment = self._fulfillment_uri
+        if fulfillment is None:
+            try:
+                fulfillment = self.fulfillment.serialize_uri()
+            except (TypeError, AttributeError, ASN1EncodeError, ASN1DecodeError):
+                fulfillment = _fulfillment_to_details(self.fulfillment)
 
         try:
             # NOTE: `self.fulfills` can be `None` and that's fine
@@ -143,9 +175,11 @@ class Input(object):
                 InvalidSignature: If an Input's URI couldn't be parsed.
         """
         fulfillment = data['fulfillment']
+        fulfillment_uri = None
         if not isinstance(fulfillment, (Fulfillment, type(None))):
             try:
                 fulfillment = Fulfillment.from_uri(data['fulfillment'])
+                fulfillment_uri = data['fulfillment']
             except ASN1DecodeError:
                 # TODO Remove as it is legacy code, and simply fall back on
                 # ASN1DecodeError
@@ -155,7 +189,9 @@ class Input(object):
                 #       `Input.to_dict`
                 fulfillment = _fulfillment_from_details(data['fulfillment'])
         fulfills = TransactionLink.from_dict(data['fulfills'])
-        return cls(fulfillment, data['owners_before'], fulfills)
+        input_ = cls(fulfillment, data['owners_before'], fulfills)
+        input_._fulfillment_uri = fulfillment_uri
+        return input_
 
 
 def _fulfillment_to_details(fulfillment):
@@ -217,6 +253,8 @@ class TransactionLink(object):
             `txid`.
     """
 
+    __slots__ = ('txid', 'output')
+
     def __init__(self, txid=None, output=None):
         """Create an instance of a :class:`~.TransactionLink`.
 
@@ -295,6 +333,8 @@ class Output(object):
 
     MAX_AMOUNT = 9 * 10 ** 18
 
+    __slots__ = ('fulfillment', 'amount', 'public_keys')
+
     def __init__(self, fulfillment, public_keys=None, amount=1):
         """Create an instance of a :class:`~.Output`.
 
@@ -561,17 +601,58 @@ class Transaction(object):
         self.metadata = metadata
         self._id = hash_id
         self.tx_dict = tx_dict
+        # see `_canonical_serializations`
+        self._serializations = None
+
+    @property
+    def inputs(self):
+        """:obj:`list` of :class:`~.Input`: The inputs, built from
+        ``tx_dict`` on first access for a lazy view (see :meth:`view`).
+        """
+        if self._inputs is None:
+            self._inputs = [Input.from_dict(input_)
+                            for input_ in self.tx_dict['inputs']]
+        return self._inputs
+
+    @inputs.setter
+    def inputs(self, inputs):
+        self._inputs = inputs
+
+    @property
+    def outputs(self):
+        """:obj:`list` of :class:`~.Output`: The outputs, built from
+        ``tx_dict`` on first access for a lazy view (see :meth:`view`).
+        """
+        if self._outputs is None:
+            self._outputs = [Output.from_dict(output)
+                             for output in self.tx_dict['outputs']]
+        return self._outputs
+
+    @outputs.setter
+    def outputs(self, outputs):
+        self._outputs = outputs
 
     @property
     def unspent_outputs(self):
         """UnspentOutput: The outputs of this transaction, in a data
         structure containing relevant information for storing them in
         a UTXO set, and performing validation.
+
+        The outputs of a lazy view (see :meth:`view`) are read from
+        ``tx_dict`` without being built.
         """
         if self.operation == self.CREATE:
             self._asset_id = self._id
         elif self.operation == self.TRANSFER:
             self._asset_id = self.asset['id']
+        if self._outputs is None:
+            return (UnspentOutput(
+                transaction_id=self._id,
+                output_index=output_index,
+                amount=int(output['amount']),
+                asset_id=self._asset_id,
+                condition_uri=output['condition']['uri'],
+            ) for output_index, output in enumerate(self.tx_dict['outputs']))
         return (UnspentOutput(
             transaction_id=self._id,
             output_index=output_index,
@@ -585,7 +666,16 @@ class Transaction(object):
         """Tuple of :obj:`dict`: Inputs of this transaction. Each input
         is represented as a dictionary containing a transaction id and
         output index.
+
+        The inputs of a lazy view (see :meth:`view`) are read from
+        ``tx_dict`` without being built.
         """
+        if self._inputs is None:
+            return (
+                {'transaction_id': input_['fulfills']['transaction_id'],
+                 'output_index': input_['fulfills']['output_index']}
+                for input_ in self.tx_dict['inputs'] if input_['fulfills']
+            )
         return (
             input_.fulfills.to_dict()
             for input_ in self.inputs if input_.fulfills
@@ -776,6 +866,7 @@ class Transaction(object):
         if not isinstance(input_, Input):
             raise TypeError('`input_` must be a Input instance')
         self.inputs.append(input_)
+        self._serializations = None
 
     def add_output(self, output):
         """Adds an output to a Transaction's list of outputs.
@@ -788,6 +879,7 @@ class Transaction(object):
         if not isinstance(output, Output):
             raise TypeError('`output` must be an Output instance or None')
         self.outputs.append(output)
+        self._serializations = None
 
     def sign(self, private_keys):
         """Fulfills a previous Transaction's Output by signing Inputs.
@@ -814,6 +906,19 @@ class Transaction(object):
         if private_keys is None or not isinstance(private_keys, list):
             raise TypeError('`private_keys` must be a list instance')
 
+        return self._sign(self._key_pairs(private_keys))
+
+    @staticmethod
+    def _key_pairs(private_keys):
+        """Return the private keys to sign Inputs with, by public key.
+
+            Args:
+                private_keys (:obj:`list` of :obj:`str`): The private keys.
+
+            Returns:
+                dict: The :class:`~bigchaindb.common.crypto.PrivateKey`
+                objects by public key.
+        """
         # NOTE: Generate public keys from private keys and match them in a
         #       dictionary:
         #                   key:     public_key
@@ -829,21 +934,33 @@ class Transaction(object):
             # to decode to convert the bytestring into a python str
             return public_key.decode()
 
-        key_pairs = {gen_public_key(PrivateKey(private_key)):
-                     PrivateKey(private_key) for private_key in private_keys}
+        return {gen_public_key(private_key): private_key
+                for private_key in map(PrivateKey, private_keys)}
 
-        tx_dict = self.to_dict()
-        tx_dict = Transaction._remove_signatures(tx_dict)
-        tx_serialized = Transaction._to_str(tx_dict)
+    def _sign(self, key_pairs, copy=True):
+        """Sign the Inputs with keys returned by :meth:`_key_pairs`.
+
+            Args:
+                key_pairs (dict): The keys to sign the Transaction with.
+                copy (bool): Whether to sign copies of the Inputs rather
+                    than the Inputs themselves, which may share their
+                    fulfillments with other objects (see :meth:`to_inputs`).
+
+            Returns:
+                :class:`~bigchaindb.common.transaction.Transaction`
+        """
+        _, tx_serialized = Transaction._canonical_serializations(self.to_dict())
         for i, input_ in enumerate(self.inputs):
-            self.inputs[i] = self._sign_input(input_, tx_serialized, key_pairs)
+            self.inputs[i] = self._sign_input(input_, tx_serialized, key_pairs,
+                                              copy)
 
+        self._serializations = None
         self._hash()
 
         return self
 
     @classmethod
-    def _sign_input(cls, input_, message, key_pairs):
+    def _sign_input(cls, input_, message, key_pairs, copy=True):
         """Signs a single Input.
 
             Note:
@@ -857,19 +974,21 @@ class Transaction(object):
                     Input`) The Input to be signed.
                 message (str): The message to be signed
                 key_pairs (dict): The keys to sign the Transaction with.
+                copy (bool): Whether to sign a copy of the Input.
         """
         if isinstance(input_.fulfillment, Ed25519Sha256):
             return cls._sign_simple_signature_fulfillment(input_, message,
-                                                          key_pairs)
+                                                          key_pairs, copy)
         elif isinstance(input_.fulfillment, ThresholdSha256):
             return cls._sign_threshold_signature_fulfillment(input_, message,
-                                                             key_pairs)
+                                                             key_pairs, copy)
         else:
             raise ValueError("Fulfillment couldn't be matched to "
                              'Cryptocondition fulfillment type.')
 
     @classmethod
-    def _sign_simple_signature_fulfillment(cls, input_, message, key_pairs):
+    def _sign_simple_signature_fulfillment(cls, input_, message, key_pairs,
+                                           copy=True):
         """Signs a Ed25519Fulfillment.
 
             Args:
@@ -877,12 +996,15 @@ class Transaction(object):
                     Input`) The input to be signed.
                 message (str): The message to be signed
                 key_pairs (dict): The keys to sign the Transaction with.
+                copy (bool): Whether to sign a copy of the Input.
         """
         # NOTE: To eliminate the dangers of accidentally signing a condition by
         #       reference, we remove the reference of input_ here
         #       intentionally. If the user of this class knows how to use it,
         #       this should never happen, but then again, never say never.
-        input_ = deepcopy(input_)
+        if copy:
+            input_ = deepcopy(input_)
+        input_._fulfillment_uri = None
         public_key = input_.owners_before[0]
         message = sha3_256(message.encode())
         if input_.fulfills:
@@ -892,8 +1014,8 @@ class Transaction(object):
         try:
             # cryptoconditions makes no assumptions of the encoding of the
             # message to sign or verify. It only accepts bytestrings
-            input_.fulfillment.sign(
-                message.digest(), base58.b58decode(key_pairs[public_key].encode()))
+            _sign_ed25519(input_.fulfillment, message.digest(),
+                          key_pairs[public_key])
         except KeyError:
             raise KeypairMismatchException('Public key {} is not a pair to '
                                            'any of the private keys'
@@ -901,7 +1023,8 @@ class Transaction(object):
         return input_
 
     @classmethod
-    def _sign_threshold_signature_fulfillment(cls, input_, message, key_pairs):
+    def _sign_threshold_signature_fulfillment(cls, input_, message, key_pairs,
+                                              copy=True):
         """Signs a ThresholdSha256.
 
             Args:
@@ -909,8 +1032,11 @@ class Transaction(object):
                     Input`) The Input to be signed.
                 message (str): The message to be signed
                 key_pairs (dict): The keys to sign the Transaction with.
+                copy (bool): Whether to sign a copy of the Input.
         """
-        input_ = deepcopy(input_)
+        if copy:
+            input_ = deepcopy(input_)
+        input_._fulfillment_uri = None
         message = sha3_256(message.encode())
         if input_.fulfills:
             message.update('{}{}'.format(
@@ -943,8 +1069,7 @@ class Transaction(object):
             # cryptoconditions makes no assumptions of the encoding of the
             # message to sign or verify. It only accepts bytestrings
             for subffill in subffills:
-                subffill.sign(
-                    message.digest(), base58.b58decode(private_key.encode()))
+                _sign_ed25519(subffill, message.digest(), private_key)
         return input_
 
     def inputs_valid(self, outputs=None):
@@ -979,6 +1104,23 @@ class Transaction(object):
             raise TypeError('`operation` must be one of {}'
                             .format(allowed_ops))
 
+    def inputs_match(self, outputs):
+        """Tells whether the fulfillments of the Inputs match the
+        conditions of the given Outputs (the ones they spend), without
+        verifying the signatures, e.g. when they are verified on the pool
+        of :class:`~bigchaindb.parallel_validation.SignatureVerifier`.
+
+            Args:
+                outputs (:obj:`list` of :class:`~bigchaindb.common.
+                    transaction.Output`): The Outputs spent by the Inputs.
+
+            Returns:
+                bool: If all Inputs match.
+        """
+        return all(input_.fulfillment.condition_uri ==
+                   output.fulfillment.condition_uri
+                   for input_, output in zip(self.inputs, outputs))
+
     def _inputs_valid(self, output_condition_uris):
         """Validates an Input against a given set of Outputs.
 
@@ -998,10 +1140,10 @@ class Transaction(object):
             raise ValueError('Inputs and '
                              'output_condition_uris must have the same count')
 
-        tx_dict = self.tx_dict if self.tx_dict else self.to_dict()
-        tx_dict = Transaction._remove_signatures(tx_dict)
-        tx_dict['id'] = None
-        tx_serialized = Transaction._to_str(tx_dict)
+        if self._serializations is None:
+            tx_dict = self.tx_dict if self.tx_dict else self.to_dict()
+            self._serializations = Transaction._canonical_serializations(tx_dict)
+        _, tx_serialized = self._serializations
 
         def validate(i, output_condition_uri=None):
             """Validate input against output condition URI"""
@@ -1011,7 +1153,6 @@ class Transaction(object):
         return all(validate(i, cond)
                    for i, cond in enumerate(output_condition_uris))
 
-    @lru_cache(maxsize=16384)
     def _input_valid(self, input_, operation, message, output_condition_uri=None):
         """Validates a single Input against a single Output.
 
@@ -1031,11 +1172,15 @@ class Transaction(object):
                 bool: If the Input is valid.
         """
         ccffill = input_.fulfillment
-        try:
-            parsed_ffill = Fulfillment.from_uri(ccffill.serialize_uri())
-        except (TypeError, ValueError,
-                ParsingError, ASN1DecodeError, ASN1EncodeError):
-            return False
+        if input_._fulfillment_uri is not None:
+            # the fulfillment has been parsed from its URI already
+            parsed_ffill = ccffill
+        else:
+            try:
+                parsed_ffill = Fulfillment.from_uri(ccffill.serialize_uri())
+            except (TypeError, ValueError,
+                    ParsingError, ASN1DecodeError, ASN1EncodeError):
+                return False
 
         if operation == self.CREATE:
             # NOTE: In the case of a `CREATE` transaction, the
@@ -1044,20 +1189,24 @@ class Transaction(object):
         else:
             output_valid = output_condition_uri == ccffill.condition_uri
 
-        message = sha3_256(message.encode())
-        if input_.fulfills:
-            message.update('{}{}'.format(
-                input_.fulfills.txid, input_.fulfills.output).encode())
-
-        # NOTE: We pass a timestamp to `.validate`, as in case of a timeout
-        #       condition we'll have to validate against it
-
         # cryptoconditions makes no assumptions of the encoding of the
         # message to sign or verify. It only accepts bytestrings
-        ffill_valid = parsed_ffill.validate(message=message.digest())
+        message = Transaction._input_message(message, input_.fulfills)
+        # the verdicts of the signatures verified already are reused
+        ffill_valid = validate_fulfillment(parsed_ffill, message)
         return output_valid and ffill_valid
 
-    # This function is required by `lru_cache` to create a key for memoization
+    @staticmethod
+    def _input_message(tx_serialized, fulfills):
+        """Return the message signed by an Input: the hash of the
+        serialized transaction without signatures, and of the output it
+        spends, if any.
+        """
+        message = sha3_256(tx_serialized.encode())
+        if fulfills:
+            message.update('{}{}'.format(fulfills.txid, fulfills.output).encode())
+        return message.digest()
+
     def __hash__(self):
         return hash(self.id)
 
@@ -1065,12 +1214,27 @@ class Transaction(object):
     def to_dict(self):
         """Transforms the object to a Python dictionary.
 
+            The result is memoized and returned again by the next calls,
+            it must not be modified.
+
             Returns:
                 dict: The Transaction as an alternative serialization format.
         """
+        # the inputs and outputs of a lazy view that have not been built
+        # are copied from `tx_dict`: the result must not share them with
+        # the view, whose dict is memoized
+        if self._inputs is None:
+            inputs = deepcopy(self.tx_dict['inputs'])
+        else:
+            inputs = [input_.to_dict() for input_ in self._inputs]
+        if self._outputs is None:
+            outputs = deepcopy(self.tx_dict['outputs'])
+        else:
+            outputs = [output.to_dict() for output in self._outputs]
+
         return {
-            'inputs': [input_.to_dict() for input_ in self.inputs],
-            'outputs': [output.to_dict() for output in self.outputs],
+            'inputs': inputs,
+            'outputs': outputs,
             'operation': str(self.operation),
             'metadata': self.metadata,
             'asset': self.asset,
@@ -1156,39 +1320,82 @@ class Transaction(object):
                                    ' need to have the same asset id'))
         return asset_ids.pop()
 
+    @staticmethod
+    def _canonical_serializations(tx_dict):
+        """Serialize a transaction (dict) with its ``id`` set to ``None``,
+        with and without the fulfillments of its inputs.
+
+        Both strings are built in a single pass without copying the dict:
+        the values are serialized one by one, in the order of their keys,
+        so that the payloads (asset, metadata, outputs) are serialized once
+        and shared. The result is the same as serializing the modified
+        dicts with :meth:`_to_str`.
+
+            Args:
+                tx_dict (dict): The Transaction.
+
+            Returns:
+                tuple: the serialization whose hash is the id of the
+                transaction, and the message signed by its inputs.
+        """
+        body = []
+        message = []
+        for key in sorted(set(tx_dict).union(('id',))):
+            prefix = Transaction._to_str(key) + ':'
+            if key == 'id':
+                value = prefix + 'null'
+            elif key == 'inputs':
+                inputs = tx_dict['inputs']
+                body.append(prefix + Transaction._to_str(inputs))
+                if isinstance(inputs, list) and all(isinstance(input_, dict)
+                                                    for input_ in inputs):
+                    # NOTE: malformed inputs are rejected by the schema
+                    inputs = [dict(input_, fulfillment=None) for input_ in inputs]
+                message.append(prefix + Transaction._to_str(inputs))
+                continue
+            else:
+                value = prefix + Transaction._to_str(tx_dict[key])
+            body.append(value)
+            message.append(value)
+        return '{' + ','.join(body) + '}', '{' + ','.join(message) + '}'
+
     @staticmethod
     def validate_id(tx_body):
         """Validate the transaction ID of a transaction
 
             Args:
                 tx_body (dict): The Transaction to be transformed.
-        """
-        # NOTE: Remove reference to avoid side effects
-        # tx_body = deepcopy(tx_body)
-        tx_body = rapidjson.loads(rapidjson.dumps(tx_body))
 
+            Returns:
+                tuple: the canonical serializations of the transaction (see
+                :meth:`_canonical_serializations`).
+        """
         try:
             proposed_tx_id = tx_body['id']
         except KeyError:
             raise InvalidHash('No transaction id found!')
 
-        tx_body['id'] = None
-
-        tx_body_serialized = Transaction._to_str(tx_body)
-        valid_tx_id = Transaction._to_hash(tx_body_serialized)
+        serializations = Transaction._canonical_serializations(tx_body)
+        valid_tx_id = Transaction._to_hash(serializations[0])
 
         if proposed_tx_id != valid_tx_id:
             err_msg = ("The transaction's id '{}' isn't equal to "
                        "the hash of its body, i.e. it's not valid.")
             raise InvalidHash(err_msg.format(proposed_tx_id))
+        return serializations
 
     @classmethod
     @memoize_from_dict
-    def from_dict(cls, tx, skip_schema_validation=True):
+    def from_dict(cls, tx, skip_schema_validation=True, raw=None):
         """Transforms a Python dictionary to a Transaction object.
 
             Args:
                 tx_body (dict): The Transaction to be transformed.
+                skip_schema_validation (bool): whether to skip the
+                    validation of the id and of the schema.
+                raw (bytes, optional): The JSON document the Transaction
+                    has been decoded from, validated against the schema
+                    instead of serializing the dict again.
 
             Returns:
                 :class:`~bigchaindb.common.transaction.Transaction`
@@ -1196,14 +1403,42 @@ class Transaction(object):
         operation = tx.get('operation', Transaction.CREATE) if isinstance(tx, dict) else Transaction.CREATE
         cls = Transaction.resolve_class(operation)
 
+        serializations = None
         if not skip_schema_validation:
-            cls.validate_id(tx)
-            cls.validate_schema(tx)
+            serializations = cls.validate_id(tx)
+            cls.validate_schema(tx, raw)
 
         inputs = [Input.from_dict(input_) for input_ in tx['inputs']]
         outputs = [Output.from_dict(output) for output in tx['outputs']]
-        return cls(tx['operation'], tx['asset'], inputs, outputs,
-                   tx['metadata'], tx['version'], hash_id=tx['id'], tx_dict=tx)
+        transaction = cls(tx['operation'], tx['asset'], inputs, outputs,
+                          tx['metadata'], tx['version'], hash_id=tx['id'], tx_dict=tx)
+        # the signed message is computed along with the id
+        transaction._serializations = serializations
+        return transaction
+
+    @classmethod
+    def view(cls, tx):
+        """Return a lazy view of a transaction (dict) known to be valid,
+        e.g. one read from the database.
+
+        Unlike :meth:`from_dict`, its inputs and outputs are only built
+        (and their fulfillments parsed) when they are accessed, e.g. to
+        validate or sign the transaction: serving it with :meth:`to_dict`
+        does not parse any crypto-condition.
+
+            Args:
+                tx (dict): The Transaction to wrap.
+
+            Returns:
+                :class:`~bigchaindb.common.transaction.Transaction`
+        """
+        cls = Transaction.resolve_class(tx['operation'])
+        transaction = cls(tx['operation'], tx['asset'], None, None,
+                          tx['metadata'], tx['version'], hash_id=tx['id'],
+                          tx_dict=tx)
+        transaction.inputs = None
+        transaction.outputs = None
+        return transaction
 
     @classmethod
     def from_db(cls, bigchain, tx_dict_list):
@@ -1211,6 +1446,11 @@ class Transaction(object):
         from the database. It checks what asset_id to retrieve, retrieves the
         asset from the asset table and reconstructs the transaction.
 
+        Transaction dicts that are already complete (as returned by
+        ``get_full_transaction(s)``, i.e. with a ``metadata`` key) are used
+        as they are, without querying the database. The transactions are
+        returned as lazy views (see :meth:`view`).
+
         Args:
             bigchain (:class:`~bigchaindb.tendermint.BigchainDB`): An instance
                 of BigchainDB used to perform database queries.
@@ -1229,31 +1469,32 @@ class Transaction(object):
         tx_map = {}
         tx_ids = []
         for tx in tx_dict_list:
-            tx.update({'metadata': None})
+            if 'metadata' not in tx:
+                tx_ids.append(tx['id'])
+                tx.update({'metadata': None})
             tx_map[tx['id']] = tx
-            tx_ids.append(tx['id'])
 
-        assets = list(bigchain.get_assets(tx_ids))
-        for asset in assets:
-            if asset is not None:
-                tx = tx_map[asset['id']]
-                del asset['id']
-                tx['asset'] = asset
+        if tx_ids:
+            assets = list(bigchain.get_assets(tx_ids))
+            for asset in assets:
+                if asset is not None:
+                    tx = tx_map[asset['id']]
+                    del asset['id']
+                    tx['asset'] = asset
 
-        tx_ids = list(tx_map.keys())
-        metadata_list = list(bigchain.get_metadata(tx_ids))
-        for metadata in metadata_list:
-            tx = tx_map[metadata['id']]
-            tx.update({'metadata': metadata.get('metadata')})
+            metadata_list = list(bigchain.get_metadata(tx_ids))
+            for metadata in metadata_list:
+                tx = tx_map[metadata['id']]
+                tx.update({'metadata': metadata.get('metadata')})
 
         if return_list:
             tx_list = []
             for tx_id, tx in tx_map.items():
-                tx_list.append(cls.from_dict(tx))
+                tx_list.append(cls.view(tx))
             return tx_list
         else:
             tx = list(tx_map.values())[0]
-            return cls.from_dict(tx)
+            return cls.view(tx)
 
     type_registry = {}
 
@@ -1268,10 +1509,12 @@ class Transaction(object):
         return Transaction.type_registry.get(operation, create_txn_class)
 
     @classmethod
-    def validate_schema(cls, tx):
+    def validate_schema(cls, tx, raw=None):
         pass
 
-    def validate_transfer_inputs(self, bigchain, current_transactions=[]):
+    def validate_transfer_inputs(self, bigchain, current_transactions=[],
+                                 verify_signatures=True):
+        current_transactions = BlockContext.wrap(current_transactions)
         # store the inputs so that we can check if the asset ids match
         input_txs = []
         input_conditions = []
@@ -1280,9 +1523,7 @@ class Transaction(object):
             input_tx = bigchain.get_transaction(input_txid)
 
             if input_tx is None:
-                for ctxn in current_transactions:
-                    if ctxn.id == input_txid:
-                        input_tx = ctxn
+                input_tx = current_transactions.get_transaction(input_txid)
 
             if input_tx is None:
                 raise InputDoesNotExist("input `{}` doesn't exist"
@@ -1319,7 +1560,80 @@ class Transaction(object):
                                ' in the outputs `{}`')
                               .format(input_amount, output_amount))
 
-        if not self.inputs_valid(input_conditions):
+        if verify_signatures:
+            if not self.inputs_valid(input_conditions):
+                raise InvalidSignature('Transaction signature is invalid.')
+        elif not self.inputs_match(input_conditions):
+            # the signatures have been verified already, but not against
+            # the outputs spent
             raise InvalidSignature('Transaction signature is invalid.')
 
         return True
+
+
+# keys of the processes of the pool of `prepare_transactions`
+_bulk_key_pairs = None
+
+
+def _init_bulk_signer(private_keys):
+    global _bulk_key_pairs
+    _bulk_key_pairs = Transaction._key_pairs(private_keys)
+
+
+def _prepare_transaction(spec, key_pairs=None):
+    """Build a transaction from a spec (see :func:`prepare_transactions`),
+    sign it and return its dict.
+    """
+    spec = dict(spec)
+    operation = spec.pop('operation', Transaction.CREATE)
+    if operation == Transaction.CREATE:
+        transaction = Transaction.create(**spec)
+    elif operation == Transaction.TRANSFER:
+        transaction = Transaction.transfer(**spec)
+    else:
+        raise ValueError('`operation` must be one of {}'.format(
+            ', '.join(Transaction.ALLOWED_OPERATIONS)))
+
+    # the Inputs are new objects (`transfer` copies the ones it is given),
+    # they can be signed as they are
+    transaction._sign(key_pairs or _bulk_key_pairs, copy=False)
+    return transaction.to_dict()
+
+
+def prepare_transactions(specs, private_keys, processes=None,
+                         chunksize=BULK_CHUNKSIZE):
+    """Build and sign many transactions, e.g. to mint or migrate assets in
+    bulk, in a pool of processes.
+
+    The signing keys are derived once per process, and the Inputs are not
+    copied before being signed.
+
+        Args:
+            specs (iterable): The transactions to build, as dicts with the
+                ``operation`` (``CREATE`` by default) and the keyword
+                arguments of :meth:`Transaction.create` or
+                :meth:`Transaction.transfer`.
+            private_keys (:obj:`list` of :obj:`str`): All the private keys
+                needed to sign the transactions.
+            processes (int): Number of processes, the number of CPUs by
+                default. The transactions are prepared in the current
+                process if it is ``1``.
+            chunksize (int): Number of transactions sent at once to a
+                process.
+
+        Yields:
+            dict: The signed transactions, ready to be posted, in the order
+            of ``specs``.
+    """
+    if not isinstance(private_keys, list):
+        raise TypeError('`private_keys` must be a list instance')
+
+    if processes == 1:
+        key_pairs = Transaction._key_pairs(private_keys)
+        for spec in specs:
+            yield _prepare_transaction(spec, key_pairs)
+        return
+
+    with mp.Pool(processes, initializer=_init_bulk_signer,
+                 initargs=(private_keys,)) as pool:
+        yield from pool.imap(_prepare_transaction, specs, chunksize)
@@ -10,6 +10,10 @@ import bigchaindb
 from bigchaindb.common.exceptions import ValidationError
 
 
+# key names forbidden by MongoDB, see `validate_key`
+INVALID_KEY = re.compile(r'^[$]|\.|\x00')
+
+
 def gen_timestamp():
     """The Unix time, rounded to the nearest second.
         See https://en.wikipedia.org/wiki/Unix_time
@@ -55,7 +59,8 @@ def deserialize(data):
     return rapidjson.loads(data)
 
 
-def validate_txn_obj(obj_name, obj, key, validation_fun):
+def validate_txn_obj(obj_name, obj, key, validation_fun, value_key=None,
+                     value_validation_fun=None):
     """Validate value of `key` in `obj` using `validation_fun`.
 
         Args:
@@ -64,6 +69,10 @@ def validate_txn_obj(obj_name, obj, key, validation_fun):
             key (str): key to be validated in `obj`.
             validation_fun (function): function used to validate the value
             of `key`.
+            value_key (str, optional): key whose (nested) values are
+            validated in the same walk (see `validate_all_keys`).
+            value_validation_fun (function, optional): function used to
+            validate the values of `value_key`.
 
         Returns:
             None: indicates validation successful
@@ -76,17 +85,27 @@ def validate_txn_obj(obj_name, obj, key, validation_fun):
     if backend == 'localmongodb':
         data = obj.get(key, {})
         if isinstance(data, dict):
-            validate_all_keys(obj_name, data, validation_fun)
+            validate_all_keys(obj_name, data, validation_fun, value_key,
+                              value_validation_fun)
 
 
-def validate_all_keys(obj_name, obj, validation_fun):
+def validate_all_keys(obj_name, obj, validation_fun, value_key=None,
+                      value_validation_fun=None):
     """Validate all (nested) keys in `obj` by using `validation_fun`.
 
+        The values of the keys named `value_key`, if given, are validated
+        with `value_validation_fun` during the same walk, so that a payload
+        is only gone through once. The walk does not recurse, deeply nested
+        payloads are fine.
+
         Args:
             obj_name (str): name for `obj` being validated.
             obj (dict): dictionary object.
             validation_fun (function): function used to validate the value
             of `key`.
+            value_key (str, optional): key whose values are to be validated.
+            value_validation_fun (function, optional): function used to
+            validate the values of `value_key`.
 
         Returns:
             None: indicates validation successful
@@ -94,10 +113,17 @@ def validate_all_keys(obj_name, obj, validation_fun):
         Raises:
             ValidationError: `validation_fun` will raise this error on failure
     """
-    for key, value in obj.items():
-        validation_fun(obj_name, key)
-        if isinstance(value, dict):
-            validate_all_keys(obj_name, value, validation_fun)
+    stack = [iter(obj.items())]
+    while stack:
+        for key, value in stack[-1]:
+            validation_fun(obj_name, key)
+            if key == value_key:
+                value_validation_fun(value)
+            if isinstance(value, dict):
+                stack.append(iter(value.items()))
+                break
+        else:
+            stack.pop()
 
 
 def validate_all_values_for_key(obj, key, validation_fun):
@@ -135,7 +161,7 @@ def validate_key(obj_name, key):
         Raises:
             ValidationError: will raise exception in case of regex match.
     """
-    if re.search(r'^[$]|\.|\x00', key):
+    if INVALID_KEY.search(key):
         error_str = ('Invalid key name "{}" in {} object. The '
                      'key name cannot contain characters '
                      '".", "$" or null characters').format(key, obj_name)
@@ -21,11 +21,15 @@ from abci.types_pb2 import (
 
 from bigchaindb import BigchainDB
 from bigchaindb.elections.election import Election
+from bigchaindb.common.block_context import BlockContext
 from bigchaindb.version import __tm_supported_versions__
 from bigchaindb.utils import tendermint_version_is_compatible
 from bigchaindb.tendermint_utils import (decode_transaction,
                                          calculate_hash)
 from bigchaindb.lib import Block
+from bigchaindb.metrics import registry as metrics, timed
+from bigchaindb.utxo import UTXOSet
+from bigchaindb.validation_cache import ValidationCache
 import bigchaindb.upsert_validator.validator_utils as vutils
 from bigchaindb.events import EventTypes, Event
 
@@ -48,9 +52,15 @@ class App(BaseApplication):
         self.block_txn_ids = []
         self.block_txn_hash = ''
         self.block_transactions = []
+        self.block_context = BlockContext()
+        # transactions that passed `check_tx`, their signatures are not
+        # verified again in `deliver_tx`
+        self.validation_cache = ValidationCache()
         self.validators = None
         self.new_height = None
         self.chain = self.bigchaindb.get_latest_abci_chain()
+        if self.bigchaindb.utxoset is None:
+            self.bigchaindb.utxoset = UTXOSet(self.bigchaindb.connection)
 
     def log_abci_migration_error(self, chain_id, validators):
         logger.error(f'An ABCI chain migration is in process. ' +
@@ -134,6 +144,7 @@ class App(BaseApplication):
             r.last_block_app_hash = b''
         return r
 
+    @timed('abci.check_tx')
     def check_tx(self, raw_transaction):
         """Validate the transaction before entry into
         the mempool.
@@ -145,14 +156,17 @@ class App(BaseApplication):
         self.abort_if_abci_chain_is_not_synced()
 
         logger.debug('check_tx: %s', raw_transaction)
-        transaction = decode_transaction(raw_transaction)
-        if self.bigchaindb.is_valid_transaction(transaction):
+        transaction = self.bigchaindb.is_valid_transaction(
+            decode_transaction(raw_transaction), raw=raw_transaction)
+        if transaction:
             logger.debug('check_tx: VALID')
+            self.validation_cache.add(transaction.id, raw_transaction)
             return ResponseCheckTx(code=CodeTypeOk)
         else:
             logger.debug('check_tx: INVALID')
             return ResponseCheckTx(code=CodeTypeError)
 
+    @timed('abci.begin_block')
     def begin_block(self, req_begin_block):
         """Initialize list of transaction.
         Args:
@@ -168,8 +182,12 @@ class App(BaseApplication):
 
         self.block_txn_ids = []
         self.block_transactions = []
+        # index of the transactions accepted in this block, used to
+        # validate the following ones against them
+        self.block_context = BlockContext()
         return ResponseBeginBlock()
 
+    @timed('abci.deliver_tx')
     def deliver_tx(self, raw_transaction):
         """Validate the transaction before mutating the state.
 
@@ -180,18 +198,25 @@ class App(BaseApplication):
         self.abort_if_abci_chain_is_not_synced()
 
         logger.debug('deliver_tx: %s', raw_transaction)
+        metrics.count_transaction(len(raw_transaction))
+        dict_transaction = decode_transaction(raw_transaction)
+        verified = self.validation_cache.is_verified(dict_transaction.get('id'),
+                                                     raw_transaction)
         transaction = self.bigchaindb.is_valid_transaction(
-            decode_transaction(raw_transaction), self.block_transactions)
+            dict_transaction, self.block_context, verified, raw_transaction)
 
         if not transaction:
             logger.debug('deliver_tx: INVALID')
+            metrics.count_rejected()
             return ResponseDeliverTx(code=CodeTypeError)
         else:
             logger.debug('storing tx')
             self.block_txn_ids.append(transaction.id)
             self.block_transactions.append(transaction)
+            self.block_context.add(transaction)
             return ResponseDeliverTx(code=CodeTypeOk)
 
+    @timed('abci.end_block')
     def end_block(self, request_end_block):
         """Calculate block hash using transaction ids and previous block
         hash to be stored in the next block.
@@ -222,12 +247,14 @@ class App(BaseApplication):
         else:
             self.block_txn_hash = block['app_hash']
 
-        validator_update = Election.process_block(self.bigchaindb,
-                                                  self.new_height,
-                                                  self.block_transactions)
+        with metrics.timer('abci.end_block.process_block'):
+            validator_update = Election.process_block(self.bigchaindb,
+                                                      self.new_height,
+                                                      self.block_transactions)
 
         return ResponseEndBlock(validator_updates=validator_update)
 
+    @timed('abci.commit')
     def commit(self):
         """Store the new height and along with block hash."""
 
@@ -235,16 +262,18 @@ class App(BaseApplication):
 
         data = self.block_txn_hash.encode('utf-8')
 
-        # register a new block only when new transactions are received
-        if self.block_txn_ids:
-            self.bigchaindb.store_bulk_transactions(self.block_transactions)
-
         block = Block(app_hash=self.block_txn_hash,
                       height=self.new_height,
                       transactions=self.block_txn_ids)
         # NOTE: storing the block should be the last operation during commit
-        # this effects crash recovery. Refer BEP#8 for details
-        self.bigchaindb.store_block(block._asdict())
+        # this effects crash recovery. Refer BEP#8 for details. The
+        # transactions and the utxos are written before it.
+        self.bigchaindb.commit_block(block._asdict(), self.block_transactions)
+
+        for txid in self.block_txn_ids:
+            self.validation_cache.discard(txid)
+        self.validation_cache.set_height(self.new_height)
+        metrics.end_block(self.new_height)
 
         logger.debug('Commit-ing new block with hash: apphash=%s ,'
                      'height=%s, txn ids=%s', data, self.new_height,
@@ -275,4 +304,6 @@ def rollback(b):
     # NOTE: the pre-commit state is always at most 1 block ahead of the commited state
     if latest_block['height'] < pre_commit['height']:
         Election.rollback(b, pre_commit['height'], pre_commit['transactions'])
+        utxoset = b.utxoset if b.utxoset is not None else UTXOSet(b.connection)
+        utxoset.rollback(pre_commit['transactions'])
         b.delete_transactions(pre_commit['transactions'])
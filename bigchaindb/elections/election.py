@@ -8,6 +8,7 @@ from uuid import uuid4
 
 from bigchaindb import backend
 from bigchaindb.elections.vote import Vote
+from bigchaindb.common.block_context import BlockContext
 from bigchaindb.common.exceptions import (InvalidSignature,
                                           MultipleInputsError,
                                           InvalidProposer,
@@ -17,6 +18,7 @@ from bigchaindb.tendermint_utils import key_from_base64, public_key_to_base64
 from bigchaindb.common.crypto import (public_key_from_ed25519_key)
 from bigchaindb.common.transaction import Transaction
 from bigchaindb.common.schema import (_validate_schema,
+                                      combine_schemas,
                                       TX_SCHEMA_COMMON,
                                       TX_SCHEMA_CREATE)
 
@@ -102,7 +104,7 @@ class Election(Transaction):
 
         Args:
             :param bigchain: (BigchainDB) an instantiated bigchaindb.lib.BigchainDB object.
-            :param current_transactions: (list) A list of transactions to be validated along with the election
+            :param current_transactions: (BlockContext) The transactions to be validated along with the election
 
         Returns:
             Election: a Election object or an object of the derived Election subclass.
@@ -112,8 +114,8 @@ class Election(Transaction):
         """
         input_conditions = []
 
-        duplicates = any(txn for txn in current_transactions if txn.id == self.id)
-        if bigchain.is_committed(self.id) or duplicates:
+        duplicates = BlockContext.wrap(current_transactions).get_transaction(self.id)
+        if duplicates or bigchain.is_committed(self.id):
             raise DuplicateTransaction('transaction `{}` already exists'
                                        .format(self.id))
 
@@ -149,14 +151,14 @@ class Election(Transaction):
         return election
 
     @classmethod
-    def validate_schema(cls, tx):
+    def validate_schema(cls, tx, raw=None):
         """Validate the election transaction. Since `ELECTION` extends `CREATE` transaction, all the validations for
         `CREATE` transaction should be inherited
         """
-        _validate_schema(TX_SCHEMA_COMMON, tx)
-        _validate_schema(TX_SCHEMA_CREATE, tx)
+        schemas = [TX_SCHEMA_COMMON, TX_SCHEMA_CREATE]
         if cls.TX_SCHEMA_CUSTOM:
-            _validate_schema(cls.TX_SCHEMA_CUSTOM, tx)
+            schemas.append(cls.TX_SCHEMA_CUSTOM)
+        _validate_schema(combine_schemas(*schemas), tx, raw)
 
     @classmethod
     def create(cls, tx_signers, recipients, metadata=None, asset=None):
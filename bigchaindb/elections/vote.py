@@ -4,6 +4,7 @@
 
 from bigchaindb.common.transaction import Transaction
 from bigchaindb.common.schema import (_validate_schema,
+                                      combine_schemas,
                                       TX_SCHEMA_COMMON,
                                       TX_SCHEMA_TRANSFER,
                                       TX_SCHEMA_VOTE)
@@ -46,13 +47,12 @@ class Vote(Transaction):
         return election_vote
 
     @classmethod
-    def validate_schema(cls, tx):
+    def validate_schema(cls, tx, raw=None):
         """Validate the validator election vote transaction. Since `VOTE` extends `TRANSFER`
            transaction, all the validations for `CREATE` transaction should be inherited
         """
-        _validate_schema(TX_SCHEMA_COMMON, tx)
-        _validate_schema(TX_SCHEMA_TRANSFER, tx)
-        _validate_schema(cls.TX_SCHEMA_CUSTOM, tx)
+        _validate_schema(combine_schemas(TX_SCHEMA_COMMON, TX_SCHEMA_TRANSFER,
+                                         cls.TX_SCHEMA_CUSTOM), tx, raw)
 
     @classmethod
     def create(cls, tx_signers, recipients, metadata=None, asset=None):
@@ -8,24 +8,20 @@ MongoDB.
 """
 import logging
 from collections import namedtuple
-from uuid import uuid4
 import rapidjson
 
-try:
-    from hashlib import sha3_256
-except ImportError:
-    # NOTE: neeeded for Python < 3.6
-    from sha3 import sha3_256
-
-import requests
-
 import bigchaindb
 from bigchaindb import backend, config_utils, fastquery
 from bigchaindb.models import Transaction
+from bigchaindb.common import memoize
+from bigchaindb.common.block_context import BlockContext
 from bigchaindb.common.exceptions import (SchemaValidationError,
                                           ValidationError,
                                           DoubleSpend)
-from bigchaindb.tendermint_utils import encode_transaction, merkleroot
+from bigchaindb.metrics import registry as metrics
+from bigchaindb.tendermint_rpc import RPCError, TendermintRPC
+from bigchaindb.tendermint_utils import encode_transaction
+from bigchaindb.utxo import MerkleTree, leaf_hash
 from bigchaindb import exceptions as core_exceptions
 from bigchaindb.validation import BaseValidationRules
 
@@ -63,6 +59,8 @@ class BigchainDB(object):
         self.tendermint_host = bigchaindb.config['tendermint']['host']
         self.tendermint_port = bigchaindb.config['tendermint']['port']
         self.endpoint = 'http://{}:{}/'.format(self.tendermint_host, self.tendermint_port)
+        # connections to Tendermint, opened when first needed
+        self._rpc = None
 
         validationPlugin = bigchaindb.config.get('validation_plugin')
 
@@ -72,29 +70,72 @@ class BigchainDB(object):
             self.validation = BaseValidationRules
 
         self.connection = connection if connection else backend.connect(**bigchaindb.config['database'])
+        # in-memory UTXO set, attached by the ABCI application (see
+        # :class:`~bigchaindb.utxo.UTXOSet`)
+        self.utxoset = None
+        # committed state fetched ahead of validation, see `prefetch`
+        self._transaction_cache = {}
+        self._spent_cache = {}
 
-    def post_transaction(self, transaction, mode):
-        """Submit a valid transaction to the mempool."""
+    @property
+    def rpc(self):
+        """The :class:`~bigchaindb.tendermint_rpc.TendermintRPC` client of
+        the Tendermint node.
+        """
+        if self._rpc is None:
+            self._rpc = TendermintRPC(self.endpoint)
+        return self._rpc
+
+    def _check_mode(self, mode):
         if not mode or mode not in self.mode_list:
             raise ValidationError('Mode must be one of the following {}.'
                                   .format(', '.join(self.mode_list)))
 
+    @staticmethod
+    def _encode_transaction(transaction):
+        if isinstance(transaction, dict):
+            return encode_transaction(transaction)
         tx_dict = transaction.tx_dict if transaction.tx_dict else transaction.to_dict()
-        payload = {
-            'method': mode,
-            'jsonrpc': '2.0',
-            'params': [encode_transaction(tx_dict)],
-            'id': str(uuid4())
-        }
-        # TODO: handle connection errors!
-        return requests.post(self.endpoint, json=payload)
+        return encode_transaction(tx_dict)
+
+    def post_transaction(self, transaction, mode):
+        """Submit a valid transaction to the mempool.
+
+        Raises:
+            :exc:`~bigchaindb.tendermint_rpc.RPCError`: if Tendermint
+                cannot be reached.
+        """
+        self._check_mode(mode)
+        return self.rpc.post(self.rpc.request(mode, self._encode_transaction(transaction)))
 
     def write_transaction(self, transaction, mode):
         # This method offers backward compatibility with the Web API.
         """Submit a valid transaction to the mempool."""
-        response = self.post_transaction(transaction, mode)
+        try:
+            response = self.post_transaction(transaction, mode)
+        except RPCError as exc:
+            logger.warning(exc)
+            return (503, 'Tendermint is unavailable')
         return self._process_post_response(response.json(), mode)
 
+    def write_transactions(self, transactions, mode):
+        """Submit valid transactions to the mempool, in JSON-RPC batches.
+
+        Returns:
+            list: the ``(status_code, message)`` of every transaction, as
+            returned by :meth:`write_transaction`.
+        """
+        self._check_mode(mode)
+        calls = [(mode, [self._encode_transaction(transaction)])
+                 for transaction in transactions]
+        try:
+            responses = self.rpc.call_batch(calls)
+        except RPCError as exc:
+            logger.warning(exc)
+            return [(503, 'Tendermint is unavailable')] * len(calls)
+        return [self._process_post_response(response, mode)
+                for response in responses]
+
     def _process_post_response(self, response, mode):
         logger.debug(response)
 
@@ -106,6 +147,8 @@ class BigchainDB(object):
 
             if 'Tx already exists in cache' in data:
                 status_code = 400
+            elif 'mempool is full' in data.lower():
+                status_code = 503
 
             return (status_code, message + ' - ' + data)
 
@@ -122,7 +165,11 @@ class BigchainDB(object):
 
         return (202, '')
 
-    def store_bulk_transactions(self, transactions):
+    @staticmethod
+    def _split_transactions(transactions):
+        """Split transactions into the documents to store in the
+        ``transactions``, ``assets`` and ``metadata`` collections.
+        """
         txns = []
         assets = []
         txn_metadatas = []
@@ -137,15 +184,81 @@ class BigchainDB(object):
             txn_metadatas.append({'id': transaction['id'],
                                   'metadata': metadata})
             txns.append(transaction)
+        return txns, assets, txn_metadatas
+
+    def store_bulk_transactions(self, transactions):
+        txns, assets, txn_metadatas = self._split_transactions(transactions)
 
         backend.query.store_metadatas(self.connection, txn_metadatas)
         if assets:
             backend.query.store_assets(self.connection, assets)
         return backend.query.store_transactions(self.connection, txns)
 
+    def commit_block(self, block, transactions):
+        """Store a new block along with its transactions and the changes
+        they make to the UTXO set, with one bulk write per collection.
+
+        The block is written last (see BEP#8). If a replica set is
+        configured, all the writes are done in a single multi-document
+        transaction when the deployment supports it.
+
+        Args:
+            block (dict): block with current height and block hash.
+            transactions (list): list of
+                :obj:`~bigchaindb.models.Transaction` of the block.
+
+        Returns:
+            dict: the time spent writing to each collection, in seconds.
+        """
+        txns, assets, txn_metadatas = self._split_transactions(transactions)
+
+        unspent_outputs, spent_outputs = [], []
+        if self.utxoset is not None:
+            self.utxoset.update(transactions)
+            unspent_outputs, spent_outputs = self.utxoset.pop_changes()
+
+        try:
+            timings = backend.query.commit_block(
+                self.connection, block,
+                transactions=txns, assets=assets, metadata=txn_metadatas,
+                unspent_outputs=unspent_outputs, spent_outputs=spent_outputs,
+                session=self.connection.replicaset is not None)
+        except Exception:
+            # the in-memory set no longer matches the database, reload it
+            if self.utxoset is not None:
+                self.utxoset.reset()
+            raise
+        logger.debug('Block %s written in %s', block['height'],
+                     ', '.join('{}: {:.4f}s'.format(name, seconds)
+                               for name, seconds in timings.items()))
+        for name, seconds in timings.items():
+            metrics.observe('backend.query.commit_block.{}'.format(name), seconds)
+        return timings
+
     def delete_transactions(self, txs):
+        for txid in txs:
+            memoize.invalidate(txid)
         return backend.query.delete_transactions(self.connection, txs)
 
+    def rebuild_transaction_heights(self):
+        """Store the height of their block on the committed transactions
+        that do not have it (e.g. the node was running a version that did
+        not store it), once.
+        """
+        count = backend.query.rebuild_transaction_heights(self.connection)
+        if count:
+            logger.info('Stored the height on the transactions of %s blocks',
+                        count)
+
+    def rebuild_owner_outputs(self):
+        """Fill the ``owner_outputs`` collection from the stored
+        transactions (e.g. the node was running a version that did not
+        maintain it), once.
+        """
+        count = backend.query.rebuild_owner_outputs(self.connection)
+        if count:
+            logger.info('Rebuilt the owner outputs of %s transactions', count)
+
     def update_utxoset(self, transaction):
         """Update the UTXO set given ``transaction``. That is, remove
         the outputs that the given ``transaction`` spends, and add the
@@ -180,35 +293,27 @@ class BigchainDB(object):
         """Returns the merkle root of the utxoset. This implies that
         the utxoset is first put into a merkle tree.
 
-        For now, the merkle tree and its root will be computed each
-        time. This obviously is not efficient and a better approach
-        that limits the repetition of the same computation when
-        unnecesary should be sought. For instance, future optimizations
-        could simply re-compute the branches of the tree that were
-        affected by a change.
-
         The transaction hash (id) and output index should be sufficient
         to uniquely identify a utxo, and consequently only that
         information from a utxo record is needed to compute the merkle
-        root. Hence, each node of the merkle tree should contain the
+        root. Hence, each leaf of the merkle tree is the hash of the
         tuple (txid, output_index).
 
-        .. important:: The leaves of the tree will need to be sorted in
-            some kind of lexicographical order.
+        If an in-memory UTXO set is attached, its incrementally updated
+        tree is used and only the branches affected by the latest
+        changes are re-computed. Otherwise the tree is built from the
+        ``utxos`` collection.
 
         Returns:
             str: Merkle root in hexadecimal form.
         """
+        if self.utxoset is not None:
+            return self.utxoset.merkle_root
+
         utxoset = backend.query.get_unspent_outputs(self.connection)
-        # TODO Once ready, use the already pre-computed utxo_hash field.
-        # See common/transactions.py for details.
-        hashes = [
-            sha3_256(
-                '{}{}'.format(utxo['transaction_id'], utxo['output_index']).encode()
-            ).digest() for utxo in utxoset
-        ]
-        # TODO Notice the sorted call!
-        return merkleroot(sorted(hashes))
+        tree = MerkleTree(leaf_hash(utxo['transaction_id'], utxo['output_index'])
+                          for utxo in utxoset)
+        return tree.root
 
     def get_unspent_outputs(self):
         """Get the utxoset.
@@ -230,40 +335,129 @@ class BigchainDB(object):
             return backend.query.delete_unspent_outputs(
                                         self.connection, *unspent_outputs)
 
+    def prefetch(self, transactions):
+        """Fetch, with a few ``$in`` queries, the committed state that the
+        given transactions will be validated against:
+
+        * the transactions they spend from;
+        * the ones with the same ids as the ``CREATE`` transactions (to
+          detect duplicates);
+        * the spenders of their inputs, unless an in-memory UTXO set is
+          attached.
+
+        The results are cached and used by :meth:`get_transaction`,
+        :meth:`is_committed` and :meth:`get_spent` until
+        :meth:`clear_cache` is called, which must happen before the next
+        block is committed.
+
+        Args:
+            transactions (list): list of transaction dicts.
+        """
+        txids = set()
+        links = set()
+        for tx in transactions:
+            try:
+                spent = [(input_['fulfills']['transaction_id'],
+                          input_['fulfills']['output_index'])
+                         for input_ in tx['inputs'] if input_['fulfills']]
+                if spent:
+                    txids.update(txid for txid, _ in spent)
+                    links.update(spent)
+                else:
+                    txids.add(tx['id'])
+            except (KeyError, TypeError):
+                # malformed transactions are rejected by the validation
+                continue
+
+        txids = [txid for txid in txids if txid not in self._transaction_cache]
+        if txids:
+            found = backend.query.get_full_transactions(self.connection, txids)
+            self._transaction_cache.update(dict.fromkeys(txids))
+            for transaction in found:
+                self._transaction_cache[transaction['id']] = Transaction.view(transaction)
+
+        if self.utxoset is not None:
+            links = {link for link in links if not self.utxoset.is_unspent(*link)}
+        links = [link for link in links if link not in self._spent_cache]
+        if links:
+            self._spent_cache.update((link, []) for link in links)
+            spending = backend.query.get_spending_transactions(
+                self.connection,
+                [{'transaction_id': txid, 'output_index': output}
+                 for txid, output in links])
+            for tx in spending:
+                for input_ in tx['inputs']:
+                    fulfills = input_['fulfills']
+                    if not fulfills:
+                        continue
+                    link = (fulfills['transaction_id'], fulfills['output_index'])
+                    if link in self._spent_cache:
+                        self._spent_cache[link].append(tx)
+
+    def clear_cache(self):
+        """Drop the committed state fetched by :meth:`prefetch`."""
+        self._transaction_cache = {}
+        self._spent_cache = {}
+
     def is_committed(self, transaction_id):
+        if transaction_id in self._transaction_cache:
+            return self._transaction_cache[transaction_id] is not None
         transaction = backend.query.get_transaction(self.connection, transaction_id)
         return bool(transaction)
 
     def get_transaction(self, transaction_id):
-        transaction = backend.query.get_transaction(self.connection, transaction_id)
+        if transaction_id in self._transaction_cache:
+            return self._transaction_cache[transaction_id]
 
-        if transaction:
-            asset = backend.query.get_asset(self.connection, transaction_id)
-            metadata = backend.query.get_metadata(self.connection, [transaction_id])
-            if asset:
-                transaction['asset'] = asset
-
-            if 'metadata' not in transaction:
-                metadata = metadata[0] if metadata else None
-                if metadata:
-                    metadata = metadata.get('metadata')
+        transaction = backend.query.get_full_transaction(self.connection, transaction_id)
 
-                transaction.update({'metadata': metadata})
-
-            transaction = Transaction.from_dict(transaction)
+        if transaction:
+            transaction = Transaction.view(transaction)
 
         return transaction
 
     def get_transactions(self, txn_ids):
         return backend.query.get_transactions(self.connection, txn_ids)
 
-    def get_transactions_filtered(self, asset_id, operation=None):
-        """Get a list of transactions filtered on some criteria
+    def get_transactions_by_ids(self, transaction_ids):
+        """Get the transactions with the given ids along with their assets
+        and metadata, with a single query whatever the number of ids.
+
+        Args:
+            transaction_ids (iterable): the ids of the transactions.
+
+        Returns:
+            iter: The transactions found, in no particular order.
+        """
+        transaction_ids = list(set(transaction_ids))
+        if not transaction_ids:
+            return iter(())
+        transactions = backend.query.get_full_transactions(self.connection,
+                                                           transaction_ids)
+        return (Transaction.view(transaction) for transaction in transactions)
+
+    def get_transactions_filtered(self, asset_id, operation=None, after=None,
+                                  limit=None):
+        """Get the transactions of an asset, in the order they were
+        committed.
+
+        The transactions are read with a single query, as the result is
+        consumed.
+
+        Args:
+            asset_id (str): the id of the asset.
+            operation (str): ``CREATE`` or ``TRANSFER`` to get only the
+                transactions of this operation.
+            after (str): the id of the transaction to start after, to
+                page through the history of the asset.
+            limit (int): the maximum number of transactions to get.
+
+        Returns:
+            iterator: the :class:`~bigchaindb.models.Transaction` found.
         """
-        txids = backend.query.get_txids_filtered(self.connection, asset_id,
-                                                 operation)
-        for txid in txids:
-            yield self.get_transaction(txid)
+        transactions = backend.query.get_full_transactions_filtered(
+            self.connection, asset_id, operation, after, limit)
+        return (Transaction.view(transaction) for transaction in transactions)
 
     def get_outputs_filtered(self, owner, spent=None):
         """Get a list of output links filtered on some criteria
@@ -278,30 +472,25 @@ class BigchainDB(object):
             :obj:`list` of TransactionLink: list of ``txid`` s and ``output`` s
             pointing to another transaction's condition
         """
-        outputs = self.fastquery.get_outputs_by_public_key(owner)
-        if spent is None:
-            return outputs
-        elif spent is True:
-            return self.fastquery.filter_unspent_outputs(outputs)
-        elif spent is False:
-            return self.fastquery.filter_spent_outputs(outputs)
+        return self.fastquery.get_outputs_by_public_key(owner, spent)
 
     def get_spent(self, txid, output, current_transactions=[]):
-        transactions = backend.query.get_spent(self.connection, txid,
-                                               output)
-        transactions = list(transactions) if transactions else []
+        if self.utxoset is not None and self.utxoset.is_unspent(txid, output):
+            # the output is known to be unspent in the committed state
+            transactions = []
+        elif (txid, output) in self._spent_cache:
+            transactions = self._spent_cache[(txid, output)]
+        else:
+            transactions = backend.query.get_spent(self.connection, txid,
+                                                   output)
+            transactions = list(transactions) if transactions else []
         if len(transactions) > 1:
             raise core_exceptions.CriticalDoubleSpend(
                 '`{}` was spent more than once. There is a problem'
                 ' with the chain'.format(txid))
 
-        current_spent_transactions = []
-        for ctxn in current_transactions:
-            for ctxn_input in ctxn.inputs:
-                if ctxn_input.fulfills and\
-                   ctxn_input.fulfills.txid == txid and\
-                   ctxn_input.fulfills.output == output:
-                    current_spent_transactions.append(ctxn)
+        current_spent_transactions = BlockContext.wrap(current_transactions)\
+            .get_spent(txid, output)
 
         transaction = None
         if len(transactions) + len(current_spent_transactions) > 1:
@@ -344,8 +533,8 @@ class BigchainDB(object):
                   'transactions': []}
 
         if block:
-            transactions = backend.query.get_transactions(self.connection, block['transactions'])
-            result['transactions'] = [t.to_dict() for t in Transaction.from_db(self, transactions)]
+            transactions = backend.query.get_full_transactions(self.connection, block['transactions'])
+            result['transactions'] = [Transaction.view(t).to_dict() for t in transactions]
 
         return result
 
@@ -365,8 +554,28 @@ class BigchainDB(object):
 
         return [block['height'] for block in blocks]
 
-    def validate_transaction(self, tx, current_transactions=[]):
-        """Validate a transaction against the current status of the database."""
+    def validate_transaction(self, tx, current_transactions=[], verified=False,
+                             raw=None, verify_signatures=True):
+        """Validate a transaction against the current status of the database.
+
+        Args:
+            tx (dict or Transaction): the transaction to validate.
+            current_transactions (BlockContext): the transactions already
+                accepted in the current block. A list of transactions is
+                accepted as well.
+            verified (bool): whether the schema and the signatures of the
+                transaction have already been verified (see
+                :class:`~bigchaindb.validation_cache.ValidationCache`). Only
+                the checks depending on the state are performed again for
+                ``CREATE`` and ``TRANSFER`` transactions.
+            raw (bytes): the JSON document ``tx`` (dict) has been decoded
+                from, validated against the schema as it is.
+            verify_signatures (bool): whether to verify the signatures of
+                ``CREATE`` and ``TRANSFER`` transactions, e.g. ``False`` for
+                the ones verified on the pool of
+                :class:`~bigchaindb.parallel_validation.SignatureVerifier`.
+                Their schema is still validated.
+        """
 
         transaction = tx
 
@@ -375,20 +584,29 @@ class BigchainDB(object):
         # throught the code base.
         if isinstance(transaction, dict):
             try:
-                transaction = Transaction.from_dict(tx)
+                transaction = Transaction.from_dict(tx, verified, raw=raw)
             except SchemaValidationError as e:
                 logger.warning('Invalid transaction schema: %s', e.__cause__.message)
                 return False
             except ValidationError as e:
                 logger.warning('Invalid transaction (%s): %s', type(e).__name__, e)
                 return False
+
+        current_transactions = BlockContext.wrap(current_transactions)
+        if ((verified or not verify_signatures) and
+                transaction.operation in (Transaction.CREATE,
+                                          Transaction.TRANSFER)):
+            return transaction.validate(self, current_transactions,
+                                        verify_signatures=False)
         return transaction.validate(self, current_transactions)
 
-    def is_valid_transaction(self, tx, current_transactions=[]):
+    def is_valid_transaction(self, tx, current_transactions=[], verified=False,
+                             raw=None):
         # NOTE: the function returns the Transaction object in case
         # the transaction is valid
         try:
-            return self.validate_transaction(tx, current_transactions)
+            return self.validate_transaction(tx, current_transactions, verified,
+                                             raw)
         except ValidationError as e:
             logger.warning('Invalid transaction (%s): %s', type(e).__name__, e)
             return False
@@ -0,0 +1,284 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Latency histograms and block counters.
+
+Every process has its own :data:`registry`. The ABCI methods and the
+backend queries are timed with :meth:`Metrics.timer` (or the
+:func:`timed` decorator), and the ABCI app records the size of every
+block. The counters of the memoization caches are reported along. The
+ABCI process publishes a snapshot of its registry to a
+:class:`SharedSnapshot` after every commit, that the web API serves at
+``/api/v1/metrics``.
+"""
+
+import functools
+import logging
+import multiprocessing as mp
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from time import perf_counter, time
+
+import rapidjson
+
+from bigchaindb.common.memoize import cache_stats
+
+logger = logging.getLogger(__name__)
+
+# upper bounds (in seconds) of the buckets of the histograms, from 10µs to
+# about 84s, the last bucket counts the slower observations
+BUCKETS = tuple(0.00001 * 2 ** i for i in range(24))
+# minimum number of seconds between two summaries in the logs
+LOG_INTERVAL = 60
+# size (in bytes) of the buffer used to share a snapshot between processes
+SNAPSHOT_SIZE = 2 ** 18
+
+
+class Histogram:
+    """Distribution of durations, in exponential buckets."""
+
+    __slots__ = ('counts', 'count', 'sum', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Return the upper bound of the bucket of the ``q`` quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                break
+        return BUCKETS[index] if index < len(BUCKETS) else self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'buckets': self.counts,
+        }
+
+
+class BlockCounters:
+    """Number of transactions, rejected transactions and bytes of a
+    block (or of all the blocks).
+    """
+
+    __slots__ = ('blocks', 'transactions', 'rejected', 'bytes')
+
+    def __init__(self):
+        self.blocks = 0
+        self.transactions = 0
+        self.rejected = 0
+        self.bytes = 0
+
+    def add(self, other):
+        self.blocks += other.blocks
+        self.transactions += other.transactions
+        self.rejected += other.rejected
+        self.bytes += other.bytes
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Metrics:
+    """Registry of the histograms and block counters of a process."""
+
+    def __init__(self):
+        self.histograms = defaultdict(Histogram)
+        self.block = BlockCounters()
+        self.last_block = None
+        self.last_height = None
+        self.totals = BlockCounters()
+        self.shared_snapshot = None
+        self.log_interval = LOG_INTERVAL
+        self._last_log = time()
+
+    def observe(self, name, seconds):
+        self.histograms[name].observe(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        """Time the execution of the ``with`` block in the histogram
+        ``name``.
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.histograms[name].observe(perf_counter() - start)
+
+    def count_transaction(self, size):
+        """Count a transaction of ``size`` bytes in the current block."""
+        self.block.transactions += 1
+        self.block.bytes += size
+
+    def count_rejected(self, number=1):
+        """Count rejected transactions in the current block."""
+        self.block.rejected += number
+
+    def end_block(self, height):
+        """Close the counters of the current block, publish a snapshot and
+        log a summary if ``log_interval`` seconds have elapsed since the
+        last one.
+        """
+        self.block.blocks = 1
+        self.totals.add(self.block)
+        self.last_block = self.block
+        self.last_height = height
+        self.block = BlockCounters()
+
+        if self.shared_snapshot is not None:
+            self.shared_snapshot.write(self.snapshot())
+
+        now = time()
+        if now - self._last_log >= self.log_interval:
+            self._last_log = now
+            logger.info(self.summary())
+
+    def snapshot(self):
+        return {
+            'histograms': {name: histogram.to_dict()
+                           for name, histogram in self.histograms.items()},
+            'last_block': dict(self.last_block.to_dict(),
+                               height=self.last_height) if self.last_block else None,
+            'totals': self.totals.to_dict(),
+            'caches': cache_stats(),
+        }
+
+    def summary(self):
+        """Return a one line summary of the metrics, the slowest stages
+        first.
+        """
+        stages = sorted(self.histograms.items(),
+                        key=lambda item: item[1].sum, reverse=True)
+        return 'Metrics: {} blocks, {} txs ({} rejected, {} bytes); {}'.format(
+            self.totals.blocks, self.totals.transactions,
+            self.totals.rejected, self.totals.bytes,
+            ', '.join('{} n={} total={:.3f}s p99={:.6f}s'.format(
+                name, histogram.count, histogram.sum, histogram.quantile(0.99))
+                for name, histogram in stages))
+
+
+class SharedSnapshot:
+    """Buffer in shared memory holding the last snapshot published by a
+    process, to be read by the others.
+
+    It must be created before the processes are started.
+    """
+
+    def __init__(self, size=SNAPSHOT_SIZE):
+        self.buffer = mp.Array('c', size)
+
+    def write(self, snapshot):
+        data = rapidjson.dumps(snapshot).encode()
+        if len(data) >= len(self.buffer):
+            logger.warning('Metrics snapshot too large to be shared (%s bytes)',
+                           len(data))
+            return
+        with self.buffer.get_lock():
+            self.buffer.value = data
+
+    def read(self):
+        with self.buffer.get_lock():
+            data = self.buffer.value
+        return rapidjson.loads(data) if data else None
+
+
+registry = Metrics()
+
+
+class TimedIterator:
+    """Iterator timing the iteration of another one, e.g. a lazy database
+    cursor whose round trips happen while it is consumed.
+
+    The time spent creating the iterator plus the time spent in
+    ``__next__`` is observed in the histogram ``name`` of the
+    :data:`registry` once the iterator is exhausted, closed or garbage
+    collected. Other attributes are those of the wrapped iterator.
+    """
+
+    # set in `__init__`, `__del__` must not observe a half built iterator
+    _observed = True
+
+    def __init__(self, name, iterator, elapsed=0.0):
+        self._name = name
+        self._iterator = iterator
+        self._elapsed = elapsed
+        self._observed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = perf_counter()
+        try:
+            try:
+                return next(self._iterator)
+            finally:
+                self._elapsed += perf_counter() - start
+        except StopIteration:
+            self._observe()
+            raise
+
+    def __getattr__(self, name):
+        return getattr(self._iterator, name)
+
+    def _observe(self):
+        if not self._observed:
+            self._observed = True
+            registry.observe(self._name, self._elapsed)
+
+    def close(self):
+        close = getattr(self._iterator, 'close', None)
+        if close is not None:
+            close()
+        self._observe()
+
+    def __del__(self):
+        self._observe()
+
+
+def timed(name):
+    """Decorator timing the calls of a function in the histogram
+    ``name`` of the :data:`registry`.
+
+    If the function returns an iterator (e.g. a cursor or a generator),
+    the time spent iterating over it is included (see
+    :class:`TimedIterator`).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                registry.observe(name, perf_counter() - start)
+                raise
+            if hasattr(result, '__next__'):
+                return TimedIterator(name, result, perf_counter() - start)
+            registry.observe(name, perf_counter() - start)
+            return result
+        return wrapper
+    return decorator
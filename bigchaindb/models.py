@@ -4,18 +4,23 @@
 
 from bigchaindb.common.exceptions import (InvalidSignature,
                                           DuplicateTransaction)
+from bigchaindb.common.block_context import BlockContext
 from bigchaindb.common.transaction import Transaction
 from bigchaindb.common.utils import (validate_txn_obj, validate_key)
 from bigchaindb.common.schema import validate_transaction_schema
-from bigchaindb.backend.schema import validate_language_key
+from bigchaindb.backend.schema import validate_language
 
 
 class Transaction(Transaction):
 
-    def validate(self, bigchain, current_transactions=[]):
+    def validate(self, bigchain, current_transactions=[],
+                 verify_signatures=True):
         """Validate transaction spend
         Args:
             bigchain (BigchainDB): an instantiated bigchaindb.BigchainDB object.
+            verify_signatures (bool): whether to verify the fulfillments.
+                Only the checks depending on the state are performed when
+                ``False``, e.g. for a transaction verified in ``check_tx``.
         Returns:
             The transaction (Transaction) if the transaction is valid else it
             raises an exception describing the reason why the transaction is
@@ -26,29 +31,31 @@ class Transaction(Transaction):
         input_conditions = []
 
         if self.operation == Transaction.CREATE:
-            duplicates = any(txn for txn in current_transactions if txn.id == self.id)
-            if bigchain.is_committed(self.id) or duplicates:
+            duplicates = BlockContext.wrap(current_transactions).get_transaction(self.id)
+            if duplicates or bigchain.is_committed(self.id):
                 raise DuplicateTransaction('transaction `{}` already exists'
                                            .format(self.id))
 
-            if not self.inputs_valid(input_conditions):
+            if verify_signatures and not self.inputs_valid(input_conditions):
                 raise InvalidSignature('Transaction signature is invalid.')
 
         elif self.operation == Transaction.TRANSFER:
-            self.validate_transfer_inputs(bigchain, current_transactions)
+            self.validate_transfer_inputs(bigchain, current_transactions,
+                                          verify_signatures)
 
         return self
 
     @classmethod
-    def from_dict(cls, tx_body):
-        return super().from_dict(tx_body, False)
+    def from_dict(cls, tx_body, skip_schema_validation=False, raw=None):
+        return super().from_dict(tx_body, skip_schema_validation, raw=raw)
 
     @classmethod
-    def validate_schema(cls, tx_body):
-        validate_transaction_schema(tx_body)
-        validate_txn_obj('asset', tx_body['asset'], 'data', validate_key)
+    def validate_schema(cls, tx_body, raw=None):
+        validate_transaction_schema(tx_body, raw)
+        # the "language" values of the asset are checked along its keys
+        validate_txn_obj('asset', tx_body['asset'], 'data', validate_key,
+                         'language', validate_language)
         validate_txn_obj('metadata', tx_body, 'metadata', validate_key)
-        validate_language_key(tx_body['asset'], 'data')
 
 
 class FastTransaction:
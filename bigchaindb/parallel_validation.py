@@ -2,37 +2,56 @@
 # SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
 # Code is Apache-2.0 and docs are CC-BY-4.0
 
+import logging
 import multiprocessing as mp
+import queue
 from collections import defaultdict
 
-from abci.types_pb2 import ResponseCheckTx, ResponseDeliverTx
+from abci.types_pb2 import ResponseDeliverTx
 
 from bigchaindb import BigchainDB, App
+from bigchaindb.metrics import registry as metrics, timed
+from bigchaindb.common.block_context import BlockContext
+from bigchaindb.common.signatures import verify_transactions
+from bigchaindb.common.exceptions import (ValidationError,
+                                          InvalidSignature,
+                                          DoubleSpend,
+                                          DuplicateTransaction,
+                                          InputDoesNotExist,
+                                          AssetIdMismatch,
+                                          AmountError)
+from bigchaindb.common.transaction import Transaction
 from bigchaindb.tendermint_utils import decode_transaction
 
 
 CodeTypeOk = 0
+logger = logging.getLogger(__name__)
 
 
 class ParallelValidationApp(App):
     def __init__(self, bigchaindb=None, events_queue=None):
         super().__init__(bigchaindb, events_queue)
-        self.parallel_validator = ParallelValidator()
+        self.parallel_validator = ParallelValidator(bigchaindb=self.bigchaindb)
         self.parallel_validator.start()
 
-    def check_tx(self, raw_transaction):
-        return ResponseCheckTx(code=CodeTypeOk)
-
+    @timed('abci.deliver_tx')
     def deliver_tx(self, raw_transaction):
-        self.parallel_validator.validate(raw_transaction)
+        metrics.count_transaction(len(raw_transaction))
+        self.parallel_validator.validate(raw_transaction, self.validation_cache)
         return ResponseDeliverTx(code=CodeTypeOk)
 
     def end_block(self, request_end_block):
-        result = self.parallel_validator.result(timeout=30)
-        for transaction in result:
-            if transaction:
+        with metrics.timer('abci.end_block.parallel_validation'):
+            result = self.parallel_validator.result(timeout=30)
+        for dict_transaction in result:
+            if dict_transaction:
+                # the transaction has been validated by a worker: its
+                # inputs and outputs are only built if they are accessed
+                transaction = Transaction.view(dict_transaction)
                 self.block_txn_ids.append(transaction.id)
                 self.block_transactions.append(transaction)
+            else:
+                metrics.count_rejected()
 
         return super().end_block(request_end_block)
 
@@ -40,18 +59,147 @@ class ParallelValidationApp(App):
 RESET = 'reset'
 EXIT = 'exit'
 
+# maximum number of queued transactions a worker prefetches the inputs of
+# at once
+LOOKAHEAD = 256
+# number of transactions of a block whose results are reported through the
+# shared results array, the results of the following ones are sent along
+# with the notifications
+RESULTS_CAPACITY = 2 ** 16
+# number of transactions whose signatures a process of the signature pool
+# verifies at once
+SIGNATURES_CHUNK_SIZE = 64
+
+# result codes of the validation
+RESULT_PENDING = 0
+RESULT_VALID = 1
+RESULT_INVALID = 2
+# the transaction raised one of these errors, its code is
+# `RESULT_INVALID + 1 + index`
+RESULT_ERRORS = (InvalidSignature, DoubleSpend, DuplicateTransaction,
+                 InputDoesNotExist, AssetIdMismatch, AmountError)
+
+
+def result_code(error):
+    """Return the result code for a validation error."""
+    try:
+        return RESULT_INVALID + 1 + RESULT_ERRORS.index(type(error))
+    except ValueError:
+        return RESULT_INVALID
+
+
+def result_reason(code):
+    """Return a readable description of a result code."""
+    if code == RESULT_VALID:
+        return 'valid'
+    if RESULT_INVALID < code <= RESULT_INVALID + len(RESULT_ERRORS):
+        return RESULT_ERRORS[code - RESULT_INVALID - 1].__name__
+    return 'invalid'
+
+
+def get_asset_id(dict_transaction):
+    """Return the id of the asset a transaction (dict) operates on: the
+    transaction's own id for a ``CREATE`` (or an election), the id in
+    ``asset`` otherwise.
+    """
+    try:
+        return dict_transaction['asset']['id']
+    except (KeyError, TypeError):
+        return dict_transaction['id']
+
+
+class SignatureVerifier:
+    """Verify the signatures of the transactions of a block on a pool of
+    processes.
+
+    The transactions are sent to the pool in chunks as they are delivered,
+    so that the signatures of the block are verified in one pooled pass
+    (see :func:`~bigchaindb.common.signatures.verify_transactions`) while
+    the :class:`ValidationWorker` processes check the transactions
+    against the state.
+    """
+
+    def __init__(self, processes, chunk_size=SIGNATURES_CHUNK_SIZE):
+        self.processes = processes
+        self.chunk_size = chunk_size
+        self.pool = None
+        self.chunk = []
+        self.jobs = []
+
+    def start(self):
+        self.pool = mp.Pool(self.processes)
+
+    def stop(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+    def add(self, index, dict_transaction):
+        """Queue the transaction at the given index of the block."""
+        self.chunk.append((index, dict_transaction))
+        if len(self.chunk) >= self.chunk_size:
+            self.submit()
+
+    def submit(self):
+        if self.chunk:
+            self.jobs.append(self.pool.apply_async(verify_transactions,
+                                                   (self.chunk,)))
+            self.chunk = []
+
+    def invalid(self, timeout=None):
+        """Wait for the verdicts of the transactions queued since the last
+        call.
+
+        Returns:
+            set: the indexes of the transactions whose signatures are
+            invalid.
+        """
+        self.submit()
+        invalid = set()
+        for job in self.jobs:
+            invalid.update(job.get(timeout))
+        self.jobs = []
+        return invalid
+
 
 class ParallelValidator:
-    def __init__(self, number_of_workers=mp.cpu_count()):
+    """Dispatch the transactions of a block to a pool of
+    :class:`ValidationWorker`.
+
+    A transaction can only depend on transactions of the same block that
+    share its asset (all its inputs must spend outputs of the same asset),
+    so the dependency graph of a block is made of one chain per asset.
+    Transactions are therefore sharded by asset id: each chain is validated
+    in order by a single worker, while independent assets are spread across
+    the workers.
+
+    The signatures of the ``CREATE`` and ``TRANSFER`` transactions are not
+    verified by the workers but by a :class:`SignatureVerifier`, so that
+    the signatures of a chain are verified in parallel as well. The
+    workers accept them as if their signatures were valid: when one is
+    not, the transactions of its asset are validated again, in order.
+    """
+
+    def __init__(self, number_of_workers=mp.cpu_count(), bigchaindb=None):
         self.number_of_workers = number_of_workers
+        # used to validate the transactions again
+        self.bigchaindb = bigchaindb
         self.transaction_index = 0
+        # the decoded transactions of the current block, by index
+        self.transactions = []
         self.routing_queues = [mp.Queue() for _ in range(self.number_of_workers)]
         self.workers = []
+        # the workers write the result code of every transaction here, and
+        # only notify the number of transactions processed through the queue
+        self.results = mp.RawArray('b', RESULTS_CAPACITY)
         self.results_queue = mp.Queue()
+        self.signature_verifier = SignatureVerifier(self.number_of_workers)
 
     def start(self):
+        self.signature_verifier.start()
         for routing_queue in self.routing_queues:
-            worker = ValidationWorker(routing_queue, self.results_queue)
+            worker = ValidationWorker(routing_queue, self.results_queue,
+                                      self.results)
             process = mp.Process(target=worker.run)
             process.start()
             self.workers.append(process)
@@ -59,23 +207,119 @@ class ParallelValidator:
     def stop(self):
         for routing_queue in self.routing_queues:
             routing_queue.put(EXIT)
+        self.signature_verifier.stop()
+
+    def validate(self, raw_transaction, validation_cache=None):
+        """Dispatch a transaction of the block to its worker.
 
-    def validate(self, raw_transaction):
+        Args:
+            raw_transaction (bytes): the transaction.
+            validation_cache (:class:`~bigchaindb.validation_cache.ValidationCache`):
+                the transactions that passed ``check_tx``. Their signatures
+                are not verified again.
+        """
         dict_transaction = decode_transaction(raw_transaction)
-        index = int(dict_transaction['id'], 16) % self.number_of_workers
-        self.routing_queues[index].put((self.transaction_index, dict_transaction))
+        verified = (validation_cache is not None and
+                    validation_cache.is_verified(dict_transaction.get('id'),
+                                                 raw_transaction))
+        pooled = (not verified and
+                  dict_transaction.get('operation') in (Transaction.CREATE,
+                                                        Transaction.TRANSFER))
+        if pooled:
+            self.signature_verifier.add(self.transaction_index, dict_transaction)
+        index = self.route(dict_transaction)
+        self.routing_queues[index].put((self.transaction_index, dict_transaction,
+                                        verified, pooled))
+        self.transactions.append(dict_transaction)
         self.transaction_index += 1
 
+    def route(self, dict_transaction):
+        """Return the index of the worker that validates the given
+        transaction.
+        """
+        try:
+            return int(get_asset_id(dict_transaction), 16) % self.number_of_workers
+        except (KeyError, TypeError, ValueError):
+            # malformed transactions are rejected by any worker
+            return 0
+
     def result(self, timeout=None):
-        result_buffer = [None] * self.transaction_index
-        for _ in range(self.transaction_index):
-            index, transaction = self.results_queue.get(timeout=timeout)
-            result_buffer[index] = transaction
+        """Wait for the workers to validate all the transactions of the
+        block, and reset them for the next one.
+
+        Returns:
+            list: for each transaction of the block, in order, its dict if
+            it is valid, ``False`` otherwise.
+        """
+        overflow_codes = {}
+        processed = 0
+        while processed < self.transaction_index:
+            count, overflow = self.results_queue.get(timeout=timeout)
+            processed += count
+            overflow_codes.update(overflow)
+        codes = [self.results[index] if index < len(self.results)
+                 else overflow_codes[index]
+                 for index in range(self.transaction_index)]
+
+        invalid = self.signature_verifier.invalid(timeout)
+        if invalid:
+            self.revalidate(codes, invalid)
+
+        result_buffer = []
+        for dict_transaction, code in zip(self.transactions, codes):
+            if code == RESULT_VALID:
+                result_buffer.append(dict_transaction)
+            else:
+                logger.debug('Transaction %s is invalid: %s',
+                             dict_transaction.get('id'), result_reason(code))
+                result_buffer.append(False)
+
         self.transaction_index = 0
+        self.transactions = []
         for routing_queue in self.routing_queues:
             routing_queue.put(RESET)
         return result_buffer
 
+    def revalidate(self, codes, invalid):
+        """Reject the transactions whose signatures are invalid, and
+        validate again, in order, the other transactions of their assets:
+        the workers validated them assuming these transactions were valid.
+
+        Args:
+            codes (list): the result code of every transaction of the
+                block, updated in place.
+            invalid (set): the indexes of the transactions whose
+                signatures are invalid.
+        """
+        bigchaindb = self.bigchaindb or BigchainDB()
+        assets = {self._asset_id(self.transactions[index]) for index in invalid}
+        contexts = defaultdict(BlockContext)
+        for index, dict_transaction in enumerate(self.transactions):
+            asset_id = self._asset_id(dict_transaction)
+            if asset_id not in assets:
+                continue
+            if index in invalid:
+                codes[index] = result_code(InvalidSignature())
+                continue
+            try:
+                transaction = bigchaindb.validate_transaction(
+                    dict_transaction, contexts[asset_id])
+            except ValidationError as e:
+                codes[index] = result_code(e)
+                continue
+            if transaction:
+                contexts[asset_id].add(transaction)
+                codes[index] = RESULT_VALID
+            else:
+                codes[index] = RESULT_INVALID
+
+    @staticmethod
+    def _asset_id(dict_transaction):
+        try:
+            return get_asset_id(dict_transaction)
+        except (KeyError, TypeError):
+            return None
+
 
 class ValidationWorker:
     """Run validation logic in a loop. This Worker is suitable for a Process
@@ -88,40 +332,101 @@ class ValidationWorker:
     worker is in, it expects an `EXIT` message.
     """
 
-    def __init__(self, in_queue, results_queue):
+    def __init__(self, in_queue, results_queue, results=None,
+                 lookahead=LOOKAHEAD):
         self.in_queue = in_queue
         self.results_queue = results_queue
+        self.results = results if results is not None else mp.RawArray('b', RESULTS_CAPACITY)
+        self.lookahead = lookahead
         self.bigchaindb = BigchainDB()
         self.reset()
 
     def reset(self):
         # We need a place to store already validated transactions,
         # in case of dependant transactions in the same block.
-        # `validated_transactions` maps an `asset_id` with the list
-        # of all other transactions sharing the same asset.
-        self.validated_transactions = defaultdict(list)
+        # `validated_transactions` maps an `asset_id` with the block
+        # context of all other transactions sharing the same asset.
+        self.validated_transactions = defaultdict(BlockContext)
+        # the state fetched ahead is only valid until the block is committed
+        self.bigchaindb.clear_cache()
 
-    def validate(self, dict_transaction):
-        try:
-            asset_id = dict_transaction['asset']['id']
-        except KeyError:
-            asset_id = dict_transaction['id']
+    def validate(self, dict_transaction, verified=False, pooled=False):
+        """Validate a transaction against the committed state and the
+        transactions of the block already validated.
+
+        Args:
+            dict_transaction (dict): the transaction.
+            verified (bool): whether the schema and signatures of the
+                transaction have been verified in ``check_tx``.
+            pooled (bool): whether the signatures of the transaction are
+                verified by the :class:`SignatureVerifier`.
+
+        Returns:
+            The transaction if it is valid, ``False`` otherwise.
 
-        transaction = self.bigchaindb.is_valid_transaction(
+        Raises:
+            ValidationError: If the transaction is invalid.
+        """
+        asset_id = get_asset_id(dict_transaction)
+
+        transaction = self.bigchaindb.validate_transaction(
                 dict_transaction,
-                self.validated_transactions[asset_id])
+                self.validated_transactions[asset_id],
+                verified,
+                verify_signatures=not pooled)
 
         if transaction:
-            self.validated_transactions[asset_id].append(transaction)
+            self.validated_transactions[asset_id].add(transaction)
         return transaction
 
+    def check(self, dict_transaction, verified=False, pooled=False):
+        """Validate a transaction and return its result code."""
+        try:
+            return (RESULT_VALID
+                    if self.validate(dict_transaction, verified, pooled)
+                    else RESULT_INVALID)
+        except ValidationError as e:
+            logger.warning('Invalid transaction (%s): %s', type(e).__name__, e)
+            return result_code(e)
+
+    def get_batch(self):
+        """Wait for the next message and take the transactions already queued
+        after it, up to `lookahead` of them.
+
+        Returns:
+            A tuple with the list of ``(index, transaction, verified,
+            pooled)`` messages and the control message that ended the batch, if any.
+        """
+        batch = []
+        message = self.in_queue.get()
+        while message not in (RESET, EXIT):
+            batch.append(message)
+            if len(batch) >= self.lookahead:
+                return batch, None
+            try:
+                message = self.in_queue.get_nowait()
+            except queue.Empty:
+                return batch, None
+        return batch, message
+
     def run(self):
         while True:
-            message = self.in_queue.get()
+            batch, message = self.get_batch()
+            if batch:
+                # fetch the inputs of the whole batch with a few queries
+                # instead of a few queries per input
+                self.bigchaindb.prefetch([message[1] for message in batch])
+                # only the codes that do not fit in the results array are
+                # sent through the queue
+                overflow = []
+                for index, transaction, verified, pooled in batch:
+                    code = self.check(transaction, verified, pooled)
+                    if index < len(self.results):
+                        self.results[index] = code
+                    else:
+                        overflow.append((index, code))
+                self.results_queue.put((len(batch), overflow))
             if message == RESET:
                 self.reset()
             elif message == EXIT:
                 return
-            else:
-                index, transaction = message
-                self.results_queue.put((index, self.validate(transaction)))
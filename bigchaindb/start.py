@@ -7,6 +7,7 @@ import setproctitle
 
 import bigchaindb
 from bigchaindb.lib import BigchainDB
+from bigchaindb import metrics
 from bigchaindb.core import App
 from bigchaindb.parallel_validation import ParallelValidationApp
 from bigchaindb.web import server, websocket_server
@@ -39,11 +40,16 @@ def start(args):
     # Exchange object for event stream api
     logger.info('Starting BigchainDB')
     exchange = Exchange()
+    # the metrics of the ABCI app are published here after every commit,
+    # for the web api to serve them
+    metrics_snapshot = metrics.SharedSnapshot()
+    metrics.registry.shared_snapshot = metrics_snapshot
     # start the web api
     app_server = server.create_server(
         settings=bigchaindb.config['server'],
         log_config=bigchaindb.config['log'],
-        bigchaindb_factory=BigchainDB)
+        bigchaindb_factory=BigchainDB,
+        metrics_snapshot=metrics_snapshot)
     p_webapi = Process(name='bigchaindb_webapi', target=app_server.run, daemon=True)
     p_webapi.start()
 
@@ -0,0 +1,176 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Client of the JSON-RPC interface of Tendermint.
+
+The requests go through a :class:`requests.Session`, so that the
+connections to Tendermint are kept alive and reused instead of being
+opened for every transaction. Failed connections are retried with an
+exponential backoff, and several calls can be sent in a single JSON-RPC
+batch (see :meth:`TendermintRPC.call_batch`).
+"""
+
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import rapidjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from bigchaindb.exceptions import BigchainDBError
+from bigchaindb.metrics import registry as metrics
+
+
+logger = logging.getLogger(__name__)
+
+# maximum number of connections kept alive to Tendermint
+POOL_SIZE = 10
+# timeouts (in seconds) to connect and to read a response, which takes up
+# to a block time with `broadcast_tx_commit`
+TIMEOUT = (3.05, 60)
+# number of times a connection is retried, after 0.1s, 0.2s, 0.4s, ...
+RETRIES = 3
+BACKOFF_FACTOR = 0.1
+# maximum number of calls sent in a single JSON-RPC batch
+BATCH_SIZE = 64
+
+# whether the Tendermint nodes accept JSON-RPC batches (Tendermint 0.22.8
+# does not), by endpoint: the first batch tells, and the clients created
+# later for the same node do not send a batch to find out again
+batch_support = {}
+
+
+class RPCError(BigchainDBError):
+    """Raised when Tendermint cannot be reached."""
+
+
+class TendermintRPC:
+    """Client of the JSON-RPC interface of a Tendermint node.
+
+    Only the connections are retried: a request which reached Tendermint
+    is never sent again, as a broadcast transaction would then be
+    rejected as already in the cache.
+
+    Args:
+        endpoint (str): URL of the RPC interface.
+        pool_size (int): maximum number of connections kept alive.
+        timeout (tuple): timeouts (in seconds) to connect and to read a
+            response.
+        retries (int): number of times a connection is retried.
+        backoff_factor (float): delay (in seconds) before the first retry,
+            doubled for every next one.
+    """
+
+    def __init__(self, endpoint, pool_size=POOL_SIZE, timeout=TIMEOUT,
+                 retries=RETRIES, backoff_factor=BACKOFF_FACTOR):
+        self.endpoint = endpoint
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._ids = itertools.count()
+
+        retry = Retry(total=retries, connect=retries, read=0, status=0,
+                      redirect=0, backoff_factor=backoff_factor)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                              max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Content-Type'] = 'application/json'
+
+    @property
+    def supports_batch(self):
+        """Whether the node accepts JSON-RPC batches, ``None`` until the
+        first batch has been sent to it.
+        """
+        return batch_support.get(self.endpoint)
+
+    @supports_batch.setter
+    def supports_batch(self, value):
+        batch_support[self.endpoint] = value
+
+    def request(self, method, *params):
+        """Return the JSON-RPC request calling ``method``."""
+        return {
+            'method': method,
+            'jsonrpc': '2.0',
+            'params': list(params),
+            'id': str(next(self._ids)),
+        }
+
+    def post(self, payload):
+        """Post a JSON-RPC request (or batch of requests).
+
+        Returns:
+            :class:`requests.Response`: the response of Tendermint.
+
+        Raises:
+            :exc:`RPCError`: if Tendermint cannot be reached.
+        """
+        method = payload['method'] if isinstance(payload, dict) else 'batch'
+        try:
+            with metrics.timer('tendermint.rpc.{}'.format(method)):
+                return self.session.post(self.endpoint,
+                                         data=rapidjson.dumps(payload),
+                                         timeout=self.timeout)
+        except requests.exceptions.RequestException as exc:
+            raise RPCError('Cannot reach Tendermint at {}: {}'
+                           .format(self.endpoint, exc)) from exc
+
+    def call(self, method, *params):
+        """Call ``method`` and return the decoded JSON-RPC response."""
+        return self.post(self.request(method, *params)).json()
+
+    def call_batch(self, calls):
+        """Make several calls at once.
+
+        The calls are sent in JSON-RPC batches of up to :data:`BATCH_SIZE`
+        calls. If Tendermint does not accept batches, they are made one by
+        one instead, over up to ``pool_size`` connections at a time.
+
+        Args:
+            calls (iterable): ``(method, params)`` pairs, where ``params``
+                is the list of the parameters of the call.
+
+        Returns:
+            list: the decoded JSON-RPC responses, in the order of ``calls``.
+        """
+        payloads = [self.request(method, *params) for method, params in calls]
+        responses = []
+        for start in range(0, len(payloads), BATCH_SIZE):
+            batch = payloads[start:start + BATCH_SIZE]
+            if self.supports_batch is not False:
+                batch_responses = self._post_batch(batch)
+                if batch_responses is not None:
+                    responses.extend(batch_responses)
+                    continue
+            responses.extend(self._post_each(batch))
+        return responses
+
+    def _post_batch(self, batch):
+        """Post a batch, return its responses in the order of the requests
+        or ``None`` if Tendermint does not accept batches.
+        """
+        response = self.post(batch).json()
+        if not isinstance(response, list):
+            # the whole batch got a single error, as a malformed request
+            logger.info('Tendermint at %s does not accept JSON-RPC batches',
+                        self.endpoint)
+            self.supports_batch = False
+            return None
+
+        self.supports_batch = True
+        by_id = {item.get('id'): item for item in response}
+        return [by_id.get(payload['id'],
+                          {'error': {'message': 'Internal Error',
+                                     'data': 'No response to the call'}})
+                for payload in batch]
+
+    def _post_each(self, batch):
+        if len(batch) == 1:
+            return [self.post(batch[0]).json()]
+        with ThreadPoolExecutor(min(self.pool_size, len(batch))) as executor:
+            return list(executor.map(lambda payload: self.post(payload).json(),
+                                     batch))
@@ -133,6 +133,26 @@ def condition_details_has_owner(condition_details, owner):
     return False
 
 
+def condition_details_owners(condition_details):
+    """Return the public keys of the Ed25519Fulfillments of the condition
+    details.
+
+    Args:
+        condition_details (dict): dict with condition details
+
+    Returns:
+        set: the base58 public keys found in the condition details
+    """
+    if 'subconditions' in condition_details:
+        return condition_details_owners(condition_details['subconditions'])
+    elif isinstance(condition_details, list):
+        return set().union(*(condition_details_owners(subcondition)
+                             for subcondition in condition_details))
+    elif 'public_key' in condition_details:
+        return {condition_details['public_key']}
+    return set()
+
+
 class Lazy:
     """Lazy objects are useful to create chains of methods to
     execute later.
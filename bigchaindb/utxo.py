@@ -0,0 +1,368 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""In-memory UTXO set, kept in sync with the ``utxos`` collection."""
+
+import logging
+
+try:
+    from hashlib import sha3_256
+except ImportError:
+    # NOTE: neeeded for Python < 3.6
+    from sha3 import sha3_256
+
+from bigchaindb.backend import query
+
+
+logger = logging.getLogger(__name__)
+
+# number of outputs deleted at once when rebuilding the ``utxos`` collection
+DELETE_CHUNK_SIZE = 1000
+
+
+def _key(unspent_output):
+    return (unspent_output['transaction_id'], unspent_output['output_index'])
+
+
+def leaf_hash(txid, output_index):
+    """Hash of a utxo as used for the leaves of the UTXO merkle tree."""
+    return sha3_256('{}{}'.format(txid, output_index).encode()).digest()
+
+
+def _bit(key, index):
+    return (key[index >> 3] >> (7 - (index & 7))) & 1
+
+
+class _Node:
+    """Interior node of a :class:`MerkleTree`.
+
+    ``bit`` is the index of the first bit in which the leaves of the
+    ``left`` (bit unset) and ``right`` (bit set) subtrees differ.
+    """
+
+    __slots__ = ('bit', 'left', 'right', 'digest')
+
+    def __init__(self, bit, left, right):
+        self.bit = bit
+        self.left = left
+        self.right = right
+        self.digest = None
+
+
+class MerkleTree:
+    """Merkle tree over a set of leaf hashes, updated incrementally.
+
+    The leaves are kept in a crit-bit tree (a binary radix tree with the
+    single-child nodes collapsed), so the shape of the tree only depends
+    on the set of leaves and not on the order of the updates. The digest
+    of an interior node is ``sha3_256(left + right)`` and is cached until
+    one of the leaves below it changes: adding or removing a leaf only
+    invalidates the nodes on its path, i.e. ``O(log n)`` of them for
+    uniformly distributed hashes.
+
+    As with :func:`~bigchaindb.tendermint_utils.merkleroot`, the root of
+    an empty tree is the hash of the empty string and the root of a tree
+    with a single leaf is the leaf itself.
+    """
+
+    def __init__(self, leaves=()):
+        self._root = None
+        self._size = 0
+        for leaf in leaves:
+            self.add(leaf)
+
+    def __len__(self):
+        return self._size
+
+    def add(self, leaf):
+        """Add a leaf (:obj:`bytes`) to the tree."""
+        if self._root is None:
+            self._root = leaf
+            self._size = 1
+            return
+
+        node = self._root
+        while isinstance(node, _Node):
+            node = node.right if _bit(leaf, node.bit) else node.left
+        if node == leaf:
+            return
+
+        diff = int.from_bytes(leaf, 'big') ^ int.from_bytes(node, 'big')
+        crit = len(leaf) * 8 - diff.bit_length()
+
+        parent, node = None, self._root
+        while isinstance(node, _Node) and node.bit < crit:
+            node.digest = None
+            parent = node
+            node = node.right if _bit(leaf, node.bit) else node.left
+
+        if _bit(leaf, crit):
+            new = _Node(crit, node, leaf)
+        else:
+            new = _Node(crit, leaf, node)
+
+        if parent is None:
+            self._root = new
+        elif parent.right is node:
+            parent.right = new
+        else:
+            parent.left = new
+        self._size += 1
+
+    def remove(self, leaf):
+        """Remove a leaf (:obj:`bytes`) from the tree, if present."""
+        grandparent, parent, node = None, None, self._root
+        while isinstance(node, _Node):
+            grandparent, parent = parent, node
+            node = node.right if _bit(leaf, node.bit) else node.left
+        if node is None or node != leaf:
+            return
+
+        self._size -= 1
+        if parent is None:
+            self._root = None
+            return
+
+        sibling = parent.left if parent.right is node else parent.right
+        if grandparent is None:
+            self._root = sibling
+        elif grandparent.right is parent:
+            grandparent.right = sibling
+        else:
+            grandparent.left = sibling
+
+        node = self._root
+        while isinstance(node, _Node):
+            node.digest = None
+            node = node.right if _bit(leaf, node.bit) else node.left
+
+    def _digest(self, node):
+        if not isinstance(node, _Node):
+            return node
+        if node.digest is None:
+            node.digest = sha3_256(self._digest(node.left) +
+                                   self._digest(node.right)).digest()
+        return node.digest
+
+    @property
+    def root(self):
+        """str: Merkle root in hexadecimal form."""
+        if self._root is None:
+            return sha3_256(b'').hexdigest()
+        return self._digest(self._root).hex()
+
+
+def _unspent_outputs_from_dict(tx):
+    """Build the utxo records of a transaction as stored in the
+    ``transactions`` collection (i.e. without the asset of a ``CREATE``).
+    """
+    asset_id = tx.get('asset', {}).get('id', tx['id'])
+    return [{'transaction_id': tx['id'],
+             'output_index': index,
+             'amount': int(output['amount']),
+             'asset_id': asset_id,
+             'condition_uri': output['condition']['uri']}
+            for index, output in enumerate(tx['outputs'])]
+
+
+def _spent_links_from_dict(tx):
+    return [(input_['fulfills']['transaction_id'],
+             input_['fulfills']['output_index'])
+            for input_ in tx['inputs'] if input_.get('fulfills')]
+
+
+class UTXOSet:
+    """Set of the unspent outputs, keyed by ``(txid, output_index)``.
+
+    The set is loaded lazily from the ``utxos`` collection and updated
+    in memory with the transactions of every committed block. The changes
+    are then persisted with :meth:`flush`, using one batched write per
+    operation.
+
+    Args:
+        connection (:class:`~bigchaindb.backend.connection.Connection`):
+            A connection to the database.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._outputs = None
+        self._tree = None
+        self._to_store = {}
+        self._to_delete = set()
+
+    @property
+    def outputs(self):
+        if self._outputs is None:
+            self.load()
+        return self._outputs
+
+    @property
+    def merkle_root(self):
+        """str: Merkle root of the set in hexadecimal form (see
+        :class:`MerkleTree`).
+        """
+        if self._outputs is None:
+            self.load()
+        return self._tree.root
+
+    def _add(self, key):
+        if key not in self._outputs:
+            self._outputs.add(key)
+            self._tree.add(leaf_hash(*key))
+
+    def _remove(self, key):
+        if key in self._outputs:
+            self._outputs.remove(key)
+            self._tree.remove(leaf_hash(*key))
+
+    def load(self):
+        """Load the set from the database.
+
+        The first time, the ``utxos`` collection is rebuilt from the
+        ``transactions`` one (e.g. the node was running a version that did
+        not maintain it), and the rebuild is recorded so that it is not
+        done again.
+        """
+        self._outputs = {_key(utxo) for utxo in
+                         query.get_unspent_outputs(self.connection)}
+        self._to_store = {}
+        self._to_delete = set()
+        if not query.get_rebuild(self.connection, 'utxos'):
+            self._rebuild()
+            query.store_rebuild(self.connection, 'utxos')
+        self._tree = MerkleTree(leaf_hash(*key) for key in self._outputs)
+
+    def _rebuild(self):
+        unspent = {}
+        spent = set()
+        for tx in query.get_utxo_transactions(self.connection):
+            spent.update(_spent_links_from_dict(tx))
+            for utxo in _unspent_outputs_from_dict(tx):
+                unspent[_key(utxo)] = utxo
+
+        # the outputs already stored (e.g. by an interrupted rebuild) are
+        # not trusted, they are replaced by the ones of the transactions
+        stored = [{'transaction_id': txid, 'output_index': index}
+                  for txid, index in self._outputs]
+        for start in range(0, len(stored), DELETE_CHUNK_SIZE):
+            query.delete_unspent_outputs(
+                self.connection, *stored[start:start + DELETE_CHUNK_SIZE])
+
+        outputs = [utxo for key, utxo in unspent.items() if key not in spent]
+        if outputs:
+            logger.info('Rebuilding the UTXO set with %s outputs', len(outputs))
+            query.store_unspent_outputs(self.connection, *outputs)
+        self._outputs = {_key(utxo) for utxo in outputs}
+
+    def __contains__(self, key):
+        return key in self.outputs
+
+    def __len__(self):
+        return len(self.outputs)
+
+    def __iter__(self):
+        return iter(self.outputs)
+
+    def is_unspent(self, txid, output):
+        return (txid, output) in self.outputs
+
+    def update(self, transactions):
+        """Apply the given committed transactions to the set: remove the
+        outputs they spend and add the outputs they create.
+
+        Outputs created and spent within the same batch never reach the
+        database.
+
+        Args:
+            transactions (list): list of
+                :obj:`~bigchaindb.models.Transaction`.
+        """
+        if self._outputs is None:
+            self.load()
+        for transaction in transactions:
+            for spent_output in transaction.spent_outputs:
+                key = _key(spent_output)
+                self._remove(key)
+                if self._to_store.pop(key, None) is None:
+                    self._to_delete.add(key)
+            for utxo in transaction.unspent_outputs:
+                utxo = utxo._asdict()
+                key = _key(utxo)
+                self._add(key)
+                self._to_store[key] = utxo
+
+    def pop_changes(self):
+        """Return the changes not persisted yet and forget about them.
+
+        Returns:
+            tuple: the list of utxos to store and the list of utxos (with
+            only ``transaction_id`` and ``output_index``) to delete.
+        """
+        to_store = list(self._to_store.values())
+        to_delete = [{'transaction_id': txid, 'output_index': index}
+                     for txid, index in self._to_delete]
+        self._to_store = {}
+        self._to_delete = set()
+        return to_store, to_delete
+
+    def reset(self):
+        """Forget the in-memory state, including the pending changes, so
+        that the set is loaded again from the database when next used
+        (e.g. after the writes of :meth:`pop_changes` failed).
+        """
+        self._outputs = None
+        self._tree = None
+        self._to_store = {}
+        self._to_delete = set()
+
+    def flush(self):
+        """Persist the pending changes to the ``utxos`` collection."""
+        to_store, to_delete = self.pop_changes()
+        if to_delete:
+            query.delete_unspent_outputs(self.connection, *to_delete)
+        if to_store:
+            query.store_unspent_outputs(self.connection, *to_store)
+
+    def rollback(self, txn_ids):
+        """Revert the effect of the given transactions on the set, both in
+        memory and in the database.
+
+        The outputs created by the transactions are removed and the
+        outputs they spent are restored.
+
+        Args:
+            txn_ids (list): list of transaction ids.
+        """
+        rolled_back = set(txn_ids)
+        created = []
+        restored_links = set()
+        for tx in query.get_transactions(self.connection, list(rolled_back)):
+            created.extend(_key(utxo) for utxo in _unspent_outputs_from_dict(tx))
+            restored_links.update(link for link in _spent_links_from_dict(tx)
+                                  if link[0] not in rolled_back)
+
+        parents = query.get_transactions(
+            self.connection, list({txid for txid, _ in restored_links}))
+        restored = [utxo
+                    for tx in parents
+                    for utxo in _unspent_outputs_from_dict(tx)
+                    if _key(utxo) in restored_links]
+
+        # delete the restored outputs as well, as they may or may not have
+        # been removed depending on when the crash happened
+        to_delete = created + [_key(utxo) for utxo in restored]
+        if to_delete:
+            query.delete_unspent_outputs(
+                self.connection,
+                *[{'transaction_id': txid, 'output_index': index}
+                  for txid, index in to_delete])
+        if restored:
+            query.store_unspent_outputs(self.connection, *restored)
+
+        if self._outputs is not None:
+            for key in created:
+                self._remove(key)
+            for utxo in restored:
+                self._add(_key(utxo))
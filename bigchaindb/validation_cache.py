@@ -0,0 +1,83 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Cache of the transactions that passed ``check_tx``."""
+
+from collections import OrderedDict
+
+try:
+    from hashlib import sha3_256
+except ImportError:
+    # NOTE: neeeded for Python < 3.6
+    from sha3 import sha3_256
+
+
+# number of blocks an entry is kept for after its validation
+MAX_AGE = 100
+# maximum number of entries, the oldest ones are evicted first
+MAX_SIZE = 100000
+
+
+class ValidationCache:
+    """Transactions that passed ``check_tx``, by id, along with the height
+    they were validated at.
+
+    The id found in a transaction is only checked against its body during
+    the validation, so the digest of the raw transaction is stored as
+    well: a transaction is only considered verified if it is received
+    again with the very same bytes.
+    Its schema and signatures are then known to be valid, and only the
+    checks depending on the state (double spends, duplicates) have to be
+    performed again.
+
+    Args:
+        max_age (int): number of blocks an entry is kept for.
+        max_size (int): maximum number of entries.
+    """
+
+    def __init__(self, max_age=MAX_AGE, max_size=MAX_SIZE):
+        self.max_age = max_age
+        self.max_size = max_size
+        self.height = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def digest(raw_transaction):
+        return sha3_256(raw_transaction).digest()
+
+    def add(self, txid, raw_transaction):
+        """Record that the transaction has been validated at the current
+        height.
+        """
+        self._entries.pop(txid, None)
+        self._entries[txid] = (self.digest(raw_transaction), self.height)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def is_verified(self, txid, raw_transaction):
+        """Return ``True`` if the transaction has been validated with these
+        exact bytes.
+        """
+        entry = self._entries.get(txid)
+        return entry is not None and entry[0] == self.digest(raw_transaction)
+
+    def discard(self, txid):
+        self._entries.pop(txid, None)
+
+    def set_height(self, height):
+        """Move to a new height, evicting the entries validated more than
+        ``max_age`` blocks before it.
+        """
+        self.height = height
+        while self._entries:
+            txid, (_, validated_at) = next(iter(self._entries.items()))
+            if validated_at >= height - self.max_age:
+                break
+            del self._entries[txid]
+
+    def __contains__(self, txid):
+        return txid in self._entries
+
+    def __len__(self):
+        return len(self._entries)
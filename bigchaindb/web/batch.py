@@ -0,0 +1,272 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Validation of the batches of transactions posted to the HTTP API.
+
+The transactions are grouped by asset, so that a transaction is always
+validated along with the ones of the batch it may depend on, and the
+groups are spread over a pool of processes. Every process validates its
+share as a block is validated (see
+:class:`~bigchaindb.parallel_validation.ValidationWorker`): the committed
+state is fetched with a few queries before the transactions are validated
+one by one.
+"""
+
+import atexit
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import threading
+from collections import OrderedDict, defaultdict
+
+import rapidjson
+
+from bigchaindb.lib import BigchainDB
+from bigchaindb.common.block_context import BlockContext
+from bigchaindb.common.exceptions import SchemaValidationError, ValidationError
+from bigchaindb.models import Transaction
+from bigchaindb.parallel_validation import get_asset_id
+
+
+logger = logging.getLogger(__name__)
+
+# maximum number of transactions in a batch
+MAX_BATCH_SIZE = 10000
+# maximum size (in bytes) of the body of a batch
+MAX_BATCH_BYTES = 2 ** 25
+# batches up to this size are validated in the process of the request
+INLINE_SIZE = 64
+# number of processes validating the larger batches, the number of CPUs
+# by default
+PROCESSES = None
+# number of chunks a batch is split in, per process
+CHUNKS_PER_PROCESS = 4
+
+
+class BatchError(ValueError):
+    """Raised when the body of a batch cannot be parsed."""
+
+
+class BatchTooLarge(BatchError):
+    """Raised when a batch has too many transactions or bytes."""
+
+
+def _read_lines(stream, max_bytes):
+    """Yield the lines of ``stream``, without reading more than
+    ``max_bytes`` bytes of it.
+
+    Raises:
+        :exc:`BatchTooLarge`: if the stream is larger than ``max_bytes``.
+    """
+    remaining = max_bytes
+    while True:
+        line = stream.readline(remaining + 1)
+        if not line:
+            return
+        if len(line) > remaining:
+            raise BatchTooLarge('The batch is larger than {} bytes'.format(max_bytes))
+        remaining -= len(line)
+        yield line
+
+
+def parse_batch(stream, max_size=MAX_BATCH_SIZE, max_bytes=MAX_BATCH_BYTES):
+    """Parse the body of a batch: a JSON array of transactions, or one
+    transaction per line (NDJSON).
+
+    The body is read line by line, and no further than the limits: a
+    batch of NDJSON is refused as soon as it has one transaction too many.
+
+    Args:
+        stream: the body of the request, a binary file-like object.
+        max_size (int): maximum number of transactions.
+        max_bytes (int): maximum size of the body, in bytes.
+
+    Returns:
+        list: a ``(transaction, raw, error)`` triple per transaction, where
+        ``raw`` is the JSON document of the transaction if it is known,
+        and ``error`` is the error message of a line that is not valid
+        JSON.
+
+    Raises:
+        :exc:`BatchTooLarge`: if the batch exceeds the limits.
+        :exc:`BatchError`: if the body is not a JSON array nor NDJSON.
+    """
+    too_many = 'Too many transactions, the maximum is {}'.format(max_size)
+    lines = _read_lines(stream, max_bytes)
+    first = next((line for line in lines if line.strip()), b'')
+
+    if first.lstrip()[:1] == b'[':
+        try:
+            transactions = rapidjson.loads(first + b''.join(lines))
+        except ValueError as e:
+            raise BatchError('Invalid JSON array: {}'.format(e))
+        if not isinstance(transactions, list):
+            raise BatchError('The batch must be a JSON array')
+        if len(transactions) > max_size:
+            raise BatchTooLarge(too_many)
+        return [(transaction, None, None) for transaction in transactions]
+
+    items = []
+    for line in itertools.chain([first], lines):
+        line = line.rstrip(b'\r\n')
+        if not line.strip():
+            continue
+        if len(items) == max_size:
+            raise BatchTooLarge(too_many)
+        try:
+            items.append((rapidjson.loads(line), line, None))
+        except ValueError as e:
+            items.append((None, None, 'Invalid JSON: {}'.format(e)))
+    return items
+
+
+def validate_in_batch(bigchain, contexts, tx, raw=None):
+    """Validate a transaction of a batch against the committed state and
+    the transactions of the batch already validated.
+
+    Returns:
+        tuple: the ``(status_code, message)`` of the transaction, with
+        the messages of ``POST /transactions``.
+    """
+    try:
+        transaction = Transaction.from_dict(tx, raw=raw)
+        context = contexts[get_asset_id(tx)]
+        bigchain.validate_transaction(transaction, context)
+    except SchemaValidationError as e:
+        return (400, 'Invalid transaction schema: {}'.format(e.__cause__.message))
+    except ValidationError as e:
+        return (400, 'Invalid transaction ({}): {}'.format(type(e).__name__, e))
+
+    context.add(transaction)
+    return (202, '')
+
+
+def validate_chunk(bigchain, chunk):
+    """Validate a list of ``(index, transaction, raw)`` triples, in order.
+
+    Returns:
+        list: the ``(index, status_code, message)`` of every transaction.
+    """
+    bigchain.clear_cache()
+    try:
+        # fetch the inputs of the whole chunk with a few queries instead
+        # of a few queries per input
+        bigchain.prefetch([tx for _, tx, _ in chunk])
+        contexts = defaultdict(BlockContext)
+        return [(index,) + validate_in_batch(bigchain, contexts, tx, raw)
+                for index, tx, raw in chunk]
+    finally:
+        bigchain.clear_cache()
+
+
+def split_batch(transactions, chunks):
+    """Split ``(index, transaction, raw)`` triples in up to ``chunks``
+    chunks, keeping the transactions of an asset together and in order.
+    """
+    by_asset = OrderedDict()
+    for item in transactions:
+        try:
+            asset_id = get_asset_id(item[1])
+        except (KeyError, TypeError):
+            # malformed transactions are rejected by the validation
+            asset_id = None
+        by_asset.setdefault(asset_id, []).append(item)
+
+    split = [[] for _ in range(chunks)]
+    for group in sorted(by_asset.values(), key=len, reverse=True):
+        min(split, key=len).extend(group)
+    return [sorted(chunk) for chunk in split if chunk]
+
+
+# BigchainDB instance of the processes of the pool
+_validator = None
+
+
+def _init_validator():
+    global _validator
+    _validator = BigchainDB()
+
+
+def _validate_chunk(chunk):
+    return validate_chunk(_validator, chunk)
+
+
+class BatchValidator:
+    """Validate batches of transactions in a pool of processes.
+
+    The pool is created with the first batch large enough to need it, in
+    the process validating it, as the web server forks its workers after
+    the application is created. It is closed when the process exits.
+
+    Args:
+        processes (int): number of processes, the batches are validated
+            in the current process if it is 1.
+        inline_size (int): batches up to this size are validated in the
+            current process.
+    """
+
+    def __init__(self, processes=PROCESSES, inline_size=INLINE_SIZE):
+        self.processes = processes or mp.cpu_count()
+        self.inline_size = inline_size
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self):
+        if self._pid == os.getpid():
+            return self._pool
+        with self._lock:
+            if self._pid != os.getpid():
+                # a forked process does not have the processes of its
+                # parent's pool
+                self._pool = mp.Pool(self.processes, initializer=_init_validator)
+                self._pid = os.getpid()
+                atexit.register(self.close)
+        return self._pool
+
+    def close(self):
+        """Stop the processes of the pool of the current process, if any."""
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
+                self._pid = None
+
+    def validate(self, bigchain, items):
+        """Validate the transactions of a batch.
+
+        Args:
+            bigchain (:class:`~bigchaindb.lib.BigchainDB`): the instance
+                validating the small batches.
+            items (list): the transactions, as returned by
+                :func:`parse_batch`.
+
+        Returns:
+            list: the ``(status_code, message)`` of every transaction.
+        """
+        results = [None] * len(items)
+        transactions = []
+        for index, (tx, raw, error) in enumerate(items):
+            if error:
+                results[index] = (400, error)
+            elif not isinstance(tx, dict):
+                results[index] = (400, 'Invalid transaction: not a JSON object')
+            else:
+                transactions.append((index, tx, raw))
+
+        if len(transactions) <= self.inline_size or self.processes == 1:
+            validated = validate_chunk(bigchain, transactions)
+        else:
+            chunks = split_batch(transactions,
+                                 self.processes * CHUNKS_PER_PROCESS)
+            validated = [result
+                         for chunk in self.pool.imap_unordered(_validate_chunk, chunks)
+                         for result in chunk]
+
+        for index, status_code, message in validated:
+            results[index] = (status_code, message)
+        return results
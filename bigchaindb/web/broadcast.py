@@ -0,0 +1,186 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Asynchronous broadcast of the transactions posted to the HTTP API.
+
+The valid transactions are put in a bounded queue, which a few threads
+drain, each with its own connections to Tendermint. The transactions
+waiting together are sent at once (see
+:meth:`~bigchaindb.lib.BigchainDB.write_transactions`), and a request is
+refused, to be retried later, when the queue or the mempool of
+Tendermint is full.
+"""
+
+import logging
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from time import monotonic
+
+from bigchaindb.exceptions import BigchainDBError
+from bigchaindb.tendermint_rpc import BATCH_SIZE, RPCError
+
+
+logger = logging.getLogger(__name__)
+
+# maximum number of transactions waiting to be broadcast
+QUEUE_SIZE = 1000
+# number of threads broadcasting the transactions
+WORKERS = 4
+# number of transactions in the mempool of Tendermint above which no
+# transaction is accepted, Tendermint holds 5000 of them by default
+MEMPOOL_LIMIT = 4000
+# minimum number of seconds between two checks of the size of the mempool,
+# made after a broadcast and, while it is not empty, periodically
+MEMPOOL_CHECK_INTERVAL = 1
+# number of seconds a client is asked to wait before posting again
+RETRY_AFTER = 1
+# maximum number of seconds a request waits for the result of a broadcast
+# in the sync and commit modes, below the 30 seconds after which gunicorn
+# restarts a worker that does not answer
+RESULT_TIMEOUT = 20
+
+
+class Saturated(BigchainDBError):
+    """Raised when a transaction cannot be accepted for the time being."""
+
+
+class BroadcastPipeline:
+    """Queue of the transactions to broadcast to Tendermint.
+
+    The threads are started with the first transaction submitted, in the
+    process which submits it: the pipeline can be created before the web
+    server forks its workers.
+
+    Args:
+        bigchaindb_factory: a function returning the
+            :class:`~bigchaindb.lib.BigchainDB` instance of a thread.
+        queue_size (int): maximum number of transactions waiting.
+        workers (int): number of threads broadcasting the transactions.
+        mempool_limit (int): number of transactions in the mempool above
+            which the transactions are refused.
+    """
+
+    def __init__(self, bigchaindb_factory, queue_size=QUEUE_SIZE,
+                 workers=WORKERS, mempool_limit=MEMPOOL_LIMIT):
+        self.bigchaindb_factory = bigchaindb_factory
+        self.queue_size = queue_size
+        self.workers = workers
+        self.mempool_limit = mempool_limit
+        self.mempool_size = 0
+        self.queue = None
+        self._mempool_checked = 0
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _start(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # a forked process does not have the threads of its parent
+            self.queue = queue.Queue(self.queue_size)
+            for _ in range(self.workers):
+                threading.Thread(target=self._work, args=(self.queue,),
+                                 daemon=True).start()
+            self._pid = os.getpid()
+
+    def admit(self):
+        """Check that transactions can be broadcast.
+
+        Raises:
+            :exc:`Saturated`: if the mempool is full.
+        """
+        self._start()
+        if self.mempool_size >= self.mempool_limit:
+            raise Saturated('The mempool is full')
+
+    def submit(self, transaction, mode):
+        """Queue a valid transaction to be broadcast.
+
+        Args:
+            transaction (:class:`~bigchaindb.models.Transaction`): the
+                transaction.
+            mode (str): the method of Tendermint to broadcast it with.
+
+        Returns:
+            :class:`~concurrent.futures.Future`: the ``(status_code,
+            message)`` of the broadcast, as returned by
+            :meth:`~bigchaindb.lib.BigchainDB.write_transaction`, once
+            Tendermint answered. With ``broadcast_tx_commit``, the future
+            is done when the transaction is committed.
+
+        Raises:
+            :exc:`Saturated`: if the queue or the mempool is full.
+        """
+        self.admit()
+        future = Future()
+        try:
+            self.queue.put_nowait((transaction, mode, future))
+        except queue.Full:
+            raise Saturated('Too many transactions are waiting to be broadcast')
+        return future
+
+    def join(self):
+        """Wait until all the transactions submitted are broadcast."""
+        if self.queue is not None:
+            self.queue.join()
+
+    def _work(self, transactions):
+        bigchain = self.bigchaindb_factory()
+        while True:
+            # the size of the mempool is only polled while it holds
+            # transactions, an idle worker waits for the next one
+            timeout = MEMPOOL_CHECK_INTERVAL if self.mempool_size else None
+            try:
+                batch = [transactions.get(timeout=timeout)]
+            except queue.Empty:
+                batch = []
+            while batch and len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(transactions.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._broadcast(bigchain, batch)
+            finally:
+                for _ in batch:
+                    transactions.task_done()
+            self._check_mempool(bigchain)
+
+    def _broadcast(self, bigchain, batch):
+        by_mode = OrderedDict()
+        for transaction, mode, future in batch:
+            by_mode.setdefault(mode, []).append((transaction, future))
+
+        for mode, items in by_mode.items():
+            try:
+                if len(items) == 1:
+                    results = [bigchain.write_transaction(items[0][0], mode)]
+                else:
+                    results = bigchain.write_transactions(
+                        [transaction for transaction, _ in items], mode)
+            except Exception as exc:
+                logger.exception('Cannot broadcast %s transaction(s)', len(items))
+                for _, future in items:
+                    future.set_exception(exc)
+            else:
+                for (_, future), result in zip(items, results):
+                    future.set_result(result)
+
+    def _check_mempool(self, bigchain):
+        with self._lock:
+            if monotonic() - self._mempool_checked < MEMPOOL_CHECK_INTERVAL:
+                return
+            self._mempool_checked = monotonic()
+
+        try:
+            response = bigchain.rpc.call('num_unconfirmed_txs')
+            self.mempool_size = int(response['result']['n_txs'])
+        except (RPCError, KeyError, TypeError, ValueError) as exc:
+            logger.debug('Cannot get the size of the mempool: %s', exc)
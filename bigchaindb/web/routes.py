@@ -9,6 +9,7 @@ from bigchaindb.web.views import (
     metadata,
     blocks,
     info,
+    metrics,
     transactions as tx,
     outputs,
     validators,
@@ -34,6 +35,8 @@ ROUTES_API_V1 = [
     r('metadata/', metadata.MetadataApi),
     r('blocks/<int:block_id>', blocks.BlockApi),
     r('blocks/', blocks.BlockListApi),
+    r('metrics/', metrics.MetricsApi),
+    r('transactions/batch', tx.TransactionBatchApi),
     r('transactions/<string:tx_id>', tx.TransactionApi),
     r('transactions', tx.TransactionListApi),
     r('outputs/', outputs.OutputListApi),
@@ -16,6 +16,8 @@ import gunicorn.app.base
 
 from bigchaindb import utils
 from bigchaindb import BigchainDB
+from bigchaindb.web.batch import BatchValidator
+from bigchaindb.web.broadcast import BroadcastPipeline
 from bigchaindb.web.routes import add_routes
 from bigchaindb.web.strip_content_type_middleware import StripContentTypeMiddleware
 
@@ -59,13 +61,18 @@ class StandaloneApplication(gunicorn.app.base.BaseApplication):
         return self.application
 
 
-def create_app(*, debug=False, threads=1, bigchaindb_factory=None):
+def create_app(*, debug=False, threads=1, bigchaindb_factory=None,
+               metrics_snapshot=None, batch_processes=None):
     """Return an instance of the Flask application.
 
     Args:
         debug (bool): a flag to activate the debug mode for the app
             (default: False).
         threads (int): number of threads to use
+        metrics_snapshot (:class:`~bigchaindb.metrics.SharedSnapshot`): the
+            metrics published by the ABCI process.
+        batch_processes (int): number of processes of the pool validating
+            the batches of transactions, the number of CPUs by default.
     Return:
         an instance of the Flask application.
     """
@@ -81,18 +88,24 @@ def create_app(*, debug=False, threads=1, bigchaindb_factory=None):
     app.debug = debug
 
     app.config['bigchain_pool'] = utils.pool(bigchaindb_factory, size=threads)
+    app.config['broadcast_pipeline'] = BroadcastPipeline(bigchaindb_factory)
+    app.config['batch_validator'] = BatchValidator(batch_processes)
+    app.config['metrics_snapshot'] = metrics_snapshot
 
     add_routes(app)
 
     return app
 
 
-def create_server(settings, log_config=None, bigchaindb_factory=None):
+def create_server(settings, log_config=None, bigchaindb_factory=None,
+                  metrics_snapshot=None):
     """Wrap and return an application ready to be run.
 
     Args:
         settings (dict): a dictionary containing the settings, more info
             here http://docs.gunicorn.org/en/latest/settings.html
+        metrics_snapshot (:class:`~bigchaindb.metrics.SharedSnapshot`): the
+            metrics published by the ABCI process.
 
     Return:
         an initialized instance of the application.
@@ -109,9 +122,18 @@ def create_server(settings, log_config=None, bigchaindb_factory=None):
         # slower.
         settings['threads'] = 1
 
+    # every worker has its own pool of processes validating the batches,
+    # all of them together do not need more processes than there are CPUs
+    if settings.get('batch_processes'):
+        batch_processes = int(settings['batch_processes'])
+    else:
+        batch_processes = max(1, multiprocessing.cpu_count() // int(settings['workers']))
+
     settings['custom_log_config'] = log_config
     app = create_app(debug=settings.get('debug', False),
                      threads=settings['threads'],
-                     bigchaindb_factory=bigchaindb_factory)
+                     bigchaindb_factory=bigchaindb_factory,
+                     metrics_snapshot=metrics_snapshot,
+                     batch_processes=batch_processes)
     standalone = StandaloneApplication(app, options=settings)
     return standalone
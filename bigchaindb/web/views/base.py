@@ -6,7 +6,8 @@
 """
 import logging
 
-from flask import jsonify, request
+import rapidjson
+from flask import Response, jsonify, request
 
 from bigchaindb import config
 
@@ -29,6 +30,24 @@ def make_error(status_code, message=None):
     return response
 
 
+def stream_json_array(items, serialize=rapidjson.dumps):
+    """Return a response streaming a JSON array, serializing the items as
+    they come, rather than building the whole document in memory.
+
+    Args:
+        items (iterable): the items of the array.
+        serialize: the function serializing an item.
+    """
+    def generate():
+        separator = '['
+        for item in items:
+            yield separator + serialize(item)
+            separator = ','
+        yield ']' if separator == ',' else '[]'
+
+    return Response(generate(), mimetype='application/json')
+
+
 def base_ws_uri():
     """Base websocket URL that is advertised to external clients.
 
@@ -0,0 +1,28 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""This module provides the blueprint for the metrics API endpoint."""
+
+from flask import current_app
+from flask_restful import Resource
+
+from bigchaindb.metrics import registry
+
+
+class MetricsApi(Resource):
+    def get(self):
+        """API endpoint to get the latency histograms and block counters.
+
+        Return:
+            A JSON object with the histograms of the ABCI methods and of
+            the backend queries, and the counters of the last block and of
+            all the blocks, as published by the ABCI process after its last
+            commit. The metrics of the API process itself are returned when
+            none have been published.
+        """
+        shared_snapshot = current_app.config.get('metrics_snapshot')
+        snapshot = shared_snapshot.read() if shared_snapshot else None
+        if snapshot is None:
+            snapshot = registry.snapshot()
+        return snapshot
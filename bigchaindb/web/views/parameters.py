@@ -11,6 +11,11 @@ def valid_txid(txid):
     raise ValueError('Invalid hash')
 
 
+def valid_txids(txids):
+    """Validate a comma separated list of transaction ids."""
+    return [valid_txid(txid) for txid in txids.split(',')]
+
+
 def valid_bool(val):
     val = val.lower()
     if val == 'true':
@@ -44,3 +49,9 @@ def valid_mode(mode):
     if mode == 'commit':
         return 'broadcast_tx_commit'
     raise ValueError('Mode must be "async", "sync" or "commit"')
+
+
+def valid_limit(limit):
+    if limit.isdigit() and int(limit) > 0:
+        return int(limit)
+    raise ValueError('Limit must be a positive integer')
@@ -7,12 +7,16 @@
 For more information please refer to the documentation: http://bigchaindb.com/http-api
 """
 import logging
+from concurrent import futures
 
 from flask import current_app, request, jsonify
 from flask_restful import Resource, reqparse
 
 from bigchaindb.common.exceptions import SchemaValidationError, ValidationError
-from bigchaindb.web.views.base import make_error
+from bigchaindb.web.batch import (MAX_BATCH_BYTES, MAX_BATCH_SIZE, BatchError,
+                                  BatchTooLarge, parse_batch)
+from bigchaindb.web.broadcast import RESULT_TIMEOUT, RETRY_AFTER, Saturated
+from bigchaindb.web.views.base import make_error, stream_json_array
 from bigchaindb.web.views import parameters
 from bigchaindb.models import Transaction
 
@@ -43,20 +47,61 @@ class TransactionApi(Resource):
 
 class TransactionListApi(Resource):
     def get(self):
+        if 'ids' in request.args:
+            return self.get_by_ids()
+
         parser = reqparse.RequestParser()
         parser.add_argument('operation', type=parameters.valid_operation)
         parser.add_argument('asset_id', type=parameters.valid_txid,
                             required=True)
+        parser.add_argument('after', type=parameters.valid_txid)
+        parser.add_argument('limit', type=parameters.valid_limit)
         args = parser.parse_args()
 
-        with current_app.config['bigchain_pool']() as bigchain:
-            txs = bigchain.get_transactions_filtered(**args)
+        pool = current_app.config['bigchain_pool']
+
+        def transactions():
+            # the response is streamed after the view returned
+            with pool() as bigchain:
+                for tx in bigchain.get_transactions_filtered(**args):
+                    yield tx.to_dict()
+
+        return stream_json_array(transactions())
+
+    def get_by_ids(self):
+        """API endpoint to get many transactions at once, with
+        ``?ids=<tx_id>,<tx_id>,...``.
+
+        Return:
+            A JSON array of the transactions found, streamed as they are
+            read from the database.
+        """
+        parser = reqparse.RequestParser()
+        parser.add_argument('ids', type=parameters.valid_txids, required=True)
+        args = parser.parse_args()
 
-        return [tx.to_dict() for tx in txs]
+        pool = current_app.config['bigchain_pool']
+
+        def transactions():
+            # the response is streamed after the view returned
+            with pool() as bigchain:
+                for tx in bigchain.get_transactions_by_ids(args['ids']):
+                    yield tx.to_dict()
+
+        return stream_json_array(transactions())
 
     def post(self):
         """API endpoint to push transactions to the Federation.
 
+        The valid transactions are handed over to the broadcast pipeline
+        (see :mod:`bigchaindb.web.broadcast`). In ``async`` mode the
+        response is sent without waiting for Tendermint. In the other
+        modes the request waits for the answer of Tendermint, up to
+        ``RESULT_TIMEOUT`` seconds: the clients of the commit mode must
+        get the response once the transaction is committed (e.g. to post
+        a transfer of its outputs next), the async mode and the event
+        stream are the way to be notified of the commit without waiting.
+
         Return:
             A ``dict`` containing the data about the transaction.
         """
@@ -73,7 +118,7 @@ class TransactionListApi(Resource):
         tx = request.get_json(force=True)
 
         try:
-            tx_obj = Transaction.from_dict(tx)
+            tx_obj = Transaction.from_dict(tx, raw=request.get_data())
         except SchemaValidationError as e:
             return make_error(
                 400,
@@ -94,12 +139,94 @@ class TransactionListApi(Resource):
                     400,
                     'Invalid transaction ({}): {}'.format(type(e).__name__, e)
                 )
+
+        try:
+            result = current_app.config['broadcast_pipeline'].submit(tx_obj, mode)
+        except Saturated as e:
+            status_code, message = 503, str(e)
+        else:
+            if mode == 'broadcast_tx_async':
+                status_code, message = 202, ''
             else:
-                status_code, message = bigchain.write_transaction(tx_obj, mode)
+                try:
+                    status_code, message = result.result(timeout=RESULT_TIMEOUT)
+                except futures.TimeoutError:
+                    status_code, message = 504, 'Timed out waiting for Tendermint'
+                except Exception as e:
+                    status_code, message = 503, 'Cannot broadcast the transaction: {}'.format(e)
 
         if status_code == 202:
             response = jsonify(tx)
             response.status_code = 202
             return response
-        else:
-            return make_error(status_code, message)
+
+        response = make_error(status_code, message)
+        if status_code == 503:
+            response.headers['Retry-After'] = str(RETRY_AFTER)
+        return response
+
+
+class TransactionBatchApi(Resource):
+    def post(self):
+        """API endpoint to push a batch of transactions to the Federation.
+
+        The body is a JSON array of transactions, or one transaction per
+        line (NDJSON), of up to ``MAX_BATCH_SIZE`` transactions and
+        ``MAX_BATCH_BYTES`` bytes. The commit mode is refused. The
+        transactions are validated in parallel (see
+        :mod:`bigchaindb.web.batch`) and the valid ones are sent to
+        Tendermint in JSON-RPC batches.
+
+        Return:
+            A list with the ``id``, ``status`` and ``message`` of every
+            transaction, in the order of the batch.
+        """
+        parser = reqparse.RequestParser()
+        parser.add_argument('mode', type=parameters.valid_mode,
+                            default='broadcast_tx_async', location='args')
+        args = parser.parse_args()
+        mode = str(args['mode'])
+        if mode == 'broadcast_tx_commit':
+            # a worker would wait for as many commits as there are
+            # transactions
+            return make_error(
+                400,
+                'The commit mode is not supported for batches, use "async" or "sync"'
+            )
+
+        if (request.content_length or 0) > MAX_BATCH_BYTES:
+            return make_error(
+                413,
+                'The batch is larger than {} bytes'.format(MAX_BATCH_BYTES)
+            )
+        try:
+            items = parse_batch(request.stream, MAX_BATCH_SIZE, MAX_BATCH_BYTES)
+        except BatchTooLarge as e:
+            return make_error(413, str(e))
+        except BatchError as e:
+            return make_error(400, str(e))
+
+        with current_app.config['bigchain_pool']() as bigchain:
+            results = current_app.config['batch_validator'].validate(bigchain, items)
+
+            valid = [index for index, (status_code, _) in enumerate(results)
+                     if status_code == 202]
+            try:
+                current_app.config['broadcast_pipeline'].admit()
+            except Saturated as e:
+                written = [(503, str(e))] * len(valid)
+            else:
+                written = bigchain.write_transactions(
+                    [items[index][0] for index in valid], mode)
+            for index, result in zip(valid, written):
+                results[index] = result
+
+        response = jsonify([
+            {'id': tx.get('id') if isinstance(tx, dict) else None,
+             'status': status_code,
+             'message': message}
+            for (tx, _, _), (status_code, message) in zip(items, results)
+        ])
+        if any(status_code == 503 for status_code, _ in results):
+            response.headers['Retry-After'] = str(RETRY_AFTER)
+        return response
@@ -85,6 +85,13 @@ def test_connection_run_errors():
         conn.run(query)
     assert query.run.call_count == 2
 
+    # the queries of a transaction are not retried
+    query = mock.Mock()
+    query.run.side_effect = pymongo.errors.AutoReconnect('foo')
+    with pytest.raises(ConnectionError):
+        conn.run(query, retry=False)
+    assert query.run.call_count == 1
+
     query = mock.Mock()
     query.run.side_effect = pymongo.errors.DuplicateKeyError('foo')
     with pytest.raises(DuplicateKeyError):
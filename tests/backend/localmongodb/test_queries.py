@@ -3,6 +3,7 @@
 # Code is Apache-2.0 and docs are CC-BY-4.0
 
 from copy import deepcopy
+from unittest import mock
 
 import pytest
 import pymongo
@@ -38,6 +39,42 @@ def test_get_txids_filtered(signed_create_tx, signed_transfer_tx):
     assert txids == {signed_transfer_tx.id}
 
 
+def test_get_full_transactions_filtered(signed_create_tx, signed_transfer_tx,
+                                        user_pk, user_sk):
+    from bigchaindb.backend import connect, query
+    from bigchaindb.models import Transaction
+    conn = connect()
+
+    other_tx = Transaction.create([user_pk], [([user_pk], 1)],
+                                  asset={'other': True}).sign([user_sk])
+    transactions = [signed_create_tx.to_dict(), other_tx.to_dict(),
+                    signed_transfer_tx.to_dict()]
+    # the transfer is inserted first, but committed in a later block
+    conn.db.transactions.insert_many([
+        dict(transactions[2], height=2),
+        dict(transactions[1], height=1),
+        dict(transactions[0], height=1),
+    ])
+    asset_id = signed_create_tx.id
+
+    def ids(*args, **kwargs):
+        return [tx['id'] for tx in
+                query.get_full_transactions_filtered(conn, *args, **kwargs)]
+
+    # the transactions come in the order they were committed
+    assert ids(asset_id) == [signed_create_tx.id, signed_transfer_tx.id]
+    assert ids(asset_id, Transaction.TRANSFER) == [signed_transfer_tx.id]
+    assert ids(asset_id, limit=1) == [signed_create_tx.id]
+    assert ids(asset_id, after=signed_create_tx.id) == [signed_transfer_tx.id]
+    assert ids(asset_id, after=signed_transfer_tx.id) == []
+    assert ids(asset_id, after=other_tx.id) == [signed_create_tx.id,
+                                                signed_transfer_tx.id]
+    assert ids(asset_id, after='unknown') == []
+
+    assert list(query.get_full_transactions_filtered(conn, asset_id)) == [
+        transactions[0], transactions[2]]
+
+
 def test_write_assets():
     from bigchaindb.backend import connect, query
     conn = connect()
@@ -200,16 +237,117 @@ def test_get_metadata():
         assert query.get_metadata(conn, [meta['id']])
 
 
-def test_get_owned_ids(signed_create_tx, user_pk):
+def test_get_full_transactions(b, signed_create_tx, signed_transfer_tx):
+    from bigchaindb.backend import connect, query
+    conn = connect()
+
+    b.store_bulk_transactions([signed_create_tx, signed_transfer_tx])
+
+    assert query.get_full_transaction(conn, signed_create_tx.id) == \
+        signed_create_tx.to_dict()
+    assert query.get_full_transaction(conn, 'unknown') is None
+
+    transactions = query.get_full_transactions(
+        conn, [signed_create_tx.id, signed_transfer_tx.id, 'unknown'])
+    assert sorted(transactions, key=lambda tx: tx['id']) == sorted(
+        [signed_create_tx.to_dict(), signed_transfer_tx.to_dict()],
+        key=lambda tx: tx['id'])
+
+
+def test_owner_outputs(user_pk, user_sk, user2_pk):
+    from bigchaindb.backend import connect, query
+    from bigchaindb.models import Transaction
+    conn = connect()
+
+    def outputs(public_key, spent=None):
+        return sorted((output['transaction_id'], output['output_index'])
+                      for output in query.get_owner_outputs(conn, public_key, spent))
+
+    tx1 = Transaction.create([user_pk], [([user_pk], 1)] * 3).sign([user_sk])
+    inputs = tx1.to_inputs()
+    tx2 = Transaction.transfer(inputs[:1], [([user_pk, user2_pk], 1)],
+                               tx1.id).sign([user_sk])
+    query.store_transactions(conn, [tx1.to_dict(), tx2.to_dict()])
+    tx3 = Transaction.transfer(inputs[1:2], [([user2_pk], 1)],
+                               tx1.id).sign([user_sk])
+    query.store_transactions(conn, [tx3.to_dict()])
+
+    assert outputs(user_pk, spent=True) == [(tx1.id, 0), (tx1.id, 1)]
+    assert outputs(user_pk, spent=False) == sorted([(tx1.id, 2), (tx2.id, 0)])
+    assert outputs(user2_pk) == sorted([(tx2.id, 0), (tx3.id, 0)])
+    assert conn.db.owner_outputs.find_one({'transaction_id': tx1.id,
+                                           'output_index': 1},
+                                          {'_id': False}) == {
+        'public_key': user_pk, 'transaction_id': tx1.id, 'output_index': 1,
+        'amount': 1, 'asset_id': tx1.id, 'spent': True, 'spent_by': tx3.id}
+
+    query.delete_transactions(conn, [tx3.id])
+
+    assert outputs(user_pk, spent=True) == [(tx1.id, 0)]
+    assert outputs(user2_pk) == [(tx2.id, 0)]
+
+    # the collection is rebuilt from the transactions, starting over
+    conn.db.owner_outputs.delete_many({'transaction_id': tx2.id})
+    conn.db.owner_outputs.update_many({}, {'$set': {'spent': True}})
+    assert query.rebuild_owner_outputs(conn) == 2
+    assert outputs(user_pk, spent=True) == [(tx1.id, 0)]
+    assert outputs(user_pk, spent=False) == sorted([(tx1.id, 1), (tx1.id, 2),
+                                                    (tx2.id, 0)])
+    assert query.get_rebuild(conn, 'owner_outputs')
+
+    # only once, even if the collection is empty
+    conn.db.owner_outputs.delete_many({})
+    assert query.rebuild_owner_outputs(conn) == 0
+    assert outputs(user_pk) == []
+
+
+def test_owner_outputs_come_from_the_condition(user_pk, user_sk, user2_pk):
+    from bigchaindb.backend import connect, query
+    from bigchaindb.models import Transaction
+    conn = connect()
+
+    def owners():
+        return sorted((output['public_key'], output['output_index'])
+                      for output in conn.db.owner_outputs.find())
+
+    tx = Transaction.create([user_pk], [([user_pk], 1), ([user_pk, user2_pk], 1)])\
+                    .sign([user_sk])
+    tx = deepcopy(tx.to_dict())
+    # the public keys of the outputs claim other owners than their
+    # conditions
+    tx['outputs'][0]['public_keys'] = [user2_pk]
+    tx['outputs'][1]['public_keys'] = [user_pk]
+    query.store_transactions(conn, [tx])
+
+    expected = sorted([(user_pk, 0), (user_pk, 1), (user2_pk, 1)])
+    assert owners() == expected
+
+    conn.db.owner_outputs.delete_many({})
+    assert query.rebuild_owner_outputs(conn) == 1
+    assert owners() == expected
+
+
+def test_rebuild_transaction_heights(signed_create_tx, signed_transfer_tx):
     from bigchaindb.backend import connect, query
     conn = connect()
 
-    # insert a transaction
-    conn.db.transactions.insert_one(deepcopy(signed_create_tx.to_dict()))
+    create, transfer = signed_create_tx.to_dict(), signed_transfer_tx.to_dict()
+    conn.db.transactions.insert_many([deepcopy(create), deepcopy(transfer)])
+    conn.db.blocks.insert_many([
+        {'height': 1, 'app_hash': 'a', 'transactions': [create['id']]},
+        {'height': 2, 'app_hash': 'b', 'transactions': []},
+        {'height': 3, 'app_hash': 'c', 'transactions': [transfer['id']]},
+    ])
 
-    txns = list(query.get_owned_ids(conn, user_pk))
+    assert query.rebuild_transaction_heights(conn) == 2
+    assert {tx['id']: tx['height'] for tx in conn.db.transactions.find()} == {
+        create['id']: 1, transfer['id']: 3}
+    assert query.get_transaction(conn, create['id']) == create
 
-    assert txns[0] == signed_create_tx.to_dict()
+    # it is only done once
+    conn.db.transactions.update_many({}, {'$unset': {'height': ''}})
+    assert query.rebuild_transaction_heights(conn) == 0
+    assert not conn.db.transactions.find_one({'height': {'$exists': True}})
 
 
 def test_get_spending_transactions(user_pk, user_sk):
@@ -481,3 +619,95 @@ def test_store_abci_chain(description, stores, expected):
 
     actual = query.get_latest_abci_chain(conn)
     assert expected == actual, description
+
+
+def test_commit_block(signed_create_tx):
+    from bigchaindb.backend import connect, query
+    from bigchaindb.lib import Block
+    conn = connect()
+
+    conn.db.utxos.insert_one({'transaction_id': 'a', 'output_index': 0})
+    create = signed_create_tx.to_dict()
+    asset = create.pop('asset')
+    asset['id'] = create['id']
+    metadata = {'id': create['id'], 'metadata': create.pop('metadata')}
+    block = Block(app_hash='random_utxo', height=3,
+                  transactions=[create['id']])._asdict()
+
+    timings = query.commit_block(
+        conn, block, transactions=[create], assets=[asset],
+        metadata=[metadata],
+        unspent_outputs=[{'transaction_id': create['id'], 'output_index': 0}],
+        spent_outputs=[{'transaction_id': 'a', 'output_index': 0}])
+
+    assert set(timings) == {'transactions', 'owner_outputs', 'assets',
+                            'metadata', 'utxos', 'blocks'}
+    assert conn.db.transactions.find_one({'id': create['id']})['height'] == 3
+    assert query.get_transaction(conn, create['id']) == create
+    assert conn.db.assets.find_one({'id': create['id']})
+    assert conn.db.metadata.find_one({'id': create['id']})
+    assert [(u['transaction_id'], u['output_index'])
+            for u in conn.db.utxos.find()] == [(create['id'], 0)]
+    assert query.get_block(conn, 3)['transactions'] == [create['id']]
+    assert list(query.get_owner_outputs(conn, create['outputs'][0]['public_keys'][0])) == [
+        {'transaction_id': create['id'], 'output_index': 0}]
+
+    # an empty block only writes the block, and an existing block is kept
+    timings = query.commit_block(conn, dict(block, transactions=[]))
+    assert set(timings) == {'blocks'}
+    assert query.get_block(conn, 3)['transactions'] == [create['id']]
+
+
+@pytest.mark.parametrize('error', [
+    pymongo.errors.ConfigurationError('no sessions'),
+    pymongo.errors.OperationFailure('Transaction numbers are only allowed '
+                                    'on a replica set member or mongos',
+                                    code=20),
+])
+def test_commit_block_without_transactions(monkeypatch, error):
+    from bigchaindb.backend import connect, query
+    from bigchaindb.backend.exceptions import OperationError
+    from bigchaindb.backend.localmongodb import query as mongo_query
+    conn = connect()
+    conn._supports_transactions = True
+    block = {'app_hash': 'a', 'height': 1, 'transactions': []}
+
+    run_block_writes = mongo_query._run_block_writes
+    sessions = []
+
+    def run_in_session(conn, writes, session=None):
+        sessions.append(session)
+        if session is not None:
+            if isinstance(error, pymongo.errors.OperationFailure):
+                raise OperationError from error
+            raise error
+        return run_block_writes(conn, writes)
+
+    monkeypatch.setattr(conn.conn, 'start_session', mock.MagicMock())
+    monkeypatch.setattr(mongo_query, '_run_block_writes', run_in_session)
+
+    # the writes are done without a transaction, which is not tried again
+    assert query.commit_block(conn, block, session=True) == {'blocks': mock.ANY}
+    assert query.commit_block(conn, dict(block, height=2), session=True)
+    assert len(sessions) == 3 and sessions[1:] == [None, None]
+    assert conn.supports_transactions is False
+    assert query.get_block(conn, 2)
+
+
+def test_commit_block_transaction_error(monkeypatch):
+    from bigchaindb.backend import connect, query
+    from bigchaindb.backend.exceptions import OperationError
+    from bigchaindb.backend.localmongodb import query as mongo_query
+    conn = connect()
+    conn._supports_transactions = True
+
+    def run_in_session(conn, writes, session=None):
+        raise OperationError from pymongo.errors.OperationFailure('foo', code=112)
+
+    monkeypatch.setattr(conn.conn, 'start_session', mock.MagicMock())
+    monkeypatch.setattr(mongo_query, '_run_block_writes', run_in_session)
+
+    # other errors are not taken for a lack of support
+    with pytest.raises(OperationError):
+        query.commit_block(conn, {'height': 1}, session=True)
+    assert conn.supports_transactions is True
@@ -33,7 +33,7 @@ def test_create_tables():
     collection_names = conn.conn[dbname].list_collection_names()
     assert set(collection_names) == {
         'transactions', 'assets', 'metadata', 'blocks', 'utxos', 'validators', 'elections',
-        'pre_commit', 'abci_chains',
+        'pre_commit', 'abci_chains', 'owner_outputs', 'rebuilds',
     }
 
     indexes = conn.conn[dbname]['assets'].index_information().keys()
@@ -42,7 +42,8 @@ def test_create_tables():
     index_info = conn.conn[dbname]['transactions'].index_information()
     indexes = index_info.keys()
     assert set(indexes) == {
-            '_id_', 'transaction_id', 'asset_id', 'outputs', 'inputs'}
+            '_id_', 'transaction_id', 'asset_id', 'asset_id_height', 'outputs',
+            'inputs'}
     assert index_info['transaction_id']['unique']
 
     index_info = conn.conn[dbname]['blocks'].index_information()
@@ -56,6 +57,17 @@ def test_create_tables():
     assert index_info['utxo']['key'] == [('transaction_id', 1),
                                          ('output_index', 1)]
 
+    index_info = conn.conn[dbname]['owner_outputs'].index_information()
+    assert set(index_info.keys()) == {'_id_', 'owner', 'output'}
+    assert index_info['owner']['key'] == [('public_key', 1), ('spent', 1),
+                                          ('transaction_id', 1),
+                                          ('output_index', 1)]
+    assert index_info['output']['unique']
+
+    index_info = conn.conn[dbname]['rebuilds'].index_information()
+    assert set(index_info.keys()) == {'_id_', 'collection'}
+    assert index_info['collection']['unique']
+
     indexes = conn.conn[dbname]['elections'].index_information()
     assert set(indexes.keys()) == {'_id_', 'election_id_height'}
     assert indexes['election_id_height']['unique']
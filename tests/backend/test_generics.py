@@ -20,7 +20,12 @@ def test_schema(schema_func_name, args_qty):
 @mark.parametrize('query_func_name,args_qty', (
     ('delete_transactions', 1),
     ('get_txids_filtered', 1),
-    ('get_owned_ids', 1),
+    ('get_full_transactions_filtered', 1),
+    ('get_owner_outputs', 1),
+    ('get_rebuild', 1),
+    ('store_rebuild', 1),
+    ('rebuild_transaction_heights', 0),
+    ('rebuild_owner_outputs', 0),
     ('get_block', 1),
     ('get_spent', 2),
     ('get_spending_transactions', 1),
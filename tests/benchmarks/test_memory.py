@@ -0,0 +1,76 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Memory used by the objects of a deserialized transaction.
+
+The :class:`~bigchaindb.common.transaction.Input`,
+:class:`~bigchaindb.common.transaction.Output` and
+:class:`~bigchaindb.common.transaction.TransactionLink` objects are
+compared with instances of equivalent classes holding the same values in
+a ``__dict__``, as measured by ``tracemalloc``. Run with ``-s`` to see the
+figures.
+"""
+
+import tracemalloc
+
+import pytest
+
+from bigchaindb.common.transaction import Input, Output, TransactionLink
+
+
+COUNT = 10000
+# maximum ratio between the memory used by the objects and the memory used
+# by their equivalents with a ``__dict__`` (about 0.4 to 0.5 on CPython 3.6)
+MAX_RATIO = 0.75
+
+
+class DictInput:
+    def __init__(self, fulfillment, owners_before, fulfills=None):
+        self._fulfillment = fulfillment
+        self._fulfillment_uri = None
+        self.fulfills = fulfills
+        self.owners_before = owners_before
+
+
+class DictOutput:
+    def __init__(self, fulfillment, public_keys=None, amount=1):
+        self.fulfillment = fulfillment
+        self.amount = amount
+        self.public_keys = public_keys
+
+
+class DictTransactionLink:
+    def __init__(self, txid=None, output=None):
+        self.txid = txid
+        self.output = output
+
+
+def allocated(build):
+    """Return the number of bytes allocated by ``build()`` and still in
+    use after it returned, per object built.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        objects = build()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return size / len(objects)
+
+
+@pytest.mark.parametrize('cls,baseline,args', [
+    (TransactionLink, DictTransactionLink, ('a' * 64, 0)),
+    (Output, DictOutput, (None, ['pubkey'], 1)),
+    (Input, DictInput, (None, ['pubkey'])),
+])
+def test_slots_use_less_memory(cls, baseline, args):
+    slotted_size = allocated(lambda: [cls(*args) for _ in range(COUNT)])
+    dict_size = allocated(lambda: [baseline(*args) for _ in range(COUNT)])
+
+    print('\n{}: {:.0f} bytes per object (with a __dict__: {:.0f} bytes)'
+          .format(cls.__name__, slotted_size, dict_size))
+
+    assert slotted_size < dict_size * MAX_RATIO
@@ -0,0 +1,102 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Time taken to validate the keys and "language" values of deep and wide
+payloads.
+
+The asset and metadata of a transaction are validated as
+:meth:`bigchaindb.models.Transaction.validate_schema` does, with the walk
+checking the keys and the languages at once, and compared with the
+recursive walks done before: the key check of the asset and the metadata,
+with an uncompiled regular expression, followed by the language check of
+the asset. Run with ``-s`` to see the figures.
+"""
+
+import re
+from timeit import timeit
+
+import pytest
+
+from bigchaindb.backend.schema import validate_language
+from bigchaindb.common.exceptions import ValidationError
+from bigchaindb.common.utils import validate_key, validate_txn_obj
+
+
+NUMBER = 20
+REPEAT = 10
+
+
+def deep_payload(depth, width):
+    """Return a payload nested ``depth`` levels deep, with ``width`` keys
+    and a "language" value at every level.
+    """
+    payload = {'leaf': 'value'}
+    for level in range(depth):
+        payload = dict({'key_{}'.format(index): index for index in range(width)},
+                       language='english', nested=payload)
+    return payload
+
+
+def recursive_validate_key(obj_name, key):
+    if re.search(r'^[$]|\.|\x00', key):
+        raise ValidationError('Invalid key name "{}" in {} object'
+                              .format(key, obj_name))
+
+
+def recursive_validate_all_keys(obj_name, obj, validation_fun):
+    for key, value in obj.items():
+        validation_fun(obj_name, key)
+        if isinstance(value, dict):
+            recursive_validate_all_keys(obj_name, value, validation_fun)
+
+
+def recursive_validate_all_values_for_key(obj, key, validation_fun):
+    for vkey, value in obj.items():
+        if vkey == key:
+            validation_fun(value)
+        elif isinstance(value, dict):
+            recursive_validate_all_values_for_key(value, key, validation_fun)
+
+
+def recursive_walks(tx_body):
+    recursive_validate_all_keys('asset', tx_body['asset']['data'],
+                                recursive_validate_key)
+    recursive_validate_all_keys('metadata', tx_body['metadata'],
+                                recursive_validate_key)
+    recursive_validate_all_values_for_key(tx_body['asset']['data'],
+                                          'language', validate_language)
+
+
+def one_walk(tx_body):
+    validate_txn_obj('asset', tx_body['asset'], 'data', validate_key,
+                     'language', validate_language)
+    validate_txn_obj('metadata', tx_body, 'metadata', validate_key)
+
+
+@pytest.mark.parametrize('depth,width', [
+    (10, 100),
+    (100, 10),
+    (500, 1),
+])
+def test_one_walk_validation(depth, width):
+    tx_body = {
+        'asset': {'data': deep_payload(depth, width)},
+        'metadata': deep_payload(depth, width),
+    }
+    one_walk(tx_body)
+    recursive_walks(tx_body)
+
+    # the runs are interleaved, so that both are as affected by the load
+    recursive, single = float('inf'), float('inf')
+    for _ in range(REPEAT):
+        recursive = min(recursive,
+                        timeit(lambda: recursive_walks(tx_body), number=NUMBER))
+        single = min(single, timeit(lambda: one_walk(tx_body), number=NUMBER))
+
+    print('\ndepth {}, width {}: {:.3f}ms (recursive walks: {:.3f}ms)'.format(
+        depth, width, single * 1000 / NUMBER, recursive * 1000 / NUMBER))
+
+    # the asset is walked once instead of twice, and the keys are checked
+    # with a compiled regular expression
+    assert single < recursive
@@ -96,6 +96,8 @@ def test__run_init(mocker):
     bigchain_mock.assert_called_once_with()
     init_db_mock.assert_called_once_with(
         connection=bigchain_mock.return_value.connection)
+    bigchain_mock.return_value.rebuild_transaction_heights.assert_called_once_with()
+    bigchain_mock.return_value.rebuild_owner_outputs.assert_called_once_with()
 
 
 @patch('bigchaindb.backend.schema.drop_database')
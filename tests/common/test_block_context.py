@@ -0,0 +1,40 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+
+def test_block_context_indexes(user_pub, user_priv):
+    from bigchaindb.common.block_context import BlockContext
+    from bigchaindb.common.transaction import Transaction
+
+    create = Transaction.create([user_pub], [([user_pub], 1)] * 2)\
+        .sign([user_priv])
+    transfer = Transaction.transfer(create.to_inputs()[:1],
+                                    [([user_pub], 1)], create.id)\
+        .sign([user_priv])
+
+    context = BlockContext([create])
+    context.add(transfer)
+
+    assert list(context) == [create, transfer]
+    assert len(context) == 2
+    assert context.get_transaction(create.id) == create
+    assert context.get_transaction('unknown') is None
+    assert context.get_spent(create.id, 0) == [transfer]
+    assert context.get_spent(create.id, 1) == []
+
+
+def test_block_context_wrap(user_pub, user_priv):
+    from bigchaindb.common.block_context import BlockContext
+    from bigchaindb.common.transaction import Transaction
+
+    create = Transaction.create([user_pub], [([user_pub], 1)])\
+        .sign([user_priv])
+
+    context = BlockContext()
+    assert BlockContext.wrap(context) is context
+    assert not context
+
+    context = BlockContext.wrap([create])
+    assert isinstance(context, BlockContext)
+    assert context.get_transaction(create.id) == create
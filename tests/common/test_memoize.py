@@ -3,22 +3,25 @@
 # Code is Apache-2.0 and docs are CC-BY-4.0
 
 import pytest
+import rapidjson
 from copy import deepcopy
 
 from bigchaindb.models import Transaction
 from bigchaindb.common.crypto import generate_key_pair
-from bigchaindb.common.memoize import to_dict, from_dict
-
-
-pytestmark = pytest.mark.bdb
+from bigchaindb.common.memoize import (MemoCache, clear_caches, from_dict,
+                                       invalidate, to_dict)
+from bigchaindb.common.signatures import verdicts
 
 
+@pytest.mark.bdb
 def test_memoize_to_dict(b):
     alice = generate_key_pair()
     asset = {
         'data': {'id': 'test_id'},
     }
 
+    clear_caches()
+
     assert to_dict.cache_info().hits == 0
     assert to_dict.cache_info().misses == 0
 
@@ -39,12 +42,15 @@ def test_memoize_to_dict(b):
     assert to_dict.cache_info().misses == 1
 
 
+@pytest.mark.bdb
 def test_memoize_from_dict(b):
     alice = generate_key_pair()
     asset = {
         'data': {'id': 'test_id'},
     }
 
+    clear_caches()
+
     assert from_dict.cache_info().hits == 0
     assert from_dict.cache_info().misses == 0
 
@@ -52,28 +58,28 @@ def test_memoize_from_dict(b):
                             [([alice.public_key], 1)],
                             asset=asset,)\
                     .sign([alice.private_key])
-    tx_dict = deepcopy(tx.to_dict())
+    raw = rapidjson.dumps(tx.to_dict()).encode()
 
-    Transaction.from_dict(tx_dict)
+    Transaction.from_dict(rapidjson.loads(raw), raw=raw)
 
     assert from_dict.cache_info().hits == 0
     assert from_dict.cache_info().misses == 1
 
-    Transaction.from_dict(tx_dict)
-    Transaction.from_dict(tx_dict)
+    Transaction.from_dict(rapidjson.loads(raw), raw=raw)
+    Transaction.from_dict(rapidjson.loads(raw), raw=raw)
 
     assert from_dict.cache_info().hits == 2
     assert from_dict.cache_info().misses == 1
 
 
-def test_memoize_input_valid(b):
+@pytest.mark.bdb
+def test_memoize_signature_verdicts(b):
     alice = generate_key_pair()
     asset = {
         'data': {'id': 'test_id'},
     }
 
-    assert Transaction._input_valid.cache_info().hits == 0
-    assert Transaction._input_valid.cache_info().misses == 0
+    clear_caches()
 
     tx = Transaction.create([alice.public_key],
                             [([alice.public_key], 1)],
@@ -82,11 +88,111 @@ def test_memoize_input_valid(b):
 
     tx.inputs_valid()
 
-    assert Transaction._input_valid.cache_info().hits == 0
-    assert Transaction._input_valid.cache_info().misses == 1
+    assert verdicts.cache_info().hits == 0
+    assert verdicts.cache_info().misses == 1
 
     tx.inputs_valid()
     tx.inputs_valid()
 
-    assert Transaction._input_valid.cache_info().hits == 2
-    assert Transaction._input_valid.cache_info().misses == 1
+    assert verdicts.cache_info().hits == 2
+    assert verdicts.cache_info().misses == 1
+
+
+def test_memo_cache_is_bounded_by_bytes():
+    cache = MemoCache('test', max_bytes=100)
+    cache.put('a', 1, 40)
+    cache.put('b', 2, 40)
+    assert cache.get('a') == 1
+
+    cache.put('c', 3, 40)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+    cache.put('d', 4, 101)
+    assert cache.get('d') is None
+    assert cache.cache_info() == (3, 2, 1, 2, 80, 100, None)
+
+    cache.cache_clear()
+    assert cache.cache_info() == (0, 0, 0, 0, 0, 100, None)
+
+
+def test_memo_cache_is_bounded_by_entries():
+    cache = MemoCache('test', max_bytes=100, max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2, 10)
+    cache.put('c', 3)
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    assert cache.cache_info() == (1, 1, 1, 2, 10, 100, 2)
+
+
+def test_memo_cache_invalidate():
+    cache = MemoCache('test', max_bytes=100)
+    cache.put('a', 1, 10, tag='tx')
+    cache.put('b', 2, 10, tag='tx')
+    cache.put('c', 3, 10, tag='other')
+    cache.invalidate('tx')
+    cache.invalidate('unknown')
+    assert cache.get('a') is None
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    assert cache.bytes == 10
+    assert cache._tags == {'other': {'c'}}
+
+
+def test_invalidate_removes_a_transaction_from_every_cache():
+    alice = generate_key_pair()
+    tx = Transaction.create([alice.public_key], [([alice.public_key], 1)])\
+                    .sign([alice.private_key])
+    raw = rapidjson.dumps(tx.to_dict()).encode()
+
+    clear_caches()
+    decoded = Transaction.from_dict(rapidjson.loads(raw), True, raw=raw)
+    decoded.to_dict()
+    assert len(from_dict) == len(to_dict) == 1
+
+    invalidate(tx.id)
+    assert len(from_dict) == len(to_dict) == 0
+    assert Transaction.from_dict(rapidjson.loads(raw), True,
+                                 raw=raw) is not decoded
+
+
+def test_memoize_from_dict_without_raw_is_not_memoized():
+    alice = generate_key_pair()
+    tx = Transaction.create([alice.public_key], [([alice.public_key], 1)])\
+                    .sign([alice.private_key])
+    tx_dict = deepcopy(tx.to_dict())
+    tampered = deepcopy(tx_dict)
+    tampered['inputs'][0]['fulfillment'] = Transaction.create(
+        [alice.public_key], [([alice.public_key], 1)],
+        metadata={'other': 'tx'}).sign([alice.private_key]).to_dict()['inputs'][0]['fulfillment']
+
+    clear_caches()
+    # the id covers the fulfillments, so this only matters when the id is
+    # not checked
+    genuine = Transaction.from_dict(tx_dict, skip_schema_validation=True)
+    assert Transaction.from_dict(tx_dict,
+                                 skip_schema_validation=True) is not genuine
+    forged = Transaction.from_dict(tampered, skip_schema_validation=True)
+    assert not forged.inputs_valid()
+    assert from_dict.cache_info() == (0, 0, 0, 0, 0, from_dict.max_bytes,
+                                      from_dict.max_entries)
+
+
+def test_memoize_from_dict_with_raw():
+    alice = generate_key_pair()
+    tx = Transaction.create([alice.public_key], [([alice.public_key], 1)])\
+                    .sign([alice.private_key])
+    raw = rapidjson.dumps(tx.to_dict()).encode()
+    tampered = raw.replace(b'"amount":"1"', b'"amount":"2"')
+    assert tampered != raw
+
+    clear_caches()
+    genuine = Transaction.from_dict(rapidjson.loads(raw), True, raw=raw)
+    # the same document decoded again is a hit
+    assert Transaction.from_dict(rapidjson.loads(raw), True, raw=raw) is genuine
+    assert Transaction.from_dict(rapidjson.loads(tampered), True,
+                                 raw=tampered) is not genuine
+    assert from_dict.cache_info().hits == 1
+    assert from_dict.cache_info().misses == 2
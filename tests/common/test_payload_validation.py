@@ -0,0 +1,90 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Validation of the keys and "language" values of deep payloads.
+
+The walk checking the keys and the languages at once must accept and
+reject the same payloads as the separate walks done before, the key
+check followed by :func:`~bigchaindb.backend.schema.validate_language_key`.
+"""
+
+import pytest
+
+from bigchaindb.backend.schema import validate_language, validate_language_key
+from bigchaindb.common.exceptions import ValidationError
+from bigchaindb.common.utils import validate_all_keys, validate_key
+
+
+def deep_payload(depth, width):
+    """Return a payload nested ``depth`` levels deep, with ``width`` keys
+    and a "language" value at every level.
+    """
+    payload = {'leaf': 'value'}
+    for level in range(depth):
+        payload = dict({'key_{}'.format(index): index for index in range(width)},
+                       language='english', nested=payload)
+    return payload
+
+
+def separate_walks(payload):
+    validate_all_keys('asset', payload, validate_key)
+    validate_language_key({'data': payload}, 'data')
+
+
+def one_walk(payload):
+    validate_all_keys('asset', payload, validate_key,
+                      'language', validate_language)
+
+
+def outcome(validate, payload):
+    """Return the type of the error raised by ``validate(payload)``, if
+    any.
+    """
+    try:
+        validate(payload)
+    except Exception as e:
+        return type(e)
+    return None
+
+
+@pytest.mark.parametrize('payload', [
+    deep_payload(10, 100),
+    deep_payload(200, 5),
+    {},
+    {'language': 'english'},
+    {'language': 'klingon'},
+    {'language': None},
+    {'language': ['english']},
+    {'language': {'language': 'english'}},
+    {'lang': 'klingon', 'nested': {'language': 'none'}},
+    {'nested': {'list': [{'language': 'klingon'}]}},
+    {'nested': {'list': [{'bad.key': 1}]}},
+    {'nested': {'$bad': 1, 'language': 'klingon'}},
+    {'nested': {'language': 'klingon', 'bad\x00key': 1}},
+])
+def test_one_walk_agrees_with_separate_walks(payload):
+    assert outcome(one_walk, payload) == outcome(separate_walks, payload)
+
+
+@pytest.mark.parametrize('path,key,value', [
+    (['nested'] * 3, 'bad.key', 1),
+    (['nested'] * 5, '$bad', 1),
+    (['nested'] * 7, 'language', 'klingon'),
+])
+def test_one_walk_finds_invalid_payloads(path, key, value):
+    payload = deep_payload(10, 3)
+    node = payload
+    for name in path:
+        node = node[name]
+    node[key] = value
+
+    with pytest.raises(ValidationError):
+        separate_walks(payload)
+    with pytest.raises(ValidationError):
+        one_walk(payload)
+
+
+def test_one_walk_does_not_recurse():
+    payload = deep_payload(5000, 1)
+    one_walk(payload)
@@ -8,6 +8,7 @@ properties related to validation.
 
 from unittest.mock import patch
 
+import rapidjson
 from hypothesis import given
 from hypothesis_regex import regex
 from pytest import raises
@@ -15,6 +16,7 @@ from pytest import raises
 from bigchaindb.common.exceptions import SchemaValidationError
 from bigchaindb.common.schema import (
     TX_SCHEMA_COMMON,
+    combine_schemas,
     validate_transaction_schema,
 )
 
@@ -73,6 +75,36 @@ def test_validate_failure_inconsistent():
             validate_transaction_schema({})
 
 
+def test_validate_transaction_from_raw_bytes(signed_transfer_tx):
+    tx = signed_transfer_tx.to_dict()
+    raw = rapidjson.dumps(tx).encode()
+
+    with patch('rapidjson.dumps') as dumps:
+        validate_transaction_schema(tx, raw)
+        assert not dumps.called
+
+    tx['asset'] = {'data': None}
+    with raises(SchemaValidationError) as exc:
+        validate_transaction_schema(tx, rapidjson.dumps(tx).encode())
+    # the message is the one of jsonschema
+    assert exc.value.__cause__.message
+
+
+def test_combine_schemas_keeps_definitions_apart():
+    first = ({'definitions': {'value': {'type': 'string'}},
+              'properties': {'a': {'$ref': '#/definitions/value'}}}, None)
+    second = ({'definitions': {'value': {'type': 'integer'}},
+               'properties': {'b': {'$ref': '#/definitions/value'}}}, None)
+    schemas, validator = combine_schemas(first, second)
+
+    assert schemas == (first[0], second[0])
+    validator('{"a": "x", "b": 1}')
+    for invalid in ('{"a": 1}', '{"b": "x"}'):
+        with raises(ValueError):
+            validator(invalid)
+    assert combine_schemas(first, second)[1] is validator
+
+
 @given(condition_uri=regex(
     r'^ni:\/\/\/sha-256;([a-zA-Z0-9_-]{{0,86}})\?fpt=({})'
     r'&cost=[0-9]+(?![\n])$'.format('|'.join(
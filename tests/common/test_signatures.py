@@ -0,0 +1,94 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import pytest
+
+
+def test_verdicts_are_reused(monkeypatch, user_pub, user_priv,
+                             user2_pub, user2_priv):
+    from bigchaindb.common import signatures
+    from bigchaindb.common.transaction import Transaction
+
+    tx = Transaction.create([user_pub], [([user_pub], 1)]).sign([user_priv])
+    transfer = Transaction.transfer(tx.to_inputs(), [([user_pub, user2_pub], 1)],
+                                    tx.id).sign([user_priv])
+    threshold = Transaction.transfer(transfer.to_inputs(), [([user_pub], 1)],
+                                     tx.id).sign([user_priv, user2_priv])
+    assert Transaction.from_dict(tx.to_dict()).inputs_valid()
+    assert Transaction.from_dict(threshold.to_dict()).inputs_valid(transfer.outputs)
+    public_key = tx.inputs[0].fulfillment.public_key
+    assert not signatures.verify_signature(public_key, b'message', bytes(64))
+
+    def fail(*args):
+        raise AssertionError('the signature has been verified already')
+
+    monkeypatch.setattr(signatures, 'VerifyKey', fail)
+    assert Transaction.from_dict(tx.to_dict()).inputs_valid()
+    assert Transaction.from_dict(threshold.to_dict()).inputs_valid(transfer.outputs)
+    assert not signatures.verify_signature(public_key, b'message', bytes(64))
+
+
+def test_verify_signature_with_malformed_key():
+    from bigchaindb.common.signatures import verify_signature
+
+    # only a wrong signature is a negative verdict
+    with pytest.raises(ValueError):
+        verify_signature(b'not a key', b'message', bytes(64))
+
+
+def test_validate_fulfillment_threshold_errors(user_pub, user_priv):
+    from cryptoconditions import Ed25519Sha256, ThresholdSha256
+    from cryptoconditions.exceptions import ValidationError
+    from base58 import b58decode
+    from bigchaindb.common.signatures import validate_fulfillment
+
+    signed = Ed25519Sha256(public_key=b58decode(user_pub))
+    signed.sign(b'message', b58decode(user_priv))
+
+    fulfillment = ThresholdSha256(threshold=1)
+    fulfillment.add_subfulfillment(signed)
+    assert validate_fulfillment(fulfillment, b'message')
+    assert not validate_fulfillment(fulfillment, b'other message')
+
+    fulfillment.add_subfulfillment(signed)
+    with pytest.raises(ValidationError):
+        validate_fulfillment(fulfillment, b'message')
+
+    fulfillment.threshold = 3
+    with pytest.raises(ValidationError):
+        validate_fulfillment(fulfillment, b'message')
+
+
+def test_transaction_signatures(user_pub, user_priv, user2_pub, user2_priv):
+    from bigchaindb.common.signatures import (transaction_signatures,
+                                              verify_signatures)
+    from bigchaindb.common.transaction import Transaction
+
+    tx = Transaction.create([user_pub], [([user_pub, user2_pub], 1)]).sign([user_priv])
+    threshold = Transaction.transfer(tx.to_inputs(), [([user_pub], 1)],
+                                     tx.id).sign([user_priv, user2_priv])
+
+    # the signatures nested in the threshold fulfillment are collected
+    triples = transaction_signatures(threshold.to_dict())
+    assert len(triples) == 2
+    assert len({message for _, message, _ in triples}) == 1
+    assert verify_signatures(triples)
+    assert not verify_signatures(triples[:1] + [triples[1][:2] + (bytes(64),)])
+
+
+def test_verify_transactions(user_pub, user_priv):
+    from copy import deepcopy
+    from cryptoconditions import Fulfillment
+    from bigchaindb.common.signatures import verify_transactions
+    from bigchaindb.common.transaction import Transaction
+
+    tx = Transaction.create([user_pub], [([user_pub], 1)]).sign([user_priv])
+    tampered = deepcopy(tx.to_dict())
+    fulfillment = Fulfillment.from_uri(tampered['inputs'][0]['fulfillment'])
+    fulfillment.signature = bytes(64)
+    tampered['inputs'][0]['fulfillment'] = fulfillment.serialize_uri()
+    unsigned = Transaction.create([user_pub], [([user_pub], 1)]).to_dict()
+
+    assert verify_transactions([(0, tx.to_dict()), (1, tampered),
+                                (2, unsigned), (3, {'inputs': None})]) == [1, 2, 3]
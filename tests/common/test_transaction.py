@@ -44,6 +44,28 @@ def test_input_deserialization_with_uri(ffill_uri, user_pub):
     assert input == expected
 
 
+def test_input_keeps_parsed_fulfillment_uri(monkeypatch, user_pub, user_priv):
+    from cryptoconditions import Fulfillment
+    from bigchaindb.common.transaction import Transaction
+
+    tx = Transaction.create([user_pub], [([user_pub], 1)]).sign([user_priv])
+    tx_dict = tx.to_dict()
+    parsed = Transaction.from_dict(tx_dict)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('the fulfillment should not be parsed again')
+
+    monkeypatch.setattr(Fulfillment, 'from_uri', fail)
+    monkeypatch.setattr(type(parsed.inputs[0].fulfillment), 'serialize_uri', fail)
+    assert parsed.inputs[0].to_dict()['fulfillment'] == \
+        tx_dict['inputs'][0]['fulfillment']
+    assert parsed.inputs_valid()
+
+    # the URI is forgotten when the fulfillment is replaced
+    parsed.inputs[0].fulfillment = tx.inputs[0].fulfillment
+    assert parsed.inputs[0]._fulfillment_uri is None
+
+
 @mark.skip(reason='None is tolerated because it is None before fulfilling.')
 def test_input_deserialization_with_invalid_input(user_pub):
     from bigchaindb.common.transaction import Input
@@ -341,6 +363,59 @@ def test_transaction_deserialization(tri_state_transaction):
     validate_transaction_model(tx)
 
 
+def test_transaction_view(monkeypatch, user_pub, user_priv):
+    from cryptoconditions import Fulfillment
+    from bigchaindb.common.transaction import Input, Output, Transaction
+
+    tx = Transaction.create([user_pub], [([user_pub], 1)],
+                            metadata={'msg': 'view'}).sign([user_priv])
+    tx_dict = tx.to_dict()
+
+    with monkeypatch.context() as m:
+        def fail(*args, **kwargs):
+            raise AssertionError('nothing should be parsed')
+
+        m.setattr(Input, 'from_dict', fail)
+        m.setattr(Output, 'from_dict', fail)
+        m.setattr(Fulfillment, 'from_uri', fail)
+        view = Transaction.view(tx_dict)
+        assert view.id == tx.id
+        assert view.metadata == {'msg': 'view'}
+        assert view.to_dict() == tx_dict
+        assert list(view.unspent_outputs) == list(tx.unspent_outputs)
+        assert list(view.spent_outputs) == list(tx.spent_outputs)
+
+    # the result does not share the inputs and outputs of the view
+    view_dict = view.to_dict()
+    assert view_dict['inputs'] is not tx_dict['inputs']
+    assert view_dict['inputs'][0] is not tx_dict['inputs'][0]
+    assert (view_dict['outputs'][0]['public_keys'] is not
+            tx_dict['outputs'][0]['public_keys'])
+
+    # the inputs and outputs are built when they are accessed
+    assert view.outputs == tx.outputs
+    assert view.to_dict() == tx_dict
+    assert view.inputs_valid()
+    assert view == tx
+
+    transfer = Transaction.transfer(tx.to_inputs(), [([user_pub], 1)],
+                                    tx.id).sign([user_priv])
+    view = Transaction.view(transfer.to_dict())
+    assert list(view.spent_outputs) == list(transfer.spent_outputs)
+    assert list(view.unspent_outputs) == list(transfer.unspent_outputs)
+
+
+def test_inputs_match(user_pub, user_priv, user2_pub):
+    from bigchaindb.common.transaction import Transaction
+
+    tx = Transaction.create([user_pub], [([user_pub], 1), ([user2_pub], 1)])\
+                    .sign([user_priv])
+    transfer = Transaction.transfer(tx.to_inputs([0]), [([user_pub], 1)], tx.id)
+    # the signatures are not verified
+    assert transfer.inputs_match(tx.outputs[:1])
+    assert not transfer.inputs_match(tx.outputs[1:])
+
+
 def test_invalid_input_initialization(user_input, user_pub):
     from bigchaindb.common.transaction import Input
 
@@ -649,7 +724,7 @@ def test_validate_inputs_of_transfer_tx_with_invalid_params(
     invalid_out = Output(Ed25519Sha256.from_uri(ffill_uri), ['invalid'])
     assert transfer_tx.inputs_valid([invalid_out]) is False
     invalid_out = utx.outputs[0]
-    invalid_out.public_key = 'invalid'
+    invalid_out.public_keys = ['invalid']
     assert transfer_tx.inputs_valid([invalid_out]) is True
 
     with raises(TypeError):
@@ -747,6 +822,46 @@ def test_validate_multiple_io_create_transaction(user_pub, user_priv,
     validate_transaction_model(tx)
 
 
+@mark.parametrize('processes', [1, 2])
+def test_prepare_transactions(processes, user_pub, user_priv, user2_pub,
+                              user2_priv):
+    from bigchaindb.common.transaction import (Transaction,
+                                               prepare_transactions)
+    from .utils import validate_transaction_model
+
+    specs = [{'tx_signers': [user_pub],
+              'recipients': [([user_pub, user2_pub], 1)],
+              'asset': {'data': {'index': index}}}
+             for index in range(10)]
+    expected = [Transaction.create(**spec).sign([user_priv]).to_dict()
+                for spec in specs]
+
+    transactions = prepare_transactions(specs, [user_priv, user2_priv],
+                                        processes=processes, chunksize=3)
+    assert list(transactions) == expected
+
+    create = Transaction.from_dict(expected[0])
+    specs = [{'operation': Transaction.TRANSFER,
+              'inputs': create.to_inputs(),
+              'recipients': [([user2_pub], 1)],
+              'asset_id': create.id}]
+    transfer, = prepare_transactions(specs, [user_priv, user2_priv],
+                                     processes=processes)
+    transfer = Transaction.from_dict(transfer)
+    assert transfer.inputs_valid(create.outputs) is True
+    validate_transaction_model(transfer)
+
+
+def test_prepare_transactions_with_invalid_params(user_pub, user_priv):
+    from bigchaindb.common.transaction import prepare_transactions
+
+    with raises(TypeError):
+        next(prepare_transactions([], user_priv, processes=1))
+    with raises(ValueError):
+        next(prepare_transactions([{'operation': 'MINT'}], [user_priv],
+                                  processes=1))
+
+
 def test_create_create_transaction_threshold(user_pub, user2_pub, user3_pub,
                                              user_user2_threshold_output,
                                              user_user2_threshold_input, data):
@@ -1004,6 +1119,30 @@ def test_transaction_hash(fulfilled_transaction):
     assert tx_obj.id == expected_hash_id
 
 
+def test_canonical_serializations(monkeypatch, user_pub, user_priv):
+    from bigchaindb.common import transaction
+    from bigchaindb.common.transaction import Transaction
+
+    tx = Transaction.create([user_pub], [([user_pub], 1)],
+                            metadata={'ä': ['☃', None]},
+                            asset={'data': {'z': 1, 'a': 'b'}}).sign([user_priv])
+    tx_dict = tx.to_dict()
+
+    expected_body = dict(tx_dict, id=None)
+    expected_message = dict(expected_body, inputs=[
+        dict(input_, fulfillment=None) for input_ in tx_dict['inputs']])
+    assert Transaction._canonical_serializations(tx_dict) == (
+        Transaction._to_str(expected_body), Transaction._to_str(expected_message))
+
+    def fail(*args, **kwargs):
+        raise AssertionError('the transaction should not be copied')
+
+    monkeypatch.setattr(transaction, 'deepcopy', fail)
+    tx = Transaction.from_dict(tx_dict, False)
+    assert tx._serializations == Transaction._canonical_serializations(tx_dict)
+    assert tx.inputs_valid()
+
+
 def test_output_from_dict_invalid_amount(user_output):
     from bigchaindb.common.transaction import Output
     from bigchaindb.common.exceptions import AmountError
@@ -1051,3 +1190,17 @@ def test_spent_outputs_property(signed_transfer_tx):
     assert spent_output['transaction_id'] == tx['inputs'][0]['fulfills']['transaction_id']
     assert spent_output['output_index'] == tx['inputs'][0]['fulfills']['output_index']
     # assert spent_output._asdict() == tx['inputs'][0]['fulfills']
+
+
+@mark.parametrize('cls_name,args', [
+    ('TransactionLink', ('a' * 64, 0)),
+    ('Output', (None, ['pubkey'], 1)),
+    ('Input', (None, ['pubkey'])),
+])
+def test_objects_have_no_dict(cls_name, args):
+    from bigchaindb.common import transaction
+
+    obj = getattr(transaction, cls_name)(*args)
+    assert not hasattr(obj, '__dict__')
+    with raises(AttributeError):
+        obj.undeclared = None
@@ -449,13 +449,9 @@ def test_get_outputs_filtered_only_unspent():
 
     go = 'bigchaindb.fastquery.FastQuery.get_outputs_by_public_key'
     with patch(go) as get_outputs:
-        get_outputs.return_value = [TransactionLink('a', 1),
-                                    TransactionLink('b', 2)]
-        fs = 'bigchaindb.fastquery.FastQuery.filter_spent_outputs'
-        with patch(fs) as filter_spent:
-            filter_spent.return_value = [TransactionLink('b', 2)]
-            out = BigchainDB().get_outputs_filtered('abc', spent=False)
-    get_outputs.assert_called_once_with('abc')
+        get_outputs.return_value = [TransactionLink('b', 2)]
+        out = BigchainDB().get_outputs_filtered('abc', spent=False)
+    get_outputs.assert_called_once_with('abc', False)
     assert out == [TransactionLink('b', 2)]
 
 
@@ -464,19 +460,13 @@ def test_get_outputs_filtered_only_spent():
     from bigchaindb.lib import BigchainDB
     go = 'bigchaindb.fastquery.FastQuery.get_outputs_by_public_key'
     with patch(go) as get_outputs:
-        get_outputs.return_value = [TransactionLink('a', 1),
-                                    TransactionLink('b', 2)]
-        fs = 'bigchaindb.fastquery.FastQuery.filter_unspent_outputs'
-        with patch(fs) as filter_spent:
-            filter_spent.return_value = [TransactionLink('b', 2)]
-            out = BigchainDB().get_outputs_filtered('abc', spent=True)
-    get_outputs.assert_called_once_with('abc')
+        get_outputs.return_value = [TransactionLink('b', 2)]
+        out = BigchainDB().get_outputs_filtered('abc', spent=True)
+    get_outputs.assert_called_once_with('abc', True)
     assert out == [TransactionLink('b', 2)]
 
 
-@patch('bigchaindb.fastquery.FastQuery.filter_unspent_outputs')
-@patch('bigchaindb.fastquery.FastQuery.filter_spent_outputs')
-def test_get_outputs_filtered(filter_spent, filter_unspent):
+def test_get_outputs_filtered():
     from bigchaindb.common.transaction import TransactionLink
     from bigchaindb.lib import BigchainDB
 
@@ -485,9 +475,7 @@ def test_get_outputs_filtered(filter_spent, filter_unspent):
         get_outputs.return_value = [TransactionLink('a', 1),
                                     TransactionLink('b', 2)]
         out = BigchainDB().get_outputs_filtered('abc')
-    get_outputs.assert_called_once_with('abc')
-    filter_spent.assert_not_called()
-    filter_unspent.assert_not_called()
+    get_outputs.assert_called_once_with('abc', None)
     assert out == get_outputs.return_value
 
 
@@ -242,6 +242,34 @@ def test_check_tx__unsigned_create_is_error(b):
     assert result.code == CodeTypeError
 
 
+def test_deliver_tx_skips_signatures_checked_in_check_tx(b, init_chain_request, monkeypatch):
+    from bigchaindb import App
+    from bigchaindb.models import Transaction
+
+    alice = generate_key_pair()
+    tx = Transaction.create([alice.public_key], [([alice.public_key], 1)])\
+                    .sign([alice.private_key])
+    raw_tx = encode_tx_to_bytes(tx)
+
+    app = App(b)
+    app.init_chain(init_chain_request)
+    assert app.check_tx(raw_tx).code == CodeTypeOk
+    assert app.validation_cache.is_verified(tx.id, raw_tx)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('the signatures should not be verified again')
+
+    monkeypatch.setattr(Transaction, 'inputs_valid', fail)
+    app.begin_block(RequestBeginBlock())
+    assert app.deliver_tx(raw_tx).code == CodeTypeOk
+    # the state dependent checks are still performed
+    assert app.deliver_tx(raw_tx).code == CodeTypeError
+    app.end_block(RequestEndBlock(height=99))
+    app.commit()
+
+    assert tx.id not in app.validation_cache
+
+
 def test_deliver_tx__valid_create_updates_db_and_emits_event(b, init_chain_request):
     import multiprocessing as mp
     from bigchaindb import App
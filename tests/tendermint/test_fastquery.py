@@ -22,57 +22,28 @@ def txns(b, user_pk, user_sk, user2_pk, user2_sk):
 
 
 def test_get_outputs_by_public_key(b, user_pk, user2_pk, txns):
-    assert b.fastquery.get_outputs_by_public_key(user_pk) == [
+    assert set(b.fastquery.get_outputs_by_public_key(user_pk)) == {
         TransactionLink(txns[1].id, 0),
         TransactionLink(txns[2].id, 0)
-    ]
-    assert b.fastquery.get_outputs_by_public_key(user2_pk) == [
+    }
+    assert set(b.fastquery.get_outputs_by_public_key(user2_pk)) == {
         TransactionLink(txns[0].id, 0),
         TransactionLink(txns[2].id, 1),
-    ]
-
-
-def test_filter_spent_outputs(b, user_pk, user_sk):
-    out = [([user_pk], 1)]
-    tx1 = Transaction.create([user_pk], out * 2)
-    tx1.sign([user_sk])
-
-    inputs = tx1.to_inputs()
-
-    tx2 = Transaction.transfer([inputs[0]], out, tx1.id)
-    tx2.sign([user_sk])
-
-    # tx2 produces a new unspent. inputs[1] remains unspent.
-    b.store_bulk_transactions([tx1, tx2])
-
-    outputs = b.fastquery.get_outputs_by_public_key(user_pk)
-    unspents = b.fastquery.filter_spent_outputs(outputs)
-
-    assert set(unsp for unsp in unspents) == {
-        inputs[1].fulfills,
-        tx2.to_inputs()[0].fulfills,
     }
 
 
-def test_filter_unspent_outputs(b, user_pk, user_sk):
-    out = [([user_pk], 1)]
-    tx1 = Transaction.create([user_pk], out * 2)
-    tx1.sign([user_sk])
-
-    inputs = tx1.to_inputs()
-
-    tx2 = Transaction.transfer([inputs[0]], out, tx1.id)
-    tx2.sign([user_sk])
-
-    # tx2 produces a new unspent. input[1] remains unspent.
+def test_get_outputs_by_public_key_and_spent(b, user_pk, user_sk, user2_pk):
+    tx1 = Transaction.create([user_pk], [([user_pk], 1)] * 2).sign([user_sk])
+    tx2 = Transaction.transfer(tx1.to_inputs()[:1], [([user2_pk], 1)],
+                               tx1.id).sign([user_sk])
     b.store_bulk_transactions([tx1, tx2])
 
-    outputs = b.fastquery.get_outputs_by_public_key(user_pk)
-    spents = b.fastquery.filter_unspent_outputs(outputs)
-
-    assert set(sp for sp in spents) == {
-        inputs[0].fulfills,
-    }
+    assert b.fastquery.get_outputs_by_public_key(user_pk, spent=True) == [
+        TransactionLink(tx1.id, 0)]
+    assert b.fastquery.get_outputs_by_public_key(user_pk, spent=False) == [
+        TransactionLink(tx1.id, 1)]
+    assert b.fastquery.get_outputs_by_public_key(user2_pk, spent=False) == [
+        TransactionLink(tx2.id, 0)]
 
 
 def test_outputs_query_key_order(b, user_pk, user_sk, user2_pk, user2_sk):
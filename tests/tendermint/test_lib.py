@@ -90,7 +90,7 @@ def test_validation_error(b):
     assert not b.validate_transaction(tx)
 
 
-@patch('requests.post')
+@patch('bigchaindb.tendermint_rpc.TendermintRPC.post')
 def test_write_and_post_transaction(mock_post, b):
     from bigchaindb.models import Transaction
     from bigchaindb.common.crypto import generate_key_pair
@@ -106,13 +106,13 @@ def test_write_and_post_transaction(mock_post, b):
     b.write_transaction(tx, 'broadcast_tx_async')
 
     assert mock_post.called
-    args, kwargs = mock_post.call_args
-    assert 'broadcast_tx_async' == kwargs['json']['method']
+    (payload,), kwargs = mock_post.call_args
+    assert 'broadcast_tx_async' == payload['method']
     encoded_tx = [encode_transaction(tx.to_dict())]
-    assert encoded_tx == kwargs['json']['params']
+    assert encoded_tx == payload['params']
 
 
-@patch('requests.post')
+@patch('bigchaindb.tendermint_rpc.TendermintRPC.post')
 @pytest.mark.parametrize('mode', [
     'broadcast_tx_async',
     'broadcast_tx_sync',
@@ -129,8 +129,8 @@ def test_post_transaction_valid_modes(mock_post, b, mode):
     tx = b.validate_transaction(tx)
     b.write_transaction(tx, mode)
 
-    args, kwargs = mock_post.call_args
-    assert mode == kwargs['json']['method']
+    (payload,), kwargs = mock_post.call_args
+    assert mode == payload['method']
 
 
 def test_post_transaction_invalid_mode(b):
@@ -343,7 +343,7 @@ def test_get_utxoset_merkle_root_when_no_utxo(b):
 @pytest.mark.usefixture('utxoset')
 def test_get_utxoset_merkle_root(b, utxoset):
     expected_merkle_root = (
-        '86d311c03115bf4d287f8449ca5828505432d69b82762d47077b1c00fe426eac')
+        'c6883dcaff5a1299bf5424c0dae6120ac4663223163ec0832439cd091b0887e0')
     merkle_root = b.get_utxoset_merkle_root()
     assert merkle_root == expected_merkle_root
 
@@ -483,3 +483,15 @@ def test_get_spent_key_order(b, user_pk, user_sk, user2_pk, user2_sk):
 
     with pytest.raises(DoubleSpend):
         tx3.validate(b)
+
+
+@pytest.mark.bdb
+def test_get_transactions_by_ids(b, signed_create_tx, signed_transfer_tx):
+    b.store_bulk_transactions([signed_create_tx, signed_transfer_tx])
+
+    transactions = b.get_transactions_by_ids(
+        [signed_transfer_tx.id, signed_create_tx.id, signed_create_tx.id, 'unknown'])
+
+    assert sorted(tx.to_dict()['id'] for tx in transactions) == sorted(
+        [signed_create_tx.id, signed_transfer_tx.id])
+    assert list(b.get_transactions_by_ids([])) == []
@@ -0,0 +1,156 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from unittest.mock import Mock
+
+import pytest
+
+
+class JSONRPCHandler(BaseHTTPRequestHandler):
+    """Answer every JSON-RPC call with its params, and remember the client
+    port of every request.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    accept_batch = True
+
+    def do_POST(self):
+        self.server.ports.append(self.client_address[1])
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if isinstance(request, list):
+            if self.accept_batch:
+                # the responses of a batch may come in any order
+                body = [self.respond(item) for item in reversed(request)]
+            else:
+                body = {'jsonrpc': '2.0', 'id': '',
+                        'error': {'code': -32700, 'message': 'Parse error'}}
+        else:
+            body = self.respond(request)
+
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def respond(self, request):
+        return {'jsonrpc': '2.0', 'id': request['id'],
+                'result': {'params': request['params']}}
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture(params=[True, False], ids=['batch', 'no batch'])
+def rpc_server(request):
+    handler = type('Handler', (JSONRPCHandler,), {'accept_batch': request.param})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.ports = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def rpc(rpc_server):
+    from bigchaindb.tendermint_rpc import TendermintRPC
+    rpc = TendermintRPC('http://127.0.0.1:{}/'.format(rpc_server.server_port),
+                        pool_size=1)
+    yield rpc
+    rpc.session.close()
+
+
+def test_call_reuses_the_connection(rpc, rpc_server):
+    for index in range(3):
+        assert rpc.call('broadcast_tx_async', index)['result'] == {'params': [index]}
+
+    assert len(rpc_server.ports) == 3
+    assert len(set(rpc_server.ports)) == 1
+
+
+def test_call_batch(rpc, rpc_server, monkeypatch):
+    monkeypatch.setattr('bigchaindb.tendermint_rpc.BATCH_SIZE', 4)
+    calls = [('broadcast_tx_async', [index]) for index in range(10)]
+
+    responses = rpc.call_batch(calls)
+
+    assert [response['result'] for response in responses] == [
+        {'params': [index]} for index in range(10)]
+    assert rpc.supports_batch is rpc_server.RequestHandlerClass.accept_batch
+    if rpc.supports_batch:
+        assert len(rpc_server.ports) == 3
+    else:
+        # one rejected batch, then one request per call
+        assert len(rpc_server.ports) == 11
+
+
+def test_call_batch_remembers_the_batch_support(rpc, rpc_server):
+    from bigchaindb.tendermint_rpc import TendermintRPC
+    calls = [('broadcast_tx_async', [index]) for index in range(2)]
+    rpc.call_batch(calls)
+    ports = len(rpc_server.ports)
+
+    other = TendermintRPC(rpc.endpoint, pool_size=1)
+    assert other.supports_batch is rpc_server.RequestHandlerClass.accept_batch
+    responses = other.call_batch(calls)
+    other.session.close()
+
+    assert [response['result'] for response in responses] == [
+        {'params': [index]} for index in range(2)]
+    # no batch is sent again to a node which rejected one
+    assert len(rpc_server.ports) - ports == (1 if other.supports_batch else 2)
+
+
+def test_unreachable_tendermint():
+    from bigchaindb.tendermint_rpc import RPCError, TendermintRPC
+
+    with HTTPServer(('127.0.0.1', 0), JSONRPCHandler) as server:
+        port = server.server_port
+    rpc = TendermintRPC('http://127.0.0.1:{}/'.format(port), retries=1,
+                        backoff_factor=0)
+
+    with pytest.raises(RPCError):
+        rpc.call('broadcast_tx_async', 'tx')
+
+
+def test_write_transaction_without_tendermint(b, signed_create_tx, monkeypatch):
+    from bigchaindb.tendermint_rpc import RPCError
+
+    monkeypatch.setattr('bigchaindb.tendermint_rpc.TendermintRPC.post',
+                        Mock(side_effect=RPCError('unreachable')))
+
+    assert b.write_transaction(signed_create_tx, 'broadcast_tx_sync') == (
+        503, 'Tendermint is unavailable')
+    assert b.write_transactions([signed_create_tx] * 2, 'broadcast_tx_sync') == [
+        (503, 'Tendermint is unavailable')] * 2
+
+
+def test_write_transactions(b, signed_create_tx, monkeypatch):
+    from bigchaindb.tendermint_utils import encode_transaction
+
+    responses = [{'result': {'code': 0}}, {'result': {'code': 1}},
+                 {'error': {'message': 'Internal error',
+                            'data': 'Tx already exists in cache'}}]
+    call_batch = Mock(return_value=responses)
+    monkeypatch.setattr('bigchaindb.tendermint_rpc.TendermintRPC.call_batch',
+                        call_batch)
+
+    assert b.write_transactions([signed_create_tx] * 3, 'broadcast_tx_sync') == [
+        (202, ''),
+        (500, 'Transaction validation failed'),
+        (400, 'Internal error - Tx already exists in cache'),
+    ]
+    encoded_tx = encode_transaction(signed_create_tx.to_dict())
+    call_batch.assert_called_once_with([('broadcast_tx_sync', [encoded_tx])] * 3)
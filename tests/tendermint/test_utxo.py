@@ -0,0 +1,224 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import pytest
+
+try:
+    from hashlib import sha3_256
+except ImportError:
+    from sha3 import sha3_256
+
+from bigchaindb.models import Transaction
+
+
+@pytest.fixture
+def txns(user_pk, user_sk):
+    out = [([user_pk], 1)]
+    tx1 = Transaction.create([user_pk], out * 2).sign([user_sk])
+    tx2 = Transaction.transfer([tx1.to_inputs()[0]], out, tx1.id)\
+                     .sign([user_sk])
+    tx3 = Transaction.transfer(tx2.to_inputs(), out, tx1.id)\
+                     .sign([user_sk])
+    return tx1, tx2, tx3
+
+
+def _keys(utxo_collection):
+    return {(utxo['transaction_id'], utxo['output_index'])
+            for utxo in utxo_collection.find()}
+
+
+@pytest.mark.bdb
+def test_update_and_flush(b, txns, utxo_collection):
+    from bigchaindb.utxo import UTXOSet
+    tx1, tx2, tx3 = txns
+
+    utxoset = UTXOSet(b.connection)
+    utxoset.update([tx1, tx2])
+
+    assert set(utxoset) == {(tx1.id, 1), (tx2.id, 0)}
+    assert utxo_collection.count_documents({}) == 0
+
+    utxoset.flush()
+    assert _keys(utxo_collection) == {(tx1.id, 1), (tx2.id, 0)}
+
+    # outputs created and spent before a flush are never written
+    utxoset.update([tx3])
+    assert utxoset._to_delete == {(tx2.id, 0)}
+    utxoset.flush()
+    assert _keys(utxo_collection) == {(tx1.id, 1), (tx3.id, 0)}
+
+    assert utxoset.is_unspent(tx3.id, 0)
+    assert not utxoset.is_unspent(tx2.id, 0)
+
+
+@pytest.mark.bdb
+def test_load_rebuilds_from_transactions(b, txns, utxo_collection):
+    from bigchaindb.utxo import UTXOSet
+    tx1, tx2, _ = txns
+    b.store_bulk_transactions([tx1, tx2])
+
+    utxoset = UTXOSet(b.connection)
+    assert set(utxoset) == {(tx1.id, 1), (tx2.id, 0)}
+    assert _keys(utxo_collection) == {(tx1.id, 1), (tx2.id, 0)}
+
+    utxo = utxo_collection.find_one({'transaction_id': tx2.id})
+    assert utxo['asset_id'] == tx1.id
+    assert utxo['amount'] == 1
+
+
+@pytest.mark.bdb
+def test_load_rebuilds_once(b, txns, utxo_collection, monkeypatch):
+    from bigchaindb.backend import query
+    from bigchaindb.utxo import UTXOSet
+    tx1, tx2, _ = txns
+    b.store_bulk_transactions([tx1, tx2])
+    # an interrupted rebuild, with an incomplete and a spent output
+    query.store_unspent_outputs(b.connection,
+                                {'transaction_id': tx1.id, 'output_index': 1},
+                                {'transaction_id': tx1.id, 'output_index': 0})
+
+    assert set(UTXOSet(b.connection)) == {(tx1.id, 1), (tx2.id, 0)}
+    assert _keys(utxo_collection) == {(tx1.id, 1), (tx2.id, 0)}
+    assert utxo_collection.find_one({'transaction_id': tx1.id})['amount'] == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError('the transactions should not be read')
+
+    monkeypatch.setattr('bigchaindb.backend.query.get_utxo_transactions', fail)
+    utxo_collection.delete_many({})
+    assert set(UTXOSet(b.connection)) == set()
+
+
+@pytest.mark.bdb
+def test_rollback(b, txns, utxo_collection):
+    from bigchaindb.utxo import UTXOSet
+    tx1, tx2, tx3 = txns
+    b.store_bulk_transactions([tx1])
+
+    utxoset = UTXOSet(b.connection)
+    utxoset.load()
+
+    b.store_bulk_transactions([tx2, tx3])
+    utxoset.update([tx2, tx3])
+    utxoset.flush()
+    assert set(utxoset) == {(tx1.id, 1), (tx3.id, 0)}
+
+    utxoset.rollback([tx2.id, tx3.id])
+    assert set(utxoset) == {(tx1.id, 0), (tx1.id, 1)}
+    assert _keys(utxo_collection) == {(tx1.id, 0), (tx1.id, 1)}
+
+
+@pytest.mark.bdb
+def test_commit_block_failure_reloads_utxoset(b, txns, monkeypatch):
+    from bigchaindb.backend.exceptions import OperationError
+    from bigchaindb.utxo import UTXOSet
+    tx1, tx2, _ = txns
+    b.store_bulk_transactions([tx1])
+    b.utxoset = UTXOSet(b.connection)
+    assert set(b.utxoset) == {(tx1.id, 0), (tx1.id, 1)}
+
+    def fail(*args, **kwargs):
+        raise OperationError('write failed')
+
+    monkeypatch.setattr('bigchaindb.backend.query.commit_block', fail)
+    block = {'app_hash': 'a', 'height': 1, 'transactions': [tx2.id]}
+    with pytest.raises(OperationError):
+        b.commit_block(block, [tx2])
+
+    # the changes of the block are not kept in memory
+    assert set(b.utxoset) == {(tx1.id, 0), (tx1.id, 1)}
+    assert b.utxoset.pop_changes() == ([], [])
+
+
+@pytest.mark.bdb
+def test_get_spent_uses_utxoset(b, txns, monkeypatch):
+    from bigchaindb.utxo import UTXOSet
+    tx1, tx2, _ = txns
+    b.store_bulk_transactions([tx1])
+    b.utxoset = UTXOSet(b.connection)
+    b.utxoset.load()
+
+    def fail(*args, **kwargs):
+        raise AssertionError('the database should not be queried')
+
+    monkeypatch.setattr('bigchaindb.backend.query.get_spent', fail)
+    assert b.get_spent(tx1.id, 0) is None
+    assert b.get_spent(tx1.id, 0, [tx2]) == tx2
+
+
+def test_merkle_tree_root():
+    from bigchaindb.tendermint_utils import merkleroot
+    from bigchaindb.utxo import MerkleTree, leaf_hash
+
+    assert MerkleTree().root == sha3_256(b'').hexdigest()
+
+    leaves = [leaf_hash('a', 0), leaf_hash('a', 1)]
+    assert MerkleTree(leaves[:1]).root == leaves[0].hex()
+    assert MerkleTree(leaves).root == merkleroot(sorted(leaves))
+
+
+def test_merkle_tree_incremental_update():
+    from bigchaindb.utxo import MerkleTree, leaf_hash
+
+    leaves = [leaf_hash('tx{}'.format(i), i % 3) for i in range(500)]
+    tree = MerkleTree(leaves)
+    assert len(tree) == 500
+    # the root does not depend on the order of the insertions
+    assert tree.root == MerkleTree(reversed(leaves)).root
+
+    for leaf in leaves[:200]:
+        tree.remove(leaf)
+    tree.remove(leaf_hash('unknown', 0))
+    tree.add(leaves[-1])
+    assert len(tree) == 300
+    assert tree.root == MerkleTree(leaves[200:]).root
+
+    for leaf in leaves[:50]:
+        tree.add(leaf)
+    assert tree.root == MerkleTree(leaves[:50] + leaves[200:]).root
+
+    for leaf in leaves[200:499]:
+        tree.remove(leaf)
+    assert tree.root == MerkleTree(leaves[:50] + leaves[499:]).root
+
+
+def test_merkle_tree_update_only_rehashes_its_path():
+    from bigchaindb.utxo import MerkleTree, _Node, leaf_hash
+
+    def stale(node):
+        if not isinstance(node, _Node):
+            return 0
+        return (node.digest is None) + stale(node.left) + stale(node.right)
+
+    tree = MerkleTree(leaf_hash('tx{}'.format(i), 0) for i in range(4096))
+    tree.root
+    assert stale(tree._root) == 0
+
+    tree.add(leaf_hash('new', 0))
+    # the depth of the tree is about log2(4096) = 12
+    assert 0 < stale(tree._root) <= 40
+    tree.root
+    tree.remove(leaf_hash('tx0', 0))
+    assert 0 < stale(tree._root) <= 40
+
+
+@pytest.mark.bdb
+def test_utxoset_merkle_root(b, txns):
+    from bigchaindb.utxo import UTXOSet
+    tx1, tx2, tx3 = txns
+
+    b.utxoset = UTXOSet(b.connection)
+    assert b.get_utxoset_merkle_root() == sha3_256(b'').hexdigest()
+
+    b.store_bulk_transactions([tx1, tx2])
+    b.utxoset.update([tx1, tx2])
+    b.utxoset.flush()
+    root = b.get_utxoset_merkle_root()
+
+    b.store_bulk_transactions([tx3])
+    b.utxoset.update([tx3])
+    assert b.get_utxoset_merkle_root() != root
+
+    b.utxoset.rollback([tx3.id])
+    assert b.get_utxoset_merkle_root() == root
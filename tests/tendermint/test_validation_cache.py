@@ -0,0 +1,38 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+
+def test_validation_cache_matches_raw_transaction():
+    from bigchaindb.validation_cache import ValidationCache
+
+    cache = ValidationCache()
+    cache.add('a', b'{"id": "a"}')
+
+    assert 'a' in cache
+    assert cache.is_verified('a', b'{"id": "a"}')
+    # same id, different signatures
+    assert not cache.is_verified('a', b'{"id": "a", "inputs": []}')
+    assert not cache.is_verified('b', b'{"id": "a"}')
+
+    cache.discard('a')
+    assert not cache.is_verified('a', b'{"id": "a"}')
+
+
+def test_validation_cache_eviction():
+    from bigchaindb.validation_cache import ValidationCache
+
+    cache = ValidationCache(max_age=2, max_size=3)
+    for height, txid in enumerate('abcd'):
+        cache.set_height(height)
+        cache.add(txid, txid.encode())
+
+    # the oldest entry is evicted when the cache is full
+    assert len(cache) == 3
+    assert 'a' not in cache
+
+    cache.set_height(4)
+    assert len(cache) == 2
+    assert 'b' not in cache
+    assert cache.is_verified('c', b'c')
+    assert cache.is_verified('d', b'd')
@@ -207,6 +207,7 @@ def test_autoconfigure_read_both_from_file_and_env(monkeypatch, request):
             'bind': SERVER_BIND,
             'loglevel': 'info',
             'workers': None,
+            'batch_processes': None,
         },
         'wsserver': {
             'scheme': WSSERVER_SCHEME,
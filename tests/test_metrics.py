@@ -0,0 +1,99 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+
+def test_histogram():
+    from bigchaindb.metrics import Histogram, BUCKETS
+
+    histogram = Histogram()
+    assert histogram.quantile(0.5) == 0.0
+
+    for _ in range(98):
+        histogram.observe(0.00001)
+    histogram.observe(0.001)
+    histogram.observe(1000)
+
+    assert histogram.count == 100
+    assert histogram.max == 1000
+    assert histogram.counts[0] == 98
+    assert histogram.counts[-1] == 1
+    assert histogram.quantile(0.5) == BUCKETS[0]
+    assert BUCKETS[6] < 0.001 <= histogram.quantile(0.99) == BUCKETS[7]
+    assert histogram.quantile(1) == 1000
+
+
+def test_metrics_block_counters_and_snapshot(caplog):
+    import logging
+    from bigchaindb.metrics import Metrics, SharedSnapshot
+
+    metrics = Metrics()
+    metrics.shared_snapshot = SharedSnapshot(size=2 ** 16)
+    assert metrics.shared_snapshot.read() is None
+
+    with metrics.timer('abci.commit'):
+        pass
+    metrics.count_transaction(100)
+    metrics.count_transaction(50)
+    metrics.count_rejected()
+    metrics.end_block(1)
+    metrics.count_transaction(10)
+
+    metrics.log_interval = 0
+    with caplog.at_level(logging.INFO, logger='bigchaindb.metrics'):
+        metrics.end_block(2)
+
+    snapshot = metrics.shared_snapshot.read()
+    assert snapshot == metrics.snapshot()
+    assert snapshot['last_block'] == {'height': 2, 'blocks': 1,
+                                      'transactions': 1, 'rejected': 0,
+                                      'bytes': 10}
+    assert snapshot['totals'] == {'blocks': 2, 'transactions': 3,
+                                  'rejected': 1, 'bytes': 160}
+    assert snapshot['histograms']['abci.commit']['count'] == 1
+    assert 'Metrics: 2 blocks, 3 txs (1 rejected, 160 bytes); abci.commit n=1' \
+        in caplog.records[-1].getMessage()
+
+
+def test_timed_records_calls_in_registry():
+    from bigchaindb.metrics import registry, timed
+
+    @timed('test.function')
+    def function(value):
+        if value is None:
+            raise ValueError
+        return value
+
+    assert function(1) == 1
+    try:
+        function(None)
+    except ValueError:
+        pass
+
+    assert registry.histograms['test.function'].count == 2
+
+
+def test_timed_includes_the_iteration_of_iterators():
+    import time
+    from bigchaindb.metrics import registry, timed
+
+    @timed('test.cursor')
+    def cursor():
+        time.sleep(0.01)
+        yield 1
+        time.sleep(0.01)
+        yield 2
+
+    iterator = cursor()
+    # nothing is observed before the iteration is over
+    assert 'test.cursor' not in registry.histograms
+    assert list(iterator) == [1, 2]
+    histogram = registry.histograms['test.cursor']
+    assert histogram.count == 1
+    assert histogram.sum >= 0.02
+
+    # an iterator that is not exhausted is observed when closed
+    iterator = cursor()
+    assert next(iterator) == 1
+    iterator.close()
+    assert histogram.count == 2
@@ -25,7 +25,9 @@ def generate_create_and_transfer(keypair=None):
 
 def test_validation_worker_process_multiple_transactions(b):
     import multiprocessing as mp
-    from bigchaindb.parallel_validation import ValidationWorker, RESET, EXIT
+    from bigchaindb.common.exceptions import DoubleSpend
+    from bigchaindb.parallel_validation import (ValidationWorker, RESET, EXIT,
+                                                RESULT_VALID, result_code)
 
     keypair = generate_key_pair()
     create_tx, transfer_tx = generate_create_and_transfer(keypair)
@@ -35,38 +37,72 @@ def test_validation_worker_process_multiple_transactions(b):
             asset_id=create_tx.id).sign([keypair.private_key])
 
     in_queue, results_queue = mp.Queue(), mp.Queue()
-    vw = ValidationWorker(in_queue, results_queue)
+    results = mp.RawArray('b', 32)
+    vw = ValidationWorker(in_queue, results_queue, results)
+
+    def run(*messages):
+        for message in messages:
+            in_queue.put(message)
+        in_queue.put(EXIT)
+        vw.run()
+        processed = 0
+        while not results_queue.empty():
+            count, overflow = results_queue.get()
+            assert overflow == []
+            processed += count
+        return processed
 
     # Note: in the following instructions, the worker will encounter two
-    # `RESET` messages, and an `EXIT` message. When a worker processes a
-    # `RESET` message, it forgets all transactions it has validated. This allow
-    # us to re-validate the same transactions. This won't happen in real life,
-    # but it's quite handy to check if the worker actually forgot about the
-    # past transactions (if not, it will return `False` because the
-    # transactions look like a double spend).
+    # `RESET` messages. When a worker processes a `RESET` message, it forgets
+    # all transactions it has validated. This allow us to re-validate the
+    # same transactions. This won't happen in real life, but it's quite handy
+    # to check if the worker actually forgot about the past transactions (if
+    # not, they would look like a double spend).
     # `EXIT` makes the worker to stop the infinite loop.
-    in_queue.put((0, create_tx.to_dict()))
-    in_queue.put((10, transfer_tx.to_dict()))
-    in_queue.put((20, double_spend.to_dict()))
-    in_queue.put(RESET)
-    in_queue.put((0, create_tx.to_dict()))
-    in_queue.put((5, transfer_tx.to_dict()))
-    in_queue.put(RESET)
-    in_queue.put((20, create_tx.to_dict()))
-    in_queue.put((25, double_spend.to_dict()))
-    in_queue.put((30, transfer_tx.to_dict()))
-    in_queue.put(EXIT)
+    assert run((0, create_tx.to_dict(), False, False),
+               (10, transfer_tx.to_dict(), False, False),
+               (20, double_spend.to_dict(), False, False)) == 3
+    assert results[0] == RESULT_VALID
+    assert results[10] == RESULT_VALID
+    assert results[20] == result_code(DoubleSpend())
 
-    vw.run()
+    assert run(RESET,
+               (0, create_tx.to_dict(), False, False),
+               (5, transfer_tx.to_dict(), False, False)) == 2
+    assert results[0] == RESULT_VALID
+    assert results[5] == RESULT_VALID
+
+    assert run(RESET,
+               (20, create_tx.to_dict(), False, False),
+               (25, double_spend.to_dict(), False, False),
+               (30, transfer_tx.to_dict(), False, False)) == 3
+    assert results[20] == RESULT_VALID
+    assert results[25] == RESULT_VALID
+    assert results[30] == result_code(DoubleSpend())
+
+
+def test_parallel_validator_reports_results_beyond_capacity(b, monkeypatch):
+    from json import dumps
+    from bigchaindb.parallel_validation import ParallelValidator
 
-    assert results_queue.get() == (0, create_tx)
-    assert results_queue.get() == (10, transfer_tx)
-    assert results_queue.get() == (20, False)
-    assert results_queue.get() == (0, create_tx)
-    assert results_queue.get() == (5, transfer_tx)
-    assert results_queue.get() == (20, create_tx)
-    assert results_queue.get() == (25, double_spend)
-    assert results_queue.get() == (30, False)
+    def validate(self, dict_transaction, verified=False, pooled=False):
+        return int(dict_transaction['id']) % 3 != 0
+
+    monkeypatch.setattr(
+        'bigchaindb.parallel_validation.ValidationWorker.validate',
+        validate)
+    monkeypatch.setattr('bigchaindb.parallel_validation.RESULTS_CAPACITY', 4)
+
+    transactions = [{'id': str(i)} for i in range(10)]
+
+    pv = ParallelValidator(number_of_workers=2)
+    pv.start()
+    for transaction in transactions:
+        pv.validate(dumps(transaction).encode('utf8'))
+
+    assert pv.result(timeout=1) == [
+        False if int(tx['id']) % 3 == 0 else tx for tx in transactions]
+    pv.stop()
 
 
 def test_parallel_validator_routes_transactions_correctly(b, monkeypatch):
@@ -84,7 +120,7 @@ def test_parallel_validator_routes_transactions_correctly(b, monkeypatch):
 
     # Validate is now a passthrough, and every time it is called it will emit
     # the PID of its worker to the designated queue.
-    def validate(self, dict_transaction):
+    def validate(self, dict_transaction, verified=False, pooled=False):
         validation_called_by.put((os.getpid(), dict_transaction['id']))
         return dict_transaction
 
@@ -92,9 +128,10 @@ def test_parallel_validator_routes_transactions_correctly(b, monkeypatch):
         'bigchaindb.parallel_validation.ValidationWorker.validate',
         validate)
 
-    # Transaction routing uses the `id` of the transaction. This test strips
-    # down a transaction to just its `id`. We have two workers, so even ids
-    # will be processed by one worker, odd ids by the other.
+    # Transaction routing uses the asset id of the transaction, that is the
+    # `id` of the transaction for a CREATE. This test strips down a
+    # transaction to just its `id`. We have two workers, so even ids will be
+    # processed by one worker, odd ids by the other.
     transactions = [{'id': '0'}, {'id': '1'}, {'id': '2'}, {'id': '3'}]
 
     pv = ParallelValidator(number_of_workers=2)
@@ -131,3 +168,127 @@ def test_parallel_validator_routes_transactions_correctly(b, monkeypatch):
                     all(filter(lambda x: int(x) % 2 == 1, transaction_ids)))
 
     pv.stop()
+
+
+def test_parallel_validator_routes_by_asset_id():
+    from bigchaindb.parallel_validation import ParallelValidator
+
+    pv = ParallelValidator(number_of_workers=4)
+
+    for _ in range(8):
+        create_tx, transfer_tx = generate_create_and_transfer()
+        # a transfer is validated by the worker that validates its create
+        assert pv.route(create_tx.to_dict()) == int(create_tx.id, 16) % 4
+        assert pv.route(transfer_tx.to_dict()) == pv.route(create_tx.to_dict())
+
+    assert pv.route({'id': 'not hex'}) == 0
+    assert pv.route({}) == 0
+
+
+def test_validation_worker_batches_queued_transactions():
+    import queue
+    from bigchaindb.parallel_validation import ValidationWorker, RESET, EXIT
+
+    in_queue, results_queue = queue.Queue(), queue.Queue()
+    vw = ValidationWorker(in_queue, results_queue, lookahead=2)
+
+    for message in [(0, {'id': 'a'}), (1, {'id': 'b'}), (2, {'id': 'c'}),
+                    RESET, EXIT]:
+        in_queue.put(message)
+
+    assert vw.get_batch() == ([(0, {'id': 'a'}), (1, {'id': 'b'})], None)
+    assert vw.get_batch() == ([(2, {'id': 'c'})], RESET)
+    assert vw.get_batch() == ([], EXIT)
+
+    in_queue.put((3, {'id': 'd'}))
+    assert vw.get_batch() == ([(3, {'id': 'd'})], None)
+
+
+@pytest.mark.bdb
+def test_validation_worker_prefetches_inputs(b, monkeypatch):
+    import multiprocessing as mp
+    from bigchaindb import backend
+    from bigchaindb.parallel_validation import (ValidationWorker, EXIT,
+                                                RESULT_VALID)
+
+    create_tx, transfer_tx = generate_create_and_transfer()
+    b.store_bulk_transactions([create_tx])
+
+    in_queue, results_queue = mp.Queue(), mp.Queue()
+    vw = ValidationWorker(in_queue, results_queue)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('the input should have been prefetched')
+
+    monkeypatch.setattr(backend.query, 'get_transaction', fail)
+    monkeypatch.setattr(backend.query, 'get_spent', fail)
+
+    in_queue.put((0, transfer_tx.to_dict(), False, False))
+    in_queue.put(EXIT)
+    vw.run()
+
+    assert results_queue.get() == (1, [])
+    assert vw.results[0] == RESULT_VALID
+
+
+@pytest.mark.bdb
+def test_validation_worker_skips_signatures_of_verified_transactions(b):
+    import multiprocessing as mp
+    from cryptoconditions import Fulfillment
+    from bigchaindb.common.exceptions import InvalidSignature
+    from bigchaindb.common.transaction import Transaction
+    from bigchaindb.parallel_validation import (ValidationWorker,
+                                                RESULT_VALID, result_code)
+
+    create_tx, _ = generate_create_and_transfer()
+    tampered = create_tx.to_dict()
+    fulfillment = Fulfillment.from_uri(tampered['inputs'][0]['fulfillment'])
+    fulfillment.signature = bytes(64)
+    tampered['inputs'][0]['fulfillment'] = fulfillment.serialize_uri()
+    # the id covers the fulfillments
+    tampered['id'] = None
+    tampered['id'] = Transaction._to_hash(Transaction._to_str(tampered))
+
+    vw = ValidationWorker(mp.Queue(), mp.Queue())
+    assert vw.check(tampered) == result_code(InvalidSignature())
+    # only the state is checked for the transactions verified in `check_tx`
+    assert vw.check(tampered, True) == RESULT_VALID
+    # or for the ones whose signatures are verified on the pool
+    vw.reset()
+    assert vw.check(tampered, False, True) == RESULT_VALID
+
+
+@pytest.mark.bdb
+def test_parallel_validator_rejects_invalid_signatures(b):
+    from cryptoconditions import Fulfillment
+    from json import dumps
+    from bigchaindb.common.transaction import Transaction
+    from bigchaindb.parallel_validation import ParallelValidator
+
+    keypair = generate_key_pair()
+    valid, _ = generate_create_and_transfer(keypair)
+    create_tx, _ = generate_create_and_transfer(keypair)
+    tampered = create_tx.to_dict()
+    fulfillment = Fulfillment.from_uri(tampered['inputs'][0]['fulfillment'])
+    fulfillment.signature = bytes(64)
+    tampered['inputs'][0]['fulfillment'] = fulfillment.serialize_uri()
+    tampered['id'] = None
+    tampered['id'] = Transaction._to_hash(Transaction._to_str(tampered))
+    # a valid transfer of the output of the tampered transaction
+    spending = Transaction.transfer(
+        Transaction.from_dict(tampered).to_inputs(),
+        [([keypair.public_key], 10)],
+        asset_id=tampered['id']).sign([keypair.private_key])
+
+    pv = ParallelValidator(number_of_workers=2, bigchaindb=b)
+    pv.start()
+    try:
+        for transaction in (tampered, spending.to_dict(), valid.to_dict()):
+            pv.validate(dumps(transaction).encode('utf8'))
+        result = pv.result(timeout=10)
+    finally:
+        pv.stop()
+
+    # the workers accepted both transactions of the tampered asset, the
+    # transfer is rejected once its input is
+    assert result == [False, False, valid.to_dict()]
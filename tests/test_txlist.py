@@ -45,3 +45,12 @@ def test_get_txlist_by_asset(b, txlist):
 def test_get_txlist_by_operation(b, txlist):
     res = b.get_transactions_filtered(txlist.create1.id, operation='CREATE')
     assert set(tx.id for tx in res) == {txlist.create1.id}
+
+
+@pytest.mark.bdb
+def test_get_txlist_by_page(b, txlist):
+    res = b.get_transactions_filtered(txlist.create1.id, limit=1)
+    assert [tx.id for tx in res] == [txlist.create1.id]
+
+    res = b.get_transactions_filtered(txlist.create1.id, after=txlist.create1.id)
+    assert [tx.to_dict() for tx in res] == [txlist.transfer1.to_dict()]
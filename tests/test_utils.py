@@ -170,3 +170,23 @@ def test_process_set_title():
                       name=uuid)
     process.start()
     assert queue.get() == uuid
+
+
+def test_condition_details_owners():
+    from bigchaindb.utils import condition_details_owners
+
+    details = {
+        'type': 'threshold-sha-256',
+        'threshold': 1,
+        'subconditions': [
+            {'type': 'ed25519-sha-256', 'public_key': 'a'},
+            {'type': 'threshold-sha-256', 'threshold': 2, 'subconditions': [
+                {'type': 'ed25519-sha-256', 'public_key': 'b'},
+                {'type': 'ed25519-sha-256', 'public_key': 'a'},
+            ]},
+        ],
+    }
+
+    assert condition_details_owners(details) == {'a', 'b'}
+    assert condition_details_owners(details['subconditions'][0]) == {'a'}
+    assert condition_details_owners({'type': 'preimage-sha-256'}) == set()
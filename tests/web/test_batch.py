@@ -0,0 +1,178 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import json
+from io import BytesIO
+from unittest.mock import Mock
+
+import pytest
+
+BATCH_ENDPOINT = '/api/v1/transactions/batch'
+
+
+@pytest.fixture
+def batch(alice, bob):
+    """A CREATE, the TRANSFER spending it, a second TRANSFER spending it
+    too, and a tampered CREATE.
+    """
+    from bigchaindb.models import Transaction
+
+    create = Transaction.create([alice.public_key], [([alice.public_key], 1)],
+                                asset={'batch': 1}).sign([alice.private_key])
+    transfers = [
+        Transaction.transfer(create.to_inputs(), [([public_key], 1)],
+                             asset_id=create.id).sign([alice.private_key])
+        for public_key in (bob.public_key, alice.public_key)
+    ]
+    tampered = Transaction.create([bob.public_key], [([bob.public_key], 1)],
+                                  asset={'batch': 2}).sign([bob.private_key])
+    tampered = tampered.to_dict()
+    tampered['asset']['data']['batch'] = 3
+    return [tx.to_dict() for tx in [create] + transfers] + [tampered]
+
+
+def test_parse_batch():
+    from bigchaindb.web.batch import BatchError, parse_batch
+
+    assert parse_batch(BytesIO(b' [{"id": "a"},\n 1]')) == [
+        ({'id': 'a'}, None, None), (1, None, None)]
+
+    items = parse_batch(BytesIO(b'\n{"id": "a"}\r\n\n{"id": \nnull\n'))
+    assert items[0] == ({'id': 'a'}, b'{"id": "a"}', None)
+    assert items[1][:2] == (None, None)
+    assert items[1][2].startswith('Invalid JSON')
+    assert items[2] == (None, b'null', None)
+
+    assert parse_batch(BytesIO(b'')) == []
+
+    with pytest.raises(BatchError):
+        parse_batch(BytesIO(b'[{"id": "a"}'))
+
+
+class CountingStream(BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.lines = 0
+
+    def readline(self, size=-1):
+        self.lines += 1
+        return super().readline(size)
+
+
+@pytest.mark.parametrize('data,read', [
+    # NDJSON is refused at the first transaction above the limit
+    (b'{}\n' * 10, 3),
+    (b'[{}, {}, {}]', None),
+], ids=['ndjson', 'array'])
+def test_parse_batch_with_too_many_transactions(data, read):
+    from bigchaindb.web.batch import BatchTooLarge, parse_batch
+
+    stream = CountingStream(data)
+    with pytest.raises(BatchTooLarge, match='Too many transactions'):
+        parse_batch(stream, max_size=2)
+    if read:
+        assert stream.lines == read
+
+
+@pytest.mark.parametrize('data', [
+    b'{}\n' * 10,
+    b'[' + b' ' * 100 + b']',
+], ids=['ndjson', 'array'])
+def test_parse_batch_with_too_many_bytes(data):
+    from bigchaindb.web.batch import BatchTooLarge, parse_batch
+
+    stream = BytesIO(data)
+    with pytest.raises(BatchTooLarge, match='larger than 20 bytes'):
+        parse_batch(stream, max_bytes=20)
+    # the stream is not read further than the limit
+    assert stream.tell() <= 21
+
+
+def test_split_batch_keeps_the_transactions_of_an_asset_together(batch):
+    from bigchaindb.web.batch import split_batch
+
+    transactions = [(index, tx, None) for index, tx in enumerate(batch)]
+    transactions.append((4, {'malformed': True}, None))
+
+    chunks = split_batch(transactions, 4)
+
+    assert len(chunks) == 3
+    assert sorted(item for chunk in chunks for item in chunk) == transactions
+    assert [index for index, _, _ in chunks[0]] == [0, 1, 2]
+
+
+@pytest.mark.bdb
+@pytest.mark.parametrize('ndjson', [False, True])
+def test_post_batch(client, batch, monkeypatch, ndjson):
+    call_batch = Mock(return_value=[{'result': {'code': 0}},
+                                    {'result': {'code': 1}}])
+    monkeypatch.setattr('bigchaindb.tendermint_rpc.TendermintRPC.call_batch',
+                        call_batch)
+    if ndjson:
+        data = '\n'.join(json.dumps(tx) for tx in batch + ['invalid']) + '{'
+    else:
+        data = json.dumps(batch + ['invalid'])
+
+    res = client.post(BATCH_ENDPOINT + '?mode=sync', data=data)
+
+    assert res.status_code == 200
+    statuses = [(item['id'], item['status']) for item in res.json]
+    assert statuses == [(batch[0]['id'], 202), (batch[1]['id'], 500),
+                        (batch[2]['id'], 400), (batch[3]['id'], 400),
+                        (None, 400)]
+    assert 'DoubleSpend' in res.json[2]['message']
+    assert 'InvalidHash' in res.json[3]['message']
+
+    (calls,), _ = call_batch.call_args
+    assert [method for method, _ in calls] == ['broadcast_tx_sync'] * 2
+
+
+@pytest.mark.bdb
+def test_batch_validator_processes(b, batch):
+    from bigchaindb.web.batch import BatchValidator
+
+    items = [(tx, None, None) for tx in batch]
+    inline = BatchValidator(processes=2).validate(b, items)
+    pool = BatchValidator(processes=2, inline_size=0)
+
+    assert pool.validate(b, items) == inline
+    assert [status_code for status_code, _ in inline] == [202, 202, 400, 400]
+    # the pool is created once per process
+    assert pool.pool is pool.pool
+    pool.close()
+    assert pool._pool is None
+
+
+def test_post_batch_when_saturated(client, batch, monkeypatch):
+    monkeypatch.setattr('bigchaindb.web.batch.BatchValidator.validate',
+                        lambda self, bigchain, items: [(202, '')] * len(items))
+    client.application.config['broadcast_pipeline'].mempool_size = 10 ** 6
+
+    res = client.post(BATCH_ENDPOINT, data=json.dumps(batch[:2]))
+
+    assert [item['status'] for item in res.json] == [503, 503]
+    assert res.headers['Retry-After'] == '1'
+
+
+@pytest.mark.parametrize('data,status_code', [
+    ('[{}', 400),
+    ('{}\n' * 3, 413),
+    ('[{}, {}, {}]', 413),
+    ('[' + ' ' * 100 + ']', 413),
+])
+def test_post_invalid_batch(client, monkeypatch, data, status_code):
+    monkeypatch.setattr('bigchaindb.web.views.transactions.MAX_BATCH_SIZE', 2)
+    monkeypatch.setattr('bigchaindb.web.views.transactions.MAX_BATCH_BYTES', 50)
+
+    res = client.post(BATCH_ENDPOINT, data=data)
+
+    assert res.status_code == status_code
+
+
+def test_post_batch_in_commit_mode(client, batch):
+    res = client.post(BATCH_ENDPOINT + '?mode=commit', data=json.dumps(batch))
+
+    assert res.status_code == 400
+    assert res.json['message'] == ('The commit mode is not supported for '
+                                   'batches, use "async" or "sync"')
@@ -0,0 +1,169 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import json
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+TX_ENDPOINT = '/api/v1/transactions/'
+
+
+class FakeBigchainDB:
+    """Record the transactions written, a write of a single transaction
+    sets ``writing`` and blocks until ``release`` is set.
+    """
+
+    def __init__(self):
+        self.writes = []
+        self.writing = threading.Event()
+        self.release = threading.Event()
+        self.rpc = Mock(**{'call.return_value': {'result': {'n_txs': 0}}})
+
+    def write_transaction(self, transaction, mode):
+        self.writing.set()
+        self.release.wait()
+        self.writes.append((mode, [transaction]))
+        return (202, '')
+
+    def write_transactions(self, transactions, mode):
+        self.writes.append((mode, transactions))
+        return [(202, '')] * len(transactions)
+
+
+def test_pipeline_broadcasts_the_waiting_transactions_together():
+    from bigchaindb.web.broadcast import BroadcastPipeline
+
+    bigchain = FakeBigchainDB()
+    pipeline = BroadcastPipeline(lambda: bigchain, workers=1)
+
+    futures = [pipeline.submit('tx0', 'broadcast_tx_async')]
+    # wait for the worker to be blocked on the first transaction
+    assert bigchain.writing.wait(timeout=5)
+    futures += [pipeline.submit('tx{}'.format(index), mode)
+                for index, mode in enumerate(['broadcast_tx_sync',
+                                              'broadcast_tx_async',
+                                              'broadcast_tx_sync'], 1)]
+    bigchain.release.set()
+    pipeline.join()
+
+    assert [future.result(timeout=1) for future in futures] == [(202, '')] * 4
+    assert bigchain.writes == [
+        ('broadcast_tx_async', ['tx0']),
+        ('broadcast_tx_sync', ['tx1', 'tx3']),
+        ('broadcast_tx_async', ['tx2']),
+    ]
+
+
+def test_pipeline_refuses_transactions_when_saturated():
+    from bigchaindb.web.broadcast import BroadcastPipeline, Saturated
+
+    bigchain = FakeBigchainDB()
+    pipeline = BroadcastPipeline(lambda: bigchain, queue_size=1, workers=0,
+                                 mempool_limit=10)
+
+    pipeline.submit('tx0', 'broadcast_tx_async')
+    with pytest.raises(Saturated):
+        pipeline.submit('tx1', 'broadcast_tx_async')
+
+    pipeline.queue.get_nowait()
+    pipeline.mempool_size = 10
+    with pytest.raises(Saturated):
+        pipeline.submit('tx1', 'broadcast_tx_async')
+
+
+def test_pipeline_polls_the_mempool_only_while_it_is_not_empty(monkeypatch):
+    from bigchaindb.web.broadcast import BroadcastPipeline
+
+    monkeypatch.setattr('bigchaindb.web.broadcast.MEMPOOL_CHECK_INTERVAL', 0.01)
+    bigchain = FakeBigchainDB()
+    sizes = iter([2, 1, 0])
+    polled_empty = threading.Event()
+
+    def call(method):
+        try:
+            return {'result': {'n_txs': next(sizes)}}
+        except StopIteration:
+            polled_empty.set()
+            return {'result': {'n_txs': 0}}
+
+    bigchain.rpc.call.side_effect = call
+    pipeline = BroadcastPipeline(lambda: bigchain, workers=1)
+
+    # the worker starts idle, and does not poll
+    pipeline.admit()
+    assert not polled_empty.wait(timeout=0.1)
+    assert bigchain.rpc.call.call_count == 0
+
+    pipeline.submit('tx0', 'broadcast_tx_async')
+    bigchain.release.set()
+    pipeline.join()
+    # polled after the broadcast, then until the mempool is empty
+    assert not polled_empty.wait(timeout=0.2)
+    assert bigchain.rpc.call.call_count == 3
+    assert pipeline.mempool_size == 0
+
+
+@pytest.mark.parametrize('mode', ['', '?mode=sync'])
+def test_post_transaction_when_saturated(client, signed_create_tx, monkeypatch,
+                                         mode):
+    from bigchaindb.web.broadcast import BroadcastPipeline
+
+    monkeypatch.setattr('bigchaindb.lib.BigchainDB.validate_transaction',
+                        lambda self, transaction: transaction)
+    pipeline = BroadcastPipeline(FakeBigchainDB, workers=0, mempool_limit=10)
+    pipeline.mempool_size = 10
+    client.application.config['broadcast_pipeline'] = pipeline
+
+    res = client.post(TX_ENDPOINT + mode, data=json.dumps(signed_create_tx.to_dict()))
+
+    assert res.status_code == 503
+    assert res.headers['Retry-After'] == '1'
+    assert res.json['message'] == 'The mempool is full'
+
+
+def test_post_transaction_broadcast_timeout(client, signed_create_tx,
+                                            monkeypatch):
+    from bigchaindb.web.broadcast import BroadcastPipeline
+
+    monkeypatch.setattr('bigchaindb.lib.BigchainDB.validate_transaction',
+                        lambda self, transaction: transaction)
+    monkeypatch.setattr('bigchaindb.web.views.transactions.RESULT_TIMEOUT', 0.01)
+    bigchain = FakeBigchainDB()
+    pipeline = BroadcastPipeline(lambda: bigchain, workers=1)
+    client.application.config['broadcast_pipeline'] = pipeline
+
+    try:
+        res = client.post(TX_ENDPOINT + '?mode=commit',
+                          data=json.dumps(signed_create_tx.to_dict()))
+    finally:
+        bigchain.release.set()
+
+    assert res.status_code == 504
+    assert res.json['message'] == 'Timed out waiting for Tendermint'
+
+
+def test_post_transaction_broadcast_error(client, signed_create_tx,
+                                          monkeypatch):
+    from bigchaindb.tendermint_rpc import RPCError
+    from bigchaindb.web.broadcast import BroadcastPipeline
+
+    def write_transaction(transaction, mode):
+        raise RPCError('Cannot reach Tendermint')
+
+    monkeypatch.setattr('bigchaindb.lib.BigchainDB.validate_transaction',
+                        lambda self, transaction: transaction)
+    bigchain = FakeBigchainDB()
+    bigchain.write_transaction = write_transaction
+    pipeline = BroadcastPipeline(lambda: bigchain, workers=1)
+    client.application.config['broadcast_pipeline'] = pipeline
+
+    res = client.post(TX_ENDPOINT + '?mode=sync',
+                      data=json.dumps(signed_create_tx.to_dict()))
+
+    assert res.status_code == 503
+    assert res.headers['Retry-After'] == '1'
+    assert res.json['message'] == ('Cannot broadcast the transaction: '
+                                   'Cannot reach Tendermint')
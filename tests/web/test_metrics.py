@@ -0,0 +1,26 @@
+# Copyright BigchainDB GmbH and BigchainDB contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+METRICS_ENDPOINT = '/api/v1/metrics/'
+
+
+def test_get_metrics_endpoint(client):
+    from bigchaindb.metrics import registry
+
+    res = client.get(METRICS_ENDPOINT)
+    assert res.status_code == 200
+    assert res.json['totals'] == registry.totals.to_dict()
+
+
+def test_get_metrics_endpoint_returns_shared_snapshot(app, client):
+    from bigchaindb.metrics import SharedSnapshot
+
+    snapshot = {'histograms': {}, 'last_block': None,
+                'totals': {'blocks': 3}}
+    app.config['metrics_snapshot'] = SharedSnapshot(size=1024)
+    app.config['metrics_snapshot'].write(snapshot)
+
+    res = client.get(METRICS_ENDPOINT)
+    assert res.status_code == 200
+    assert res.json == snapshot
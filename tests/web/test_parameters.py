@@ -23,6 +23,16 @@ def test_valid_txid():
             valid_txid(h)
 
 
+def test_valid_txids():
+    from bigchaindb.web.views.parameters import valid_txids
+
+    assert valid_txids('a' * 64 + ',' + 'B' * 64) == ['a' * 64, 'b' * 64]
+
+    for txids in ['a' * 64 + ',', 'a' * 63, '']:
+        with pytest.raises(ValueError):
+            valid_txids(txids)
+
+
 def test_valid_bool():
     from bigchaindb.web.views.parameters import valid_bool
 
@@ -77,3 +87,13 @@ def test_valid_operation():
         valid_operation('blah')
     with pytest.raises(ValueError):
         valid_operation('')
+
+
+def test_valid_limit():
+    from bigchaindb.web.views.parameters import valid_limit
+
+    assert valid_limit('10') == 10
+
+    for limit in ['0', '-1', '1.5', 'ten', '']:
+        with pytest.raises(ValueError):
+            valid_limit(limit)
@@ -12,3 +12,20 @@ def test_settings():
     # for whatever reason the value is wrapped in a list
     # needs further investigation
     assert s.cfg.bind[0] == bigchaindb.config['server']['bind']
+
+
+def test_batch_processes(monkeypatch):
+    import bigchaindb
+    from bigchaindb.web import server
+
+    monkeypatch.setattr('multiprocessing.cpu_count', lambda: 8)
+    settings = dict(bigchaindb.config['server'], workers=3)
+
+    s = server.create_server(settings)
+    assert s.application.config['batch_validator'].processes == 2
+
+    s = server.create_server(dict(settings, workers=17))
+    assert s.application.config['batch_validator'].processes == 1
+
+    s = server.create_server(dict(settings, batch_processes='4'))
+    assert s.application.config['batch_validator'].processes == 4
@@ -376,14 +376,25 @@ def test_transactions_get_list_good(client):
     with patch('bigchaindb.BigchainDB.get_transactions_filtered', get_txs_patched):
         url = TX_ENDPOINT + '?asset_id=' + asset_id
         assert client.get(url).json == [
+            ['after', None],
             ['asset_id', asset_id],
+            ['limit', None],
             ['operation', None]
         ]
         url = TX_ENDPOINT + '?asset_id=' + asset_id + '&operation=CREATE'
         assert client.get(url).json == [
+            ['after', None],
             ['asset_id', asset_id],
+            ['limit', None],
             ['operation', 'CREATE']
         ]
+        url = TX_ENDPOINT + '?asset_id=' + asset_id + '&after=' + 'A' * 64 + '&limit=10'
+        assert client.get(url).json == [
+            ['after', 'a' * 64],
+            ['asset_id', asset_id],
+            ['limit', 10],
+            ['operation', None]
+        ]
 
 
 def test_transactions_get_list_bad(client):
@@ -400,9 +411,51 @@ def test_transactions_get_list_bad(client):
         # Test asset ID required
         url = TX_ENDPOINT + '?operation=CREATE'
         assert client.get(url).status_code == 400
+        # Test pagination validated
+        url = TX_ENDPOINT + '?asset_id=' + '1' * 64 + '&after=' + '1' * 63
+        assert client.get(url).status_code == 400
+        url = TX_ENDPOINT + '?asset_id=' + '1' * 64 + '&limit=0'
+        assert client.get(url).status_code == 400
+
+
+def test_transactions_get_by_ids(client):
+    from functools import partial
+
+    def get_txs_patched(conn, ids):
+        """Return shims with a to_dict() method reporting the ids."""
+        return (type('', (), {'to_dict': partial(dict, id=txid)})
+                for txid in ids)
+
+    txids = ['1' * 64, '2' * 64]
+
+    with patch('bigchaindb.BigchainDB.get_transactions_by_ids', get_txs_patched):
+        res = client.get(TX_ENDPOINT + '?ids=' + ','.join(txids))
+        assert res.status_code == 200
+        assert res.json == [{'id': txid} for txid in txids]
+
+    with patch('bigchaindb.BigchainDB.get_transactions_by_ids',
+               lambda self, ids: iter(())):
+        assert client.get(TX_ENDPOINT + '?ids=' + txids[0]).json == []
+
+    assert client.get(TX_ENDPOINT + '?ids=' + '1' * 63).status_code == 400
+    assert client.get(TX_ENDPOINT + '?ids=').status_code == 400
+
+
+@pytest.mark.bdb
+def test_transactions_get_by_ids_from_the_database(b, client, signed_create_tx,
+                                                   signed_transfer_tx):
+    b.store_bulk_transactions([signed_create_tx, signed_transfer_tx])
+
+    url = TX_ENDPOINT + '?ids={},{},{}'.format(
+        signed_create_tx.id, signed_transfer_tx.id, '0' * 64)
+    res = client.get(url)
+
+    assert sorted(res.json, key=lambda tx: tx['id']) == sorted(
+        [signed_create_tx.to_dict(), signed_transfer_tx.to_dict()],
+        key=lambda tx: tx['id'])
 
 
-@patch('requests.post')
+@patch('bigchaindb.tendermint_rpc.TendermintRPC.post')
 @pytest.mark.parametrize('mode', [
     ('', 'broadcast_tx_async'),
     ('?mode=async', 'broadcast_tx_async'),
@@ -425,8 +478,9 @@ def test_post_transaction_valid_modes(mock_post, client, mode):
         .sign([alice.private_key])
     mode_endpoint = TX_ENDPOINT + mode[0]
     client.post(mode_endpoint, data=json.dumps(tx.to_dict()))
-    args, kwargs = mock_post.call_args
-    assert mode[1] == kwargs['json']['method']
+    client.application.config['broadcast_pipeline'].join()
+    methods = [payload['method'] for (payload,), kwargs in mock_post.call_args_list]
+    assert mode[1] in methods
 
 
 @pytest.mark.abci